@@ -5,15 +5,113 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from app.auth import get_current_user, require_premium
 from app.models.schemas import AnalysisRequest, AnalysisResponse
 from app.services.kpi_calculator import KPICalculator
+from app.services.risk_scorer import RiskScorer
 from app.services.data_processor import DataProcessor
 from app.services.firestore_service import FirestoreService
-from typing import Dict
+from app.utils.data_loader import to_datetime_safe, DATE_COLS
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analyses", tags=["analyses"])
 
+# Dimensões aceitas em `dimensao` (coortes e retenção)
+DIMENSOES_PERMITIDAS = ("departamento", "cargo", "tipo_contrato", "genero")
+
+
+def _validate_dimensao(dimensao: Optional[str]) -> None:
+    """
+    Rejeita `dimensao` fora da lista de dimensões permitidas.
+    
+    Raises:
+        HTTPException: 400 se a dimensão não for permitida
+    """
+    if dimensao is not None and dimensao not in DIMENSOES_PERMITIDAS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"dimensao deve ser uma de: {', '.join(DIMENSOES_PERMITIDAS)}"
+        )
+
+
+def _load_dataset(user_id: str, dataset_id: str) -> Dict:
+    """
+    Dados do dataset no Firestore.
+    
+    Raises:
+        HTTPException: 404 se o dataset não existir ou estiver vazio
+    """
+    dataset_data = FirestoreService().get_dataset_data(user_id, dataset_id)
+    
+    if not dataset_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset não encontrado ou sem dados"
+        )
+    return dataset_data
+
+
+def _colaboradores_df(dataset_data: Dict) -> pd.DataFrame:
+    """
+    DataFrame de colaboradores de um dataset, com as colunas de data
+    (as que existirem) convertidas para datetime.
+    
+    Os dados vêm do Firestore como lista de dicts com estrutura flexível:
+    qualquer conjunto de colunas é aceito.
+    
+    Raises:
+        HTTPException: 400 se o dataset não tiver colaboradores
+    """
+    colaboradores_data = dataset_data.get('colaboradores', [])
+    
+    if not colaboradores_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dataset não contém dados de colaboradores"
+        )
+    
+    return to_datetime_safe(pd.DataFrame(colaboradores_data), DATE_COLS)
+
+
+def _load_colaboradores(user_id: str, dataset_id: str) -> pd.DataFrame:
+    """
+    Carrega do Firestore o DataFrame de colaboradores do dataset.
+    
+    Raises:
+        HTTPException: 404 se o dataset não existir, 400 se não tiver colaboradores
+    """
+    return _colaboradores_df(_load_dataset(user_id, dataset_id))
+
+
+@contextmanager
+def _analysis_errors(acao: str, valor_invalido_400: bool = False) -> Iterator[None]:
+    """
+    Converte os erros de um endpoint de análise em respostas HTTP.
+    
+    HTTPException passa adiante; os demais erros são logados e viram 500.
+    
+    Args:
+        acao: Descrição usada no log (ex.: "calcular turnover")
+        valor_invalido_400: Responder 400 para ValueError (parâmetro inválido)
+    """
+    try:
+        yield
+    except HTTPException:
+        raise
+    except Exception as e:
+        if valor_invalido_400 and isinstance(e, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        logger.error(f"Erro ao {acao}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao calcular análise: {str(e)}"
+        )
+
 
 @router.post("/overview", response_model=AnalysisResponse)
 async def get_overview(
@@ -24,56 +122,17 @@ async def get_overview(
     Calcula KPIs da visão geral.
     Disponível para todos os usuários (básico e premium).
     """
-    try:
-        # Carregar dados do Firestore
-        firestore_service = FirestoreService()
-        dataset_data = firestore_service.get_dataset_data(user['uid'], request.dataset_id)
-        
-        if not dataset_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Dataset não encontrado ou sem dados"
-            )
-        
-        # Converter dados flexíveis do Firestore para DataFrames
-        import pandas as pd
-        
-        # Os dados vêm como lista de dicts do Firestore (estrutura flexível)
-        # Converter de volta para DataFrame - aceita qualquer estrutura de colunas
-        colaboradores_data = dataset_data.get('colaboradores', [])
-        
-        if not colaboradores_data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Dataset não contém dados de colaboradores"
-            )
-        
-        # Criar DataFrame de forma flexível (aceita qualquer estrutura)
-        colaboradores_df = pd.DataFrame(colaboradores_data)
-        
-        # Converter datas de string para datetime (se existirem)
-        # Isso é flexível - só converte se as colunas existirem
-        from app.utils.data_loader import col_like
-        adm_col = col_like(colaboradores_df, "data de admissão")
-        desl_col = col_like(colaboradores_df, "data de desligamento")
-        
-        if adm_col:
-            colaboradores_df[adm_col] = pd.to_datetime(colaboradores_df[adm_col], errors="coerce")
-        if desl_col:
-            colaboradores_df[desl_col] = pd.to_datetime(colaboradores_df[desl_col], errors="coerce")
-        
-        if colaboradores_df.empty:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Dataset não contém dados de colaboradores"
-            )
+    with _analysis_errors("calcular overview"):
+        dataset_data = _load_dataset(user['uid'], request.dataset_id)
+        colaboradores_df = _colaboradores_df(dataset_data)
         
         # Calcular KPIs
         calculator = KPICalculator()
         results = calculator.calculate_overview(
             colaboradores_df,
             request.ano_filtro,
-            request.mes_filtro
+            request.mes_filtro,
+            agregados=dataset_data.get('agregados_mensais')
         )
         
         return AnalysisResponse(
@@ -85,15 +144,6 @@ async def get_overview(
                 'mes_filtro': request.mes_filtro
             }
         )
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Erro ao calcular overview: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao calcular análise: {str(e)}"
-        )
 
 
 @router.post("/headcount", response_model=AnalysisResponse)
@@ -105,37 +155,8 @@ async def get_headcount_analysis(
     Calcula análises de headcount.
     Disponível para todos os usuários.
     """
-    try:
-        # Carregar dados do Firestore
-        firestore_service = FirestoreService()
-        dataset_data = firestore_service.get_dataset_data(user['uid'], request.dataset_id)
-        
-        if not dataset_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Dataset não encontrado ou sem dados"
-            )
-        
-        # Converter dados flexíveis para DataFrame
-        import pandas as pd
-        colaboradores_data = dataset_data.get('colaboradores', [])
-        
-        if not colaboradores_data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Dataset não contém dados de colaboradores"
-            )
-        
-        colaboradores_df = pd.DataFrame(colaboradores_data)
-        
-        # Converter datas (se existirem)
-        from app.utils.data_loader import col_like
-        adm_col = col_like(colaboradores_df, "data de admissão")
-        desl_col = col_like(colaboradores_df, "data de desligamento")
-        if adm_col:
-            colaboradores_df[adm_col] = pd.to_datetime(colaboradores_df[adm_col], errors="coerce")
-        if desl_col:
-            colaboradores_df[desl_col] = pd.to_datetime(colaboradores_df[desl_col], errors="coerce")
+    with _analysis_errors("calcular headcount"):
+        colaboradores_df = _load_colaboradores(user['uid'], request.dataset_id)
         
         # Calcular análises de headcount
         calculator = KPICalculator()
@@ -154,15 +175,6 @@ async def get_headcount_analysis(
                 'mes_filtro': request.mes_filtro
             }
         )
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Erro ao calcular headcount: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao calcular análise: {str(e)}"
-        )
 
 
 @router.post("/turnover", response_model=AnalysisResponse)
@@ -174,44 +186,19 @@ async def get_turnover_analysis(
     Calcula análises de turnover.
     Disponível para todos os usuários.
     """
-    try:
-        # Carregar dados do Firestore
-        firestore_service = FirestoreService()
-        dataset_data = firestore_service.get_dataset_data(user['uid'], request.dataset_id)
-        
-        if not dataset_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Dataset não encontrado ou sem dados"
-            )
-        
-        # Converter dados flexíveis para DataFrame
-        import pandas as pd
-        colaboradores_data = dataset_data.get('colaboradores', [])
-        
-        if not colaboradores_data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Dataset não contém dados de colaboradores"
-            )
-        
-        colaboradores_df = pd.DataFrame(colaboradores_data)
-        
-        # Converter datas (se existirem)
-        from app.utils.data_loader import col_like
-        adm_col = col_like(colaboradores_df, "data de admissão")
-        desl_col = col_like(colaboradores_df, "data de desligamento")
-        if adm_col:
-            colaboradores_df[adm_col] = pd.to_datetime(colaboradores_df[adm_col], errors="coerce")
-        if desl_col:
-            colaboradores_df[desl_col] = pd.to_datetime(colaboradores_df[desl_col], errors="coerce")
+    with _analysis_errors("calcular turnover", valor_invalido_400=True):
+        dataset_data = _load_dataset(user['uid'], request.dataset_id)
+        colaboradores_df = _colaboradores_df(dataset_data)
         
         # Calcular análises de turnover
         calculator = KPICalculator()
         results = calculator.calculate_turnover_analysis(
             colaboradores_df,
             request.ano_filtro,
-            request.mes_filtro
+            request.mes_filtro,
+            agregados=dataset_data.get('agregados_mensais'),
+            janela_meses=request.janela_meses,
+            anualizacao=request.anualizacao
         )
         
         return AnalysisResponse(
@@ -223,27 +210,255 @@ async def get_turnover_analysis(
                 'mes_filtro': request.mes_filtro
             }
         )
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Erro ao calcular turnover: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao calcular análise: {str(e)}"
+
+
+@router.post("/turnover/matrix", response_model=AnalysisResponse)
+async def get_turnover_matrix(
+    request: AnalysisRequest,
+    user: Dict = Depends(get_current_user)
+):
+    """
+    Calcula o turnover de todas as competências em uma chamada.
+    Os filtros de ano/mês do request são ignorados: o frontend guarda a
+    matriz por dataset e consulta localmente a cada troca de filtro.
+    Disponível para todos os usuários.
+    """
+    with _analysis_errors("calcular matriz de turnover"):
+        dataset_data = _load_dataset(user['uid'], request.dataset_id)
+        
+        calculator = KPICalculator()
+        agregados = dataset_data.get('agregados_mensais')
+        
+        if agregados is not None:
+            # Tabela mensal materializada no upload: não precisa dos colaboradores
+            results = calculator.calculate_turnover_matrix(None, agregados=agregados)
+        else:
+            results = calculator.calculate_turnover_matrix(_colaboradores_df(dataset_data))
+        
+        return AnalysisResponse(
+            dataset_id=request.dataset_id,
+            analysis_type="turnover_matrix",
+            results=results
+        )
+
+
+@router.post("/retention", response_model=AnalysisResponse)
+async def get_retention_analysis(
+    request: AnalysisRequest,
+    user: Dict = Depends(get_current_user)
+):
+    """
+    Calcula curvas de retenção (Kaplan-Meier) geral e por departamento,
+    tipo de contrato e ano de admissão.
+    Disponível para todos os usuários.
+    """
+    with _analysis_errors("calcular retenção"):
+        _validate_dimensao(request.dimensao)
+        colaboradores_df = _load_colaboradores(user['uid'], request.dataset_id)
+        
+        # Calcular curvas de retenção
+        calculator = KPICalculator()
+        results = calculator.calculate_retention_analysis(
+            colaboradores_df,
+            meses_max=request.meses_max
+        )
+        
+        return AnalysisResponse(
+            dataset_id=request.dataset_id,
+            analysis_type="retention",
+            results=results,
+            filters={
+                'meses_max': request.meses_max
+            }
         )
 
 
+@router.post("/cohorts", response_model=AnalysisResponse)
+async def get_cohort_retention(
+    request: AnalysisRequest,
+    user: Dict = Depends(get_current_user)
+):
+    """
+    Calcula a matriz de retenção por coorte de admissão (mês de admissão x
+    meses desde a admissão), opcionalmente separada por `dimensao`.
+    Disponível para todos os usuários.
+    """
+    with _analysis_errors("calcular coortes"):
+        _validate_dimensao(request.dimensao)
+        colaboradores_df = _load_colaboradores(user['uid'], request.dataset_id)
+        
+        # Calcular matriz de coortes
+        calculator = KPICalculator()
+        results = calculator.calculate_cohort_retention(
+            colaboradores_df,
+            group_by=request.dimensao,
+            meses_max=request.meses_max
+        )
+        
+        return AnalysisResponse(
+            dataset_id=request.dataset_id,
+            analysis_type="cohorts",
+            results=results,
+            filters={
+                'dimensao': request.dimensao,
+                'meses_max': request.meses_max
+            }
+        )
+
+
+@router.post("/forecast", response_model=AnalysisResponse)
+async def get_turnover_forecast(
+    request: AnalysisRequest,
+    user: Dict = Depends(require_premium)
+):
+    """
+    Calcula a previsão de turnover (`horizonte` meses, com intervalo de
+    previsão) da empresa e de cada departamento e cargo.
+    Disponível apenas para usuários Premium.
+    """
+    with _analysis_errors("calcular previsão"):
+        colaboradores_df = _load_colaboradores(user['uid'], request.dataset_id)
+        
+        # Calcular previsões
+        calculator = KPICalculator()
+        results = calculator.calculate_turnover_forecast(
+            colaboradores_df,
+            horizonte=request.horizonte,
+            sazonal=request.sazonal,
+            nivel=request.nivel_confianca
+        )
+        
+        return AnalysisResponse(
+            dataset_id=request.dataset_id,
+            analysis_type="forecast",
+            results=results,
+            filters={
+                'horizonte': request.horizonte,
+                'sazonal': request.sazonal,
+                'nivel_confianca': request.nivel_confianca
+            }
+        )
+
+
+@router.post("/anomalies", response_model=AnalysisResponse)
+async def get_turnover_anomalies(
+    request: AnalysisRequest,
+    user: Dict = Depends(require_premium)
+):
+    """
+    Ranking das células departamento × cargo × mês com turnover anômalo
+    (z-score robusto e EWMA). Usa as anomalias detectadas no upload quando
+    existirem; datasets antigos são calculados na hora.
+    Disponível apenas para usuários Premium.
+    """
+    with _analysis_errors("detectar anomalias"):
+        dataset_data = _load_dataset(user['uid'], request.dataset_id)
+        
+        salvas = dataset_data.get('anomalias_turnover')
+        if salvas is not None and request.top_n <= DataProcessor.ANOMALIES_SAVED:
+            results = {'anomalies': salvas[:request.top_n]}
+        else:
+            calculator = KPICalculator()
+            results = calculator.calculate_turnover_anomalies(_colaboradores_df(dataset_data), top_n=request.top_n)
+        
+        return AnalysisResponse(
+            dataset_id=request.dataset_id,
+            analysis_type="anomalies",
+            results=results,
+            filters={
+                'top_n': request.top_n
+            }
+        )
+
+
+def _load_risk_features(user_id: str, dataset_id: str):
+    """
+    Matriz de fatores do TRI do dataset, do cache ou montada a partir do
+    Firestore (só lê os dados se a versão não estiver em cache).
+    """
+    versao = FirestoreService().get_dataset_version(user_id, dataset_id)
+    features = RiskScorer.get_cached_features(user_id, dataset_id, versao)
+    if features is not None:
+        return features
+    
+    colaboradores_df = _load_colaboradores(user_id, dataset_id)
+    return RiskScorer.build_features(user_id, dataset_id, versao, colaboradores_df)
+
+
 @router.post("/risk", response_model=AnalysisResponse)
 async def get_risk_analysis(
     request: AnalysisRequest,
     user: Dict = Depends(require_premium)
 ):
     """
-    Calcula análise de risco de turnover (TRI).
+    Calcula análise de risco de turnover (TRI): resumo, distribuição por
+    faixa e uma página (`pagina`, `limite`) do ranking dos colaboradores
+    ativos com maior risco, filtrável por `departamentos` e `faixas_risco`.
+    A matriz de fatores fica em cache por versão do dataset; trocar os
+    `pesos` não recarrega os dados.
+    Disponível apenas para usuários Premium.
+    """
+    with _analysis_errors("calcular risco", valor_invalido_400=True):
+        features = _load_risk_features(user['uid'], request.dataset_id)
+        results = RiskScorer.calculate_risk_analysis(
+            features,
+            pesos=request.pesos,
+            limite=request.limite,
+            pagina=request.pagina,
+            departamentos=request.departamentos,
+            faixas=request.faixas_risco
+        )
+        
+        return AnalysisResponse(
+            dataset_id=request.dataset_id,
+            analysis_type="risk",
+            results=results,
+            filters={
+                'pesos': results['weights'],
+                'limite': request.limite,
+                'pagina': request.pagina,
+                'departamentos': request.departamentos,
+                'faixas_risco': request.faixas_risco
+            }
+        )
+
+
+@router.post("/risk/scenarios", response_model=AnalysisResponse)
+async def get_risk_scenarios(
+    request: AnalysisRequest,
+    user: Dict = Depends(require_premium)
+):
+    """
+    Compara vários conjuntos de pesos do TRI (`cenarios`) de uma vez: risco
+    médio, % de risco alto e os `top_n` colaboradores de cada cenário,
+    com os mesmos filtros do /risk (`departamentos`, `faixas_risco`).
+    Usa a mesma matriz de fatores em cache do endpoint /risk.
     Disponível apenas para usuários Premium.
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Análise de risco ainda não implementada"
-    )
+    if not request.cenarios:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe ao menos um cenário de pesos"
+        )
+    
+    with _analysis_errors("calcular cenários de risco", valor_invalido_400=True):
+        features = _load_risk_features(user['uid'], request.dataset_id)
+        results = RiskScorer.calculate_weight_scenarios(
+            features,
+            request.cenarios,
+            top_n=request.top_n,
+            departamentos=request.departamentos,
+            faixas=request.faixas_risco
+        )
+        
+        return AnalysisResponse(
+            dataset_id=request.dataset_id,
+            analysis_type="risk_scenarios",
+            results=results,
+            filters={
+                'cenarios': len(request.cenarios),
+                'top_n': request.top_n,
+                'departamentos': request.departamentos,
+                'faixas_risco': request.faixas_risco
+            }
+        )
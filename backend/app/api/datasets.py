@@ -2,7 +2,9 @@
 Endpoints para gerenciamento de datasets
 """
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from app.auth import get_current_user, require_premium
+from app.config import settings
 from app.services.firestore_service import FirestoreService
 from app.services.data_processor import DataProcessor
 from app.models.schemas import UploadResponse, ErrorResponse
@@ -21,40 +23,65 @@ async def upload_dataset(
     user: Dict = Depends(get_current_user)
 ):
     """
-    Faz upload de um arquivo Excel com dados de colaboradores.
+    Faz upload de um arquivo com dados de colaboradores.
+    
+    Aceita Excel (.xlsx, .xls), CSV ou Parquet (aba colaboradores) e .zip
+    com um CSV/Parquet por aba (empresa, colaboradores, performance).
     """
     try:
         # Validar tipo de arquivo
-        if not file.filename.endswith(('.xlsx', '.xls')):
+        if not file.filename.lower().endswith(tuple(settings.ALLOWED_EXTENSIONS)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Apenas arquivos Excel (.xlsx, .xls) são permitidos"
+                detail="Formatos permitidos: " + ", ".join(settings.ALLOWED_EXTENSIONS)
             )
         
         # Ler conteúdo do arquivo
         content = await file.read()
+        if len(content) > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Arquivo excede o limite de {settings.MAX_UPLOAD_SIZE // (1024 * 1024)} MB"
+            )
         
-        # Processar dados
-        processor = DataProcessor()
-        data = processor.process_upload(content)
+        # Arquivo idêntico já processado: reaproveita o dataset (dados e agregados)
+        firestore_service = FirestoreService()
+        content_hash = await run_in_threadpool(DataProcessor.content_hash, content)
+        existente = await run_in_threadpool(firestore_service.find_dataset_by_hash, user['uid'], content_hash)
+        if existente is not None:
+            logger.info(f"Upload idêntico ao dataset {existente['id']}; reaproveitando")
+            return UploadResponse(
+                dataset_id=existente['id'],
+                message="Arquivo idêntico já carregado; dataset existente reaproveitado",
+                metadata={
+                    'name': existente.get('name', file.filename),
+                    'filename': existente.get('filename', file.filename),
+                    'rows': existente.get('rows', 0),
+                    'uploaded_at': existente.get('createdAt')
+                },
+                reused=True
+            )
+        
+        # Processar dados, agregados mensais e anomalias fora do event loop
+        data = await run_in_threadpool(DataProcessor.process_dataset, content, file.filename)
         
         # Gerar ID único
         dataset_id = str(uuid.uuid4())
         
         # Salvar metadados no Firestore
-        firestore_service = FirestoreService()
         metadata = {
             'name': file.filename,
             'filename': file.filename,
+            'contentHash': content_hash,
             'rows': len(data['colaboradores']) if not data['colaboradores'].empty else 0,
             'uploaded_at': None,  # Será preenchido pelo Firestore
         }
         
-        firestore_service.save_dataset(user['uid'], dataset_id, metadata)
+        await run_in_threadpool(firestore_service.save_dataset, user['uid'], dataset_id, metadata)
         
         # Salvar dados processados no Firestore (estrutura flexível)
         # Os dados são salvos como estão, sem padronização rígida
-        firestore_service.save_dataset_data(user['uid'], dataset_id, data)
+        await run_in_threadpool(firestore_service.save_dataset_data, user['uid'], dataset_id, data)
         
         return UploadResponse(
             dataset_id=dataset_id,
@@ -67,6 +94,8 @@ async def upload_dataset(
             }
         )
     
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -23,7 +23,11 @@ class Settings:
     
     # Upload
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
-    ALLOWED_EXTENSIONS: list = [".xlsx", ".xls"]
+    MAX_UNCOMPRESSED_SIZE: int = 500 * 1024 * 1024  # 500MB (soma dos arquivos lidos de um .zip)
+    ALLOWED_EXTENSIONS: list = [".xlsx", ".xls", ".csv", ".parquet", ".zip"]
+    # Processos que leem em paralelo os arquivos de um upload .zip (0 ou 1 = no
+    # próprio processo); padrão: um por aba, limitado aos CPUs da instância
+    UPLOAD_PARSE_WORKERS: int = int(os.getenv("UPLOAD_PARSE_WORKERS", str(min(3, os.cpu_count() or 1))))
     
     # Cache
     CACHE_TTL: int = 3600  # 1 hora
@@ -6,6 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.firebase import initialize_firebase
 from app.api import datasets, analyses
+from app.services.data_processor import DataProcessor
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +37,10 @@ async def startup_event():
         logger.error(f"Erro ao inicializar Firebase: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    DataProcessor.shutdown_parse_pool()
+
 # Rotas
 app.include_router(datasets.router, prefix=settings.API_V1_PREFIX)
 app.include_router(analyses.router, prefix=settings.API_V1_PREFIX)
@@ -20,7 +20,21 @@ class AnalysisRequest(BaseModel):
     dataset_id: str
     ano_filtro: Optional[int] = None
     mes_filtro: Optional[int] = None
-    analysis_type: str = Field(..., description="Tipo de análise: overview, headcount, turnover")
+    analysis_type: str = Field(..., description="Tipo de análise: overview, headcount, turnover, turnover_matrix, retention, cohorts, risk, risk_scenarios, forecast, anomalies")
+    janela_meses: int = Field(12, ge=1, le=60, description="Janela do turnover móvel (meses)")
+    anualizacao: str = Field("linear", description="Anualização do turnover móvel: nenhuma, linear, composta")
+    meses_max: Optional[int] = Field(None, ge=1, le=600, description="Último mês de casa das curvas de retenção e da matriz de coortes")
+    dimensao: Optional[str] = Field(None, description="Dimensão para separar as coortes (ex.: departamento)")
+    pesos: Optional[Dict[str, float]] = Field(None, description="Pesos do TRI por fator (perf, promo, casa, eq, merito), em frações")
+    limite: int = Field(100, ge=1, le=1000, description="Colaboradores por página do ranking de risco")
+    pagina: int = Field(1, ge=1, description="Página do ranking de risco")
+    departamentos: Optional[List[str]] = Field(None, description="Filtra o ranking de risco por departamento")
+    faixas_risco: Optional[List[str]] = Field(None, description="Filtra o ranking de risco por faixa (0–20, 20–40, 40–60, 60–80, 80–100)")
+    cenarios: Optional[List[Dict[str, float]]] = Field(None, max_length=100, description="Conjuntos de pesos do TRI a comparar (what-if)")
+    top_n: int = Field(10, ge=1, le=1000, description="Itens no topo do ranking (colaboradores por cenário de risco, anomalias)")
+    horizonte: int = Field(3, ge=1, le=12, description="Meses de previsão de turnover")
+    sazonal: bool = Field(False, description="Considerar sazonalidade mensal na previsão")
+    nivel_confianca: float = Field(0.95, gt=0.5, lt=1, description="Nível de confiança do intervalo de previsão")
 
 
 class AnalysisResponse(BaseModel):
@@ -36,6 +50,7 @@ class UploadResponse(BaseModel):
     dataset_id: str
     message: str
     metadata: DatasetMetadata
+    reused: bool = Field(False, description="Arquivo idêntico já carregado: dataset existente reaproveitado")
 
 
 class ErrorResponse(BaseModel):
@@ -4,5 +4,6 @@ Serviços de negócio
 from app.services.firestore_service import FirestoreService
 from app.services.data_processor import DataProcessor
 from app.services.kpi_calculator import KPICalculator
+from app.services.risk_scorer import RiskScorer
 
-__all__ = ['FirestoreService', 'DataProcessor', 'KPICalculator']
+__all__ = ['FirestoreService', 'DataProcessor', 'KPICalculator', 'RiskScorer']
@@ -1,30 +1,97 @@
 """
 Serviço para processamento de dados
 """
+import hashlib
+import multiprocessing
+import threading
 import pandas as pd
-from typing import Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from app.config import settings
 from app.utils.data_loader import load_and_prepare
+from kpi_core.kpi_helpers import build_monthly_aggregates
+from kpi_core.anomalies import detect_turnover_anomalies
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Pool de processos que lê os arquivos (CSV/Parquet) de um upload .zip; criado no primeiro upload e
+# mantido entre requisições para não pagar a subida dos workers a cada vez
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
 
 class DataProcessor:
     """Serviço para processar dados de colaboradores"""
     
+    # Anomalias de turnover guardadas no upload
+    ANOMALIES_SAVED = 50
+    
+    @staticmethod
+    def content_hash(file_content: bytes) -> str:
+        """
+        Hash SHA-256 do arquivo enviado, usado para reconhecer reenvios.
+        
+        Args:
+            file_content: Conteúdo do arquivo em bytes
+        
+        Returns:
+            Hash em hexadecimal, prefixado com o algoritmo ("sha256:...")
+        """
+        return "sha256:" + hashlib.sha256(file_content).hexdigest()
+    
+    @staticmethod
+    def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+        """
+        Pool de leitura dos arquivos de um .zip (None se UPLOAD_PARSE_WORKERS <= 1).
+        Planilhas Excel são lidas em streaming no próprio processo.
+        
+        Usa "spawn": os workers não herdam threads nem conexões gRPC do
+        Firebase do processo da API.
+        """
+        global _parse_pool
+        if settings.UPLOAD_PARSE_WORKERS <= 1:
+            return None
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=settings.UPLOAD_PARSE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return _parse_pool
+    
     @staticmethod
-    def process_upload(file_content: bytes) -> Dict[str, pd.DataFrame]:
+    def shutdown_parse_pool(wait: bool = True) -> None:
+        """Encerra o pool de leitura (um novo é criado no próximo upload)."""
+        global _parse_pool
+        with _parse_pool_lock:
+            pool, _parse_pool = _parse_pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+    
+    @staticmethod
+    def process_upload(file_content: bytes, filename: Optional[str] = None) -> Dict[str, pd.DataFrame]:
         """
-        Processa upload de arquivo Excel.
+        Processa upload de arquivo Excel, CSV, Parquet ou .zip (um CSV/Parquet por aba).
         
         Args:
             file_content: Conteúdo do arquivo em bytes
+            filename: Nome original do arquivo (define o formato; None = Excel)
         
         Returns:
             Dict com 'empresa', 'colaboradores', 'performance'
         """
         try:
-            empresa, colaboradores, performance = load_and_prepare(file_content)
+            try:
+                empresa, colaboradores, performance = load_and_prepare(
+                    file_content, filename, DataProcessor.get_parse_pool()
+                )
+            except BrokenProcessPool:
+                # Worker morto (ex.: falta de memória): descarta o pool e lê aqui
+                logger.warning("Pool de leitura interrompido; lendo o arquivo no processo atual")
+                DataProcessor.shutdown_parse_pool(wait=False)
+                empresa, colaboradores, performance = load_and_prepare(file_content, filename)
             
             return {
                 'empresa': empresa,
@@ -35,6 +102,82 @@ class DataProcessor:
             logger.error(f"Erro ao processar arquivo: {e}")
             raise ValueError(f"Erro ao processar arquivo: {str(e)}")
     
+    @staticmethod
+    def process_dataset(file_content: bytes, filename: Optional[str] = None) -> Dict:
+        """
+        Processamento completo do upload: abas, agregados mensais e anomalias.
+        
+        Tudo é síncrono e pesado em CPU; o endpoint chama esta função em
+        uma thread para não bloquear o event loop.
+        
+        Args:
+            file_content: Conteúdo do arquivo em bytes
+            filename: Nome original do arquivo (define o formato; None = Excel)
+        
+        Returns:
+            Dict de `process_upload`, mais 'agregados_mensais' e
+            'anomalias_turnover' quando puderam ser gerados
+        """
+        data = DataProcessor.process_upload(file_content, filename)
+        
+        # Agregados mensais (as análises leem a tabela em vez de reprocessar
+        # colaboradores a cada requisição)
+        agregados = DataProcessor.materialize_aggregates(data['colaboradores'])
+        if agregados is not None:
+            data['agregados_mensais'] = agregados
+        
+        # Anomalias de turnover (departamento × cargo × mês) para os insights
+        anomalias = DataProcessor.detect_anomalies(data['colaboradores'])
+        if anomalias is not None:
+            data['anomalias_turnover'] = anomalias
+        return data
+    
+    @staticmethod
+    def materialize_aggregates(colaboradores: pd.DataFrame) -> Optional[Dict]:
+        """
+        Gera a tabela de agregados mensais salva junto do dataset.
+        
+        Falhas não impedem o upload: sem a tabela, as análises recalculam
+        a partir dos colaboradores.
+        
+        Args:
+            colaboradores: DataFrame de colaboradores já preparado
+        
+        Returns:
+            Dict de `build_monthly_aggregates` ou None
+        """
+        if colaboradores is None or colaboradores.empty:
+            return None
+        try:
+            return build_monthly_aggregates(colaboradores)
+        except Exception as e:
+            logger.warning(f"Não foi possível gerar agregados mensais: {e}")
+            return None
+    
+    @staticmethod
+    def detect_anomalies(colaboradores: pd.DataFrame, top_n: int = ANOMALIES_SAVED) -> Optional[List[Dict]]:
+        """
+        Detecta as células departamento × cargo × mês com turnover anômalo,
+        salvas junto do dataset para alimentar os insights.
+        
+        Falhas não impedem o upload.
+        
+        Args:
+            colaboradores: DataFrame de colaboradores já preparado
+            top_n: Quantidade de anomalias guardadas
+        
+        Returns:
+            Lista de registros de `detect_turnover_anomalies` ou None
+        """
+        if colaboradores is None or colaboradores.empty:
+            return None
+        try:
+            anomalias = detect_turnover_anomalies(colaboradores, top_n=top_n)
+            return anomalias.round(2).to_dict('records') if not anomalias.empty else []
+        except Exception as e:
+            logger.warning(f"Não foi possível detectar anomalias: {e}")
+            return None
+    
     @staticmethod
     def filter_by_period(
         df: pd.DataFrame,
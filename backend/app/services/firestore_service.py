@@ -36,6 +36,34 @@ class FirestoreService:
         })
         return dataset_id
     
+    def find_dataset_by_hash(self, user_id: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Procura um dataset do usuário com o mesmo conteúdo já processado.
+        Lê só os metadados (o campo `data` não é baixado).
+        
+        Args:
+            user_id: ID do usuário
+            content_hash: Hash do arquivo (campo `contentHash`)
+        
+        Returns:
+            Metadados com 'id' ou None se não houver dataset com dados salvos
+        """
+        try:
+            query = (
+                self.db.collection('users').document(user_id).collection('datasets')
+                .where('contentHash', '==', content_hash)
+                .select(['name', 'filename', 'rows', 'contentHash', 'createdAt', 'dataUpdatedAt'])
+            )
+            for doc in query.stream():
+                metadata = doc.to_dict()
+                # Upload interrompido antes de salvar os dados não conta
+                if metadata.get('dataUpdatedAt'):
+                    return {'id': doc.id, **metadata}
+            return None
+        except Exception as e:
+            logger.error(f"Erro ao procurar dataset por hash: {e}", exc_info=True)
+            return None
+    
     def get_dataset(self, user_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
         """Obtém metadados de um dataset"""
         doc_ref = self.db.collection('users').document(user_id).collection('datasets').document(dataset_id)
@@ -198,3 +226,27 @@ class FirestoreService:
         except Exception as e:
             logger.error(f"Erro ao obter dados do dataset: {e}", exc_info=True)
             return None
+    
+    def get_dataset_version(self, user_id: str, dataset_id: str) -> Optional[str]:
+        """
+        Obtém a versão dos dados do dataset (momento do último salvamento).
+        Lê só o campo `dataUpdatedAt`, sem baixar os dados.
+        
+        Args:
+            user_id: ID do usuário
+            dataset_id: ID do dataset
+        
+        Returns:
+            Versão em texto ou None se o dataset não existir ou não tiver dados salvos
+        """
+        try:
+            doc_ref = self.db.collection('users').document(user_id).collection('datasets').document(dataset_id)
+            doc = doc_ref.get(field_paths=['dataUpdatedAt'])
+            
+            if not doc.exists:
+                return None
+            atualizado_em = doc.to_dict().get('dataUpdatedAt')
+            return atualizado_em.isoformat() if atualizado_em else None
+        except Exception as e:
+            logger.error(f"Erro ao obter versão do dataset: {e}", exc_info=True)
+            return None
@@ -3,7 +3,8 @@ Serviço para cálculo de KPIs
 """
 import pandas as pd
 from typing import Dict, Optional
-from app.utils import kpi_helpers
+from kpi_core import anomalies, forecast, kpi_helpers, survival
+from kpi_core.workforce import WorkforceData, as_workforce
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,46 +15,55 @@ class KPICalculator:
     
     @staticmethod
     def calculate_overview(
-        df: pd.DataFrame,
+        df: WorkforceData,
         ano_filtro: Optional[int] = None,
-        mes_filtro: Optional[int] = None
+        mes_filtro: Optional[int] = None,
+        agregados: Optional[Dict] = None
     ) -> Dict:
         """
         Calcula KPIs da visão geral.
         
+        Args:
+            agregados: Tabela de agregados mensais do dataset (opcional)
+        
         Returns:
             Dict com todos os KPIs da visão geral
         """
-        # KPIs básicos
-        basic_kpis = kpi_helpers.calculate_basic_kpis(df)
-        
-        # Turnover
-        turnover = kpi_helpers.calculate_turnover_by_period(df, ano_filtro, mes_filtro)
-        
-        # Turnover total (para comparação)
-        turnover_total = kpi_helpers.calculate_turnover_by_period(df, None, None)
-        
-        # Tipos de contrato
-        contract_types = kpi_helpers.calculate_contract_types(df)
-        
-        # Desligamentos mensais
-        monthly_dismissals = kpi_helpers.calculate_monthly_dismissals(df)
-        
-        # Tenure
-        tenure = kpi_helpers.calculate_tenure(df)
+        # Todos os KPIs saem de uma passada sobre a base preparada
+        overview = kpi_helpers.calculate_overview_kpis(df, ano_filtro, mes_filtro, agregados=agregados)
+        contract_types = overview['contract_types']
         
         return {
-            'basic_kpis': basic_kpis,
-            'turnover': turnover,
-            'turnover_total': turnover_total,
+            'basic_kpis': overview['basic_kpis'],
+            'turnover': overview['turnover'],
+            'turnover_total': overview['turnover_total'],
             'contract_types': contract_types.to_dict('records') if not contract_types.empty else [],
-            'monthly_dismissals': monthly_dismissals,
-            'tenure': tenure
+            'monthly_dismissals': overview['monthly_dismissals'],
+            'tenure': overview['tenure']
         }
     
+    @staticmethod
+    def calculate_turnover_matrix(
+        df: WorkforceData,
+        agregados: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Calcula o turnover de todas as competências (ano, mês, ano+mês e total).
+        
+        O frontend guarda o resultado por dataset e troca de filtro sem
+        chamar a API de novo.
+        
+        Args:
+            agregados: Tabela de agregados mensais do dataset (opcional)
+        
+        Returns:
+            Dict com 'total', 'anos', 'meses' e 'competencias'
+        """
+        return kpi_helpers.calculate_turnover_matrix(df, agregados=agregados)
+    
     @staticmethod
     def calculate_headcount_analysis(
-        df: pd.DataFrame,
+        df: WorkforceData,
         ano_filtro: Optional[int] = None,
         mes_filtro: Optional[int] = None
     ) -> Dict:
@@ -63,6 +73,8 @@ class KPICalculator:
         Returns:
             Dict com análises de headcount
         """
+        df = as_workforce(df)
+        
         from datetime import datetime
         
         # Data de referência baseada no filtro
@@ -102,23 +114,151 @@ class KPICalculator:
     
     @staticmethod
     def calculate_turnover_analysis(
-        df: pd.DataFrame,
+        df: WorkforceData,
         ano_filtro: Optional[int] = None,
-        mes_filtro: Optional[int] = None
+        mes_filtro: Optional[int] = None,
+        agregados: Optional[Dict] = None,
+        janela_meses: int = 12,
+        anualizacao: str = "linear"
     ) -> Dict:
         """
         Calcula análises de turnover.
         
+        Args:
+            agregados: Tabela de agregados mensais do dataset (opcional)
+            janela_meses: Janela do turnover móvel (padrão: 12 meses)
+            anualizacao: Anualização do turnover móvel ("nenhuma", "linear", "composta")
+        
         Returns:
             Dict com análises de turnover
         """
+        df = as_workforce(df)
+        
         # Turnover do período
-        turnover_period = kpi_helpers.calculate_turnover_by_period(df, ano_filtro, mes_filtro)
+        turnover_period = kpi_helpers.calculate_turnover_by_period(df, ano_filtro, mes_filtro, agregados=agregados)
         
-        # Histórico
+        # Histórico (com admissões, saldo e taxa de reposição), geral e por departamento
         turnover_history = kpi_helpers.calculate_turnover_history(df)
+        turnover_history_dept = kpi_helpers.calculate_turnover_history_by_group(df, "departamento")
+        
+        # Turnover móvel (ex.: últimos 12 meses), geral e por departamento
+        turnover_rolling = kpi_helpers.calculate_rolling_turnover(df, janela_meses, anualizacao)
+        turnover_rolling_dept = kpi_helpers.calculate_rolling_turnover(df, janela_meses, anualizacao, "departamento")
         
         return {
             'turnover_period': turnover_period,
-            'turnover_history': turnover_history.to_dict('records') if not turnover_history.empty else []
+            'turnover_history': turnover_history.to_dict('records') if not turnover_history.empty else [],
+            'turnover_history_by_department': turnover_history_dept.to_dict('records') if not turnover_history_dept.empty else [],
+            'turnover_rolling': turnover_rolling.to_dict('records') if not turnover_rolling.empty else [],
+            'turnover_rolling_by_department': turnover_rolling_dept.to_dict('records') if not turnover_rolling_dept.empty else []
+        }
+    
+    @staticmethod
+    def calculate_retention_analysis(
+        df: WorkforceData,
+        meses_max: Optional[int] = None
+    ) -> Dict:
+        """
+        Calcula curvas de retenção (Kaplan-Meier) geral e por dimensão.
+        
+        Args:
+            meses_max: Último mês de casa das curvas (None = maior tempo observado)
+        
+        Returns:
+            Dict com curva e resumo gerais e, por dimensão (departamento,
+            tipo de contrato e ano de admissão), curvas e resumos por grupo
+        """
+        df = as_workforce(df)
+        
+        def _records(tabela: pd.DataFrame) -> list:
+            return tabela.astype(object).where(tabela.notna(), None).to_dict('records') if not tabela.empty else []
+        
+        por_dimensao = {}
+        for dimensao in ("departamento", "tipo_contrato", survival.HIRE_YEAR_GROUP):
+            por_dimensao[dimensao] = {
+                'curves': _records(survival.calculate_retention_curves(df, dimensao, meses_max=meses_max)),
+                'summary': _records(survival.calculate_retention_summary(df, dimensao))
+            }
+        
+        return {
+            'retention_curve': _records(survival.calculate_retention_curves(df, meses_max=meses_max)),
+            'retention_summary': _records(survival.calculate_retention_summary(df)),
+            'retention_by_dimension': por_dimensao
+        }
+    
+    @staticmethod
+    def calculate_cohort_retention(
+        df: WorkforceData,
+        group_by: Optional[str] = None,
+        meses_max: Optional[int] = None
+    ) -> Dict:
+        """
+        Calcula a matriz de retenção por coorte de admissão.
+        
+        Args:
+            group_by: Dimensão para separar as coortes (ex.: "departamento")
+            meses_max: Última coluna da matriz (meses desde a admissão)
+        
+        Returns:
+            Dict com 'cohort_retention' (uma linha por coorte, colunas "0",
+            "1", ... com o % ainda ativo; None onde o mês ainda não chegou)
+            e 'months' (rótulos das colunas de meses)
+        """
+        matriz = survival.calculate_cohort_retention(df, group_by, meses_max=meses_max)
+        if matriz.empty:
+            return {'cohort_retention': [], 'months': []}
+        
+        meses = [c for c in matriz.columns if isinstance(c, int)]
+        matriz = matriz.rename(columns={c: str(c) for c in meses})
+        matriz = matriz.astype(object).where(matriz.notna(), None)
+        
+        return {
+            'cohort_retention': matriz.to_dict('records'),
+            'months': [str(c) for c in meses]
+        }
+    
+    @staticmethod
+    def calculate_turnover_forecast(
+        df: WorkforceData,
+        horizonte: int = 3,
+        sazonal: bool = False,
+        nivel: float = 0.95
+    ) -> Dict:
+        """
+        Calcula a previsão de turnover da empresa e de cada departamento e cargo.
+        
+        Args:
+            horizonte: Meses previstos (1 a 12)
+            sazonal: Considerar sazonalidade mensal
+            nivel: Nível de confiança do intervalo de previsão
+        
+        Returns:
+            Dict com 'forecast' (empresa) e 'forecast_by_department' /
+            'forecast_by_role' (um registro por grupo e mês previsto)
+        """
+        df = as_workforce(df)
+        
+        def _records(tabela: pd.DataFrame) -> list:
+            return tabela.round(2).to_dict('records') if not tabela.empty else []
+        
+        return {
+            'forecast': _records(forecast.calculate_turnover_forecast(df, None, horizonte, sazonal, nivel)),
+            'forecast_by_department': _records(forecast.calculate_turnover_forecast(df, "departamento", horizonte, sazonal, nivel)),
+            'forecast_by_role': _records(forecast.calculate_turnover_forecast(df, "cargo", horizonte, sazonal, nivel))
+        }
+    
+    @staticmethod
+    def calculate_turnover_anomalies(df: WorkforceData, top_n: int = 50) -> Dict:
+        """
+        Calcula o ranking de células departamento × cargo × mês com turnover anômalo.
+        
+        Args:
+            top_n: Quantidade de anomalias no ranking
+        
+        Returns:
+            Dict com 'anomalies' (registros de `detect_turnover_anomalies`)
+        """
+        tabela = anomalies.detect_turnover_anomalies(df, top_n=top_n)
+        return {
+            'anomalies': tabela.round(2).to_dict('records') if not tabela.empty else []
         }
@@ -0,0 +1,216 @@
+"""
+Serviço de risco de turnover (TRI)
+"""
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+from kpi_core import risk
+from kpi_core.columns import col_like
+from kpi_core.workforce import WorkforceData
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Colunas devolvidas em cada linha do ranking (se existirem na base)
+RANKING_COLUMNS = ["matricula", "nome", "departamento", "cargo", "avaliação"]
+
+# Quantidade máxima de bases com matriz de fatores em memória
+MAX_CACHED_DATASETS = 32
+
+# (usuário, dataset, versão) -> (instante de criação, RiskFeatures)
+_cache: "OrderedDict[Tuple[Hashable, ...], Tuple[float, risk.RiskFeatures]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class RiskScorer:
+    """
+    Serviço para calcular o TRI.
+    
+    A matriz de fatores é montada uma vez por versão do dataset (campo
+    `dataUpdatedAt`) e mantida em memória; cada requisição só faz o produto
+    matriz-vetor com os pesos pedidos e o ranking.
+    """
+    
+    @staticmethod
+    def get_cached_features(
+        user_id: str,
+        dataset_id: str,
+        versao: Optional[str]
+    ) -> Optional[risk.RiskFeatures]:
+        """
+        Matriz de fatores em cache para a versão do dataset.
+        
+        Args:
+            versao: Versão do dataset (None = sem versão, nunca usa cache)
+        
+        Returns:
+            RiskFeatures ou None se não estiver em cache (ou tiver expirado)
+        """
+        if versao is None:
+            return None
+        chave = (user_id, dataset_id, versao)
+        with _cache_lock:
+            item = _cache.get(chave)
+            if item is None:
+                return None
+            criado_em, features = item
+            if time.monotonic() - criado_em > settings.CACHE_TTL:
+                del _cache[chave]
+                return None
+            _cache.move_to_end(chave)
+            return features
+    
+    @staticmethod
+    def build_features(
+        user_id: str,
+        dataset_id: str,
+        versao: Optional[str],
+        df: WorkforceData
+    ) -> risk.RiskFeatures:
+        """
+        Monta a matriz de fatores e guarda em cache (se houver versão).
+        
+        Returns:
+            RiskFeatures da base
+        """
+        features = risk.build_risk_features(df)
+        if versao is None:
+            return features
+        
+        with _cache_lock:
+            # Versões anteriores do mesmo dataset não serão mais pedidas
+            for chave in [c for c in _cache if c[:2] == (user_id, dataset_id)]:
+                del _cache[chave]
+            _cache[(user_id, dataset_id, versao)] = (time.monotonic(), features)
+            while len(_cache) > MAX_CACHED_DATASETS:
+                _cache.popitem(last=False)
+        
+        logger.info(f"Matriz de risco montada para dataset {dataset_id} ({len(features)} colaboradores)")
+        return features
+    
+    @staticmethod
+    def _ranking_records(features: risk.RiskFeatures, linhas: np.ndarray, risco: np.ndarray) -> List[Dict]:
+        """Linhas do ranking (identificação, TRI e motivos) para as posições `linhas`."""
+        df = features.df
+        colunas = [c for c in (col_like(df, nome) for nome in RANKING_COLUMNS) if c]
+        ranking = df.iloc[linhas][colunas].reset_index(drop=True)
+        ranking["risco_turnover"] = np.round(risco, 1)
+        codigos = features.reason_codes(linhas)
+        ranking["codigo_motivo"] = codigos.astype(int)
+        ranking["motivo_risco"] = risk.explain_risk_codes(codigos)
+        return ranking.astype(object).where(ranking.notna(), None).to_dict('records')
+    
+    @staticmethod
+    def _reason_legend() -> List[Dict]:
+        """Bit, chave e texto de cada motivo de risco."""
+        return [
+            {'bit': 1 << i, 'chave': chave, 'texto': texto}
+            for i, (chave, _, _, _, texto) in enumerate(risk.RISK_REASONS)
+        ]
+    
+    @staticmethod
+    def calculate_risk_analysis(
+        features: risk.RiskFeatures,
+        pesos: Optional[Mapping[str, float]] = None,
+        limite: int = 100,
+        apenas_ativos: bool = True,
+        pagina: int = 1,
+        departamentos: Optional[Sequence[str]] = None,
+        faixas: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """
+        Calcula o TRI de todos os colaboradores e uma página do ranking.
+        
+        Args:
+            features: Matriz de fatores da base
+            pesos: Peso de cada fator (frações, ex.: {"perf": 0.3}); None = padrão
+            limite: Colaboradores por página do ranking
+            apenas_ativos: Considerar só colaboradores sem desligamento
+            pagina: Página do ranking (começa em 1)
+            departamentos: Filtra o ranking por departamento (None = todos)
+            faixas: Filtra o ranking por faixa de risco, ex.: ["60–80", "80–100"]
+        
+        Returns:
+            Dict com resumo e distribuição por faixa (sem os filtros do
+            ranking), página do ranking (com `codigo_motivo` em bits e o
+            texto em português), paginação, legenda dos bits em
+            `reason_codes` e pesos usados
+        
+        Raises:
+            ValueError: fator desconhecido, peso negativo ou faixa desconhecida
+        """
+        risco = features.score(pesos)
+        
+        linhas = np.flatnonzero(features.ativo) if apenas_ativos else np.arange(len(features))
+        resumo, distribuicao = risk.risk_summary(risco[linhas])
+        
+        filtradas = risk.filter_risk_rows(features, risco, departamentos, faixas, apenas_ativos)
+        ordem = risk.top_risk_page(risco, pagina, limite, filtradas)
+        
+        return {
+            'risk_summary': resumo,
+            'risk_distribution': [
+                {'faixa': faixa, 'percentual': round(float(pct), 1)}
+                for faixa, pct in distribuicao.items()
+            ],
+            'ranking': RiskScorer._ranking_records(features, ordem, risco[ordem]),
+            'pagination': {
+                'pagina': pagina,
+                'por_pagina': limite,
+                'total': int(len(filtradas)),
+                'paginas': -(-len(filtradas) // limite)
+            },
+            'reason_codes': RiskScorer._reason_legend(),
+            'weights': dict(zip(risk.RISK_FACTORS, risk.weight_vector(pesos).tolist()))
+        }
+    
+    @staticmethod
+    def calculate_weight_scenarios(
+        features: risk.RiskFeatures,
+        cenarios: Sequence[Optional[Mapping[str, float]]],
+        top_n: int = 10,
+        apenas_ativos: bool = True,
+        departamentos: Optional[Sequence[str]] = None,
+        faixas: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """
+        Compara vários conjuntos de pesos com um único produto de matrizes.
+        
+        Os filtros valem para todos os cenários. A faixa de risco de cada
+        colaborador é a do TRI com os pesos padrão, para que os cenários
+        comparem o mesmo grupo de pessoas.
+        
+        Args:
+            features: Matriz de fatores da base
+            cenarios: Pesos de cada cenário (frações; None = padrão)
+            top_n: Colaboradores de maior risco por cenário
+            apenas_ativos: Considerar só colaboradores sem desligamento
+            departamentos: Filtra por departamento (None = todos)
+            faixas: Filtra por faixa de risco, ex.: ["60–80", "80–100"]
+        
+        Returns:
+            Dict com 'scenarios' (pesos, risco_medio, pct_risco_alto e top de
+            cada cenário, na ordem recebida) e a legenda 'reason_codes'
+        
+        Raises:
+            ValueError: fator desconhecido, peso negativo, lista vazia ou
+                faixa desconhecida
+        """
+        linhas = risk.filter_risk_rows(features, features.score(), departamentos, faixas, apenas_ativos)
+        resultados = risk.evaluate_weight_scenarios(features, cenarios, top_n, linhas)
+        
+        return {
+            'scenarios': [
+                {
+                    'pesos': r['pesos'],
+                    'risco_medio': r['risco_medio'],
+                    'pct_risco_alto': r['pct_risco_alto'],
+                    'top': RiskScorer._ranking_records(features, r['top'], r['risco_top'])
+                }
+                for r in resultados
+            ],
+            'reason_codes': RiskScorer._reason_legend()
+        }
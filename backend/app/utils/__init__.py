@@ -1,6 +1,6 @@
 """
 Utilitários para processamento de dados e cálculos
 """
-from app.utils import data_loader, kpi_helpers
+from app.utils import data_loader
 
-__all__ = ['data_loader', 'kpi_helpers']
+__all__ = ['data_loader']
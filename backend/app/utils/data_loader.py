@@ -5,38 +5,392 @@ Migrado do Streamlit para FastAPI.
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import Dict, Tuple, Optional, List
+from typing import Callable, Dict, Tuple, Optional, List, Sequence, Iterable
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import PurePosixPath
+import csv
 import io
+import zipfile
+from openpyxl import load_workbook
+from app.config import settings
+from kpi_core.columns import canonical_column_name, col_like, DATE_COLS
+from kpi_core.exit_types import classify_exits
 
 
-DATE_COLS = ["data de admissão", "data de desligamento", "ultima promoção", "ultimo mérito"]
+# Abas usadas pelas análises (as demais não são lidas)
+SHEETS = ("empresa", "colaboradores", "performance")
 
+# Linhas convertidas por vez na leitura em streaming
+EXCEL_CHUNK_ROWS = 10000
 
-def col_like(df: pd.DataFrame, name: str) -> Optional[str]:
-    """Encontra coluna por nome (case-insensitive)."""
-    if df is None or df.empty:
-        return None
-    for c in df.columns:
-        if c.lower().strip() == name.lower().strip():
-            return c
-    return None
+# Colunas convertidas para datetime durante a leitura
+STREAM_DATE_COLS = DATE_COLS + ["data de encerramento do ciclo"]
 
+# Colunas de texto lidas como string nos arquivos CSV (sem inferência de tipo)
+CSV_TEXT_COLS = [
+    "nome", "departamento", "cargo",
+    "tipo desligamento", "motivo de desligamento"
+]
 
-def load_excel(file_content: bytes) -> Dict[str, pd.DataFrame]:
-    """Carrega arquivo Excel e retorna dicionário de abas."""
+# Formatos de data aceitos em CSV/Parquet, na ordem em que são tentados
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S")
+
+# Extensões aceitas no upload
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+TABULAR_EXTENSIONS = (".csv", ".parquet")
+
+# Assinatura de arquivo zip (.xlsx); .xls é binário e não é lido pelo openpyxl
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+def _match_sheets(nomes: Iterable[str], sheets: Sequence[str]) -> Dict[str, str]:
+    """Mapeia cada aba pedida para o nome real no arquivo (case-insensitive)."""
+    pedidas = {s.lower().strip(): s for s in sheets}
+    encontradas = {}
+    for nome in nomes:
+        chave = pedidas.get(str(nome).lower().strip())
+        if chave and chave not in encontradas:
+            encontradas[chave] = nome
+    return encontradas
+
+
+def _header_names(cabecalho: Sequence) -> List:
+    """
+    Nomes das colunas a partir da primeira linha, como o pandas: colunas
+    vazias no fim são descartadas, vazias no meio viram "Unnamed: i" e
+    nomes repetidos ganham sufixo ".1", ".2"...
+    """
+    nomes = list(cabecalho)
+    while nomes and nomes[-1] is None:
+        nomes.pop()
+    
+    resultado, vistos = [], {}
+    for i, nome in enumerate(nomes):
+        if nome is None:
+            nome = f"Unnamed: {i}"
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        resultado.append(nome)
+    return resultado
+
+
+def _chunk_columns(linhas: List[tuple], datas: List[bool]) -> List[pd.Series]:
+    """Converte um bloco de linhas em uma Series tipada por coluna."""
+    series = []
+    for valores, data in zip(zip(*linhas), datas):
+        if data:
+            serie = pd.to_datetime(pd.Series(valores, dtype=object), errors="coerce")
+        else:
+            serie = pd.Series(valores)
+            # Bloco só com vazios não deve transformar a coluna em object
+            if serie.dtype == object and serie.isna().all():
+                serie = serie.astype(float)
+            elif serie.dtype == object and serie.hasnans:
+                # Vazios como NaN, igual ao pd.read_excel
+                serie[serie.isna()] = np.nan
+        series.append(serie)
+    return series
+
+
+def _read_sheet_streaming(ws, chunk_rows: int) -> pd.DataFrame:
+    """
+    Lê uma aba em modo read-only, bloco a bloco.
+    
+    Só o bloco atual fica como objetos Python; cada bloco vira arrays
+    tipados (datas já convertidas) antes de ler o próximo. Linhas
+    totalmente vazias são ignoradas.
+    """
+    linhas_aba = ws.iter_rows(values_only=True)
+    cabecalho = next(linhas_aba, None)
+    if cabecalho is None:
+        return pd.DataFrame()
+    nomes = _header_names(cabecalho)
+    n_colunas = len(nomes)
+    if n_colunas == 0:
+        return pd.DataFrame()
+    
+    datas = [
+        isinstance(nome, str) and canonical_column_name(nome) in STREAM_DATE_COLS
+        for nome in nomes
+    ]
+    partes = [[] for _ in range(n_colunas)]
+    bloco = []
+    
+    def fechar_bloco():
+        for parte, serie in zip(partes, _chunk_columns(bloco, datas)):
+            parte.append(serie)
+        bloco.clear()
+    
+    for linha in linhas_aba:
+        if len(linha) != n_colunas:
+            linha = tuple(linha[:n_colunas]) + (None,) * (n_colunas - len(linha))
+        if all(v is None for v in linha):
+            continue
+        bloco.append(linha)
+        if len(bloco) >= chunk_rows:
+            fechar_bloco()
+    if bloco:
+        fechar_bloco()
+    
+    if not partes[0]:
+        return pd.DataFrame(columns=nomes)
+    colunas = {}
+    for nome, parte in zip(nomes, partes):
+        colunas[nome] = parte[0] if len(parte) == 1 else pd.concat(parte, ignore_index=True)
+        parte.clear()
+    return pd.DataFrame(colunas)
+
+
+def load_excel_streaming(
+    file_content: bytes,
+    sheets: Sequence[str] = SHEETS,
+    chunk_rows: int = EXCEL_CHUNK_ROWS
+) -> Dict[str, pd.DataFrame]:
+    """
+    Lê abas de um .xlsx em streaming (openpyxl read-only).
+    
+    O modelo de objetos da planilha nunca é montado: as linhas são lidas
+    em sequência e convertidas em blocos de `chunk_rows`, com as colunas
+    de data já em datetime. O pico de memória fica próximo do tamanho
+    dos DataFrames finais.
+    
+    Args:
+        file_content: Conteúdo do arquivo .xlsx
+        sheets: Abas a ler (nomes case-insensitive; as demais são ignoradas)
+        chunk_rows: Linhas por bloco de conversão
+    
+    Returns:
+        Dict com o nome pedido da aba -> DataFrame (só abas encontradas)
+    """
+    wb = load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+    try:
+        encontradas = _match_sheets(wb.sheetnames, sheets)
+        return {
+            chave: _read_sheet_streaming(wb[nome], chunk_rows)
+            for chave, nome in encontradas.items()
+        }
+    finally:
+        wb.close()
+
+
+def _run_parsers(
+    tarefas: Dict[str, Tuple[Callable, tuple]],
+    executor: Optional[Executor]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Executa um leitor por aba: em paralelo no `executor` (se houver mais de
+    uma aba) ou em sequência no próprio processo.
+    
+    Os leitores precisam ser funções de nível de módulo e receber só
+    argumentos serializáveis, para rodar em outro processo.
+    """
+    if executor is None or len(tarefas) < 2:
+        return {chave: leitor(*args) for chave, (leitor, args) in tarefas.items()}
+    futuros = {chave: executor.submit(leitor, *args) for chave, (leitor, args) in tarefas.items()}
+    return {chave: futuro.result() for chave, futuro in futuros.items()}
+
+
+def load_excel(file_content: bytes, sheets: Sequence[str] = SHEETS) -> Dict[str, pd.DataFrame]:
+    """
+    Carrega as abas usadas do arquivo Excel.
+    
+    Arquivos .xlsx são lidos em streaming; .xls usa o leitor do pandas.
+    A leitura é sempre no próprio processo: mandar o arquivo inteiro a cada
+    worker do pool (um por aba) multiplicaria o pico de memória.
+    """
+    try:
+        if file_content[:4] == _ZIP_MAGIC:
+            return load_excel_streaming(file_content, sheets)
+        with pd.ExcelFile(io.BytesIO(file_content)) as xls:
+            encontradas = _match_sheets(xls.sheet_names, sheets)
+            return {chave: xls.parse(nome) for chave, nome in encontradas.items()}
+    except Exception as e:
+        raise ValueError(f"Erro ao carregar arquivo: {e}")
+
+
+def _parse_dates(serie: pd.Series) -> pd.Series:
+    """
+    Converte texto em datetime com formato explícito.
+    
+    Usa o primeiro formato de DATE_FORMATS que reconhece todos os valores
+    preenchidos; se nenhum reconhecer, cai na inferência do pandas (dia
+    primeiro).
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    preenchidos = serie.notna().sum()
+    for formato in DATE_FORMATS:
+        convertida = pd.to_datetime(serie, format=formato, errors="coerce")
+        if convertida.notna().sum() == preenchidos:
+            return convertida
+    return pd.to_datetime(serie, errors="coerce", dayfirst=True)
+
+
+def _csv_dialect(amostra: bytes) -> Tuple[str, str, str]:
+    """
+    Encoding, separador e separador decimal a partir do início do arquivo.
+    
+    Exportações brasileiras costumam usar ";" com vírgula decimal e
+    latin-1; o separador é o mais frequente na linha de cabeçalho.
+    """
     try:
-        return pd.read_excel(io.BytesIO(file_content), sheet_name=None)
+        amostra.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # Amostra cortada no meio de um caractere multibyte ainda é utf-8
+        encoding = "utf-8-sig" if e.start >= len(amostra) - 3 else "latin-1"
+    cabecalho = amostra.decode(encoding, errors="ignore").splitlines()[0] if amostra else ""
+    sep = max([",", ";", "\t", "|"], key=cabecalho.count)
+    decimal = "," if sep == ";" else "."
+    return encoding, sep, decimal
+
+
+def load_csv(file_content: bytes) -> pd.DataFrame:
+    """
+    Lê uma aba exportada em CSV.
+    
+    Colunas de texto conhecidas (CSV_TEXT_COLS) são lidas como string e as
+    de data convertidas com formato explícito; as demais usam a inferência
+    do leitor C do pandas.
+    """
+    encoding, sep, decimal = _csv_dialect(file_content[:64 * 1024])
+    cabecalho = next(csv.reader(io.StringIO(
+        file_content[:64 * 1024].decode(encoding, errors="ignore").split("\n", 1)[0]
+    ), delimiter=sep), [])
+    texto = set(CSV_TEXT_COLS + STREAM_DATE_COLS)
+    dtype = {c: str for c in cabecalho if canonical_column_name(c) in texto}
+    
+    df = pd.read_csv(
+        io.BytesIO(file_content),
+        sep=sep,
+        decimal=decimal,
+        encoding=encoding,
+        dtype=dtype
+    )
+    return _convert_date_columns(df)
+
+
+def load_parquet(file_content: bytes) -> pd.DataFrame:
+    """Lê uma aba exportada em Parquet (datas em texto são convertidas)."""
+    return _convert_date_columns(pd.read_parquet(io.BytesIO(file_content)))
+
+
+def _convert_date_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte as colunas de data ainda não convertidas (no próprio DataFrame)."""
+    for c in STREAM_DATE_COLS:
+        col = col_like(df, c)
+        if col:
+            df[col] = _parse_dates(df[col])
+    return df
+
+
+def _load_tabular(file_content: bytes, extensao: str) -> pd.DataFrame:
+    """Lê um arquivo CSV ou Parquet conforme a extensão."""
+    if extensao == ".parquet":
+        return load_parquet(file_content)
+    return load_csv(file_content)
+
+
+def load_zip(
+    file_content: bytes,
+    sheets: Sequence[str] = SHEETS,
+    executor: Optional[Executor] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Lê um .zip com um arquivo CSV ou Parquet por aba.
+    
+    O nome do arquivo (sem extensão e sem pastas) é o nome da aba, ex.:
+    `colaboradores.csv`, `performance.parquet`; os demais são ignorados.
+    Com `executor`, os arquivos são lidos em paralelo.
+    
+    Raises:
+        ValueError: nenhuma aba encontrada ou arquivos descompactados acima
+            de settings.MAX_UNCOMPRESSED_SIZE (checado antes de ler)
+    """
+    with zipfile.ZipFile(io.BytesIO(file_content)) as arquivo:
+        membros = {}
+        for info in arquivo.infolist():
+            caminho = PurePosixPath(info.filename)
+            if info.is_dir() or caminho.name.startswith(".") or "__MACOSX" in caminho.parts:
+                continue
+            if caminho.suffix.lower() in TABULAR_EXTENSIONS:
+                membros.setdefault(caminho.stem, info)
+        
+        encontradas = _match_sheets(membros, sheets)
+        if not encontradas:
+            raise ValueError(
+                "O .zip deve conter arquivos .csv ou .parquet com os nomes das abas: "
+                + ", ".join(sheets)
+            )
+        
+        # Tamanho declarado no zip; zipfile não lê além dele (CRC falha)
+        limite = settings.MAX_UNCOMPRESSED_SIZE
+        tamanhos = {nome: membros[nome].file_size for nome in encontradas.values()}
+        if any(t > limite for t in tamanhos.values()) or sum(tamanhos.values()) > limite:
+            raise ValueError(
+                f"Arquivos do .zip excedem o limite de {limite // (1024 * 1024)} MB descompactados"
+            )
+        tarefas = {
+            chave: (_load_tabular, (
+                arquivo.read(membros[nome]),
+                PurePosixPath(membros[nome].filename).suffix.lower()
+            ))
+            for chave, nome in encontradas.items()
+        }
+    return _run_parsers(tarefas, executor)
+
+
+def load_sheets(
+    file_content: bytes,
+    filename: Optional[str] = None,
+    executor: Optional[Executor] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Carrega as abas conforme o formato do arquivo.
+    
+    Args:
+        file_content: Conteúdo do arquivo
+        filename: Nome original (define o formato pela extensão; None = Excel)
+        executor: Pool para ler em paralelo os arquivos de um .zip (None = em sequência)
+    
+    Returns:
+        Dict com o nome da aba -> DataFrame. Um .csv ou .parquet avulso
+        é a aba `colaboradores`; um .zip traz um arquivo por aba.
+    
+    Raises:
+        ValueError: formato não suportado ou erro de leitura
+    """
+    extensao = PurePosixPath(filename).suffix.lower() if filename else ".xlsx"
+    if extensao in EXCEL_EXTENSIONS:
+        return load_excel(file_content)
+    try:
+        if extensao == ".zip":
+            return load_zip(file_content, executor=executor)
+        if extensao in TABULAR_EXTENSIONS:
+            return {"colaboradores": _load_tabular(file_content, extensao)}
+    except (ValueError, BrokenProcessPool):
+        raise
     except Exception as e:
         raise ValueError(f"Erro ao carregar arquivo: {e}")
+    raise ValueError(f"Formato de arquivo não suportado: {extensao}")
 
 
 def to_datetime_safe(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
     """Converte colunas para datetime de forma segura."""
+    pendentes = [
+        col for col in (col_like(df, c) for c in cols)
+        if col and not pd.api.types.is_datetime64_any_dtype(df[col])
+    ]
+    # Colunas já convertidas na leitura não pedem cópia da base
+    if not pendentes:
+        return df
     df = df.copy()
-    for c in cols:
-        col = col_like(df, c)
-        if col:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in pendentes:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
     return df
 
 
@@ -67,6 +421,18 @@ def ensure_core_fields(colab: pd.DataFrame) -> pd.DataFrame:
         # Se não tiver data de admissão, não calcula tempo de casa
         colab["tempo_casa"] = np.nan
     
+    # Tipo de saída (0 = sem desligamento, 1 = voluntário, 2 = involuntário)
+    if desl_col:
+        tipo_col = col_like(colab, "tipo desligamento")
+        mot_col = col_like(colab, "motivo de desligamento")
+        colab["tipo_saida"] = classify_exits(
+            colab[desl_col],
+            tipo=colab[tipo_col] if tipo_col else None,
+            motivo=colab[mot_col] if mot_col else None
+        )
+    else:
+        colab["tipo_saida"] = 0
+    
     return colab
 
 
@@ -76,24 +442,24 @@ def merge_last_performance(colab: pd.DataFrame, perf: Optional[pd.DataFrame]) ->
         return colab
     
     p = perf.copy()
+    perf_mat = col_like(p, "matricula")
+    if not perf_mat:
+        return colab
     ciclo_col = col_like(p, "data de encerramento do ciclo")
     
     if ciclo_col:
         p[ciclo_col] = pd.to_datetime(p[ciclo_col], errors="coerce")
-        last = p.sort_values(["matricula", ciclo_col]).groupby("matricula", as_index=False).tail(1)
+        last = p.sort_values([perf_mat, ciclo_col]).groupby(perf_mat, as_index=False).tail(1)
     else:
-        mat_col = col_like(p, "matricula")
-        if mat_col:
-            last = p.drop_duplicates(subset=[mat_col], keep="last")
-        else:
-            return colab
+        last = p.drop_duplicates(subset=[perf_mat], keep="last")
     
     aval_col = col_like(last, "avaliação")
     mat_col = col_like(colab, "matricula")
     
     if aval_col and mat_col:
+        # As abas podem escrever a matrícula de formas diferentes
         colab = colab.merge(
-            last[[mat_col, aval_col]], 
+            last[[perf_mat, aval_col]].rename(columns={perf_mat: mat_col}), 
             on=mat_col, 
             how="left"
         )
@@ -101,12 +467,18 @@ def merge_last_performance(colab: pd.DataFrame, perf: Optional[pd.DataFrame]) ->
     return colab
 
 
-def load_and_prepare(file_content: bytes) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def load_and_prepare(
+    file_content: bytes,
+    filename: Optional[str] = None,
+    executor: Optional[Executor] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
-    Carrega e prepara dados.
+    Carrega e prepara dados (Excel, CSV, Parquet ou .zip de CSV/Parquet).
+    Os arquivos de um .zip podem ser lidos em paralelo no `executor`; a
+    preparação roda no processo atual.
     Retorna: (empresa, colaboradores, performance)
     """
-    sheets = load_excel(file_content)
+    sheets = load_sheets(file_content, filename, executor)
     
     empresa = sheets.get("empresa", pd.DataFrame())
     colab = sheets.get("colaboradores", pd.DataFrame())
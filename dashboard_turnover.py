@@ -9,10 +9,22 @@ import plotly.graph_objects as go
 from utils import (
     load_and_prepare,
     validate_calculations,
-    col_like,
+    col_like
+)
+# Cálculos de KPIs (núcleo compartilhado com a API)
+from kpi_core import (
     calculate_turnover,
     calculate_turnover_by_period,
+    calculate_turnover_matrix,
+    turnover_from_matrix,
     calculate_turnover_history,
+    calculate_turnover_history_by_group,
+    calculate_rolling_turnover,
+    calculate_turnover_forecast,
+    detect_turnover_anomalies,
+    calculate_retention_curves,
+    calculate_retention_summary,
+    HIRE_YEAR_GROUP,
     calculate_tenure,
     calculate_headcount,
     calculate_headcount_temporal,
@@ -22,7 +34,17 @@ from utils import (
     calculate_contract_types,
     calculate_monthly_dismissals,
     safe_mean,
-    norm_0_1
+    RISK_FACTORS,
+    RISK_BAND_LABELS,
+    DEFAULT_RISK_WEIGHTS,
+    build_risk_features,
+    evaluate_weight_scenarios,
+    explain_risk_codes,
+    filter_risk_rows,
+    top_risk_page,
+    prepare_workforce,
+    build_org_hierarchy,
+    calculate_manager_turnover
 )
 from utils.subscription import (
     get_user_subscription,
@@ -284,6 +306,40 @@ st.markdown("---")
 # =========================================================
 # VIEWS
 # =========================================================
+# Colunas de status refeitas a cada troca de competência (não afetam o turnover)
+COLUNAS_COMPETENCIA = ["ativo", "desligado_no_mes"]
+
+
+@st.cache_data(show_spinner=False)
+def turnover_matrix_cached(df):
+    """Turnover de todas as competências; só recalcula quando a base muda."""
+    return calculate_turnover_matrix(df)
+
+
+def turnover_by_period_cached(df, ano_filtro=None, mes_filtro=None):
+    """
+    Turnover do filtro de competência lido da matriz em cache.
+    
+    Trocar ano/mês na sidebar não recalcula nada; se o ano estiver fora da
+    série da base, calcula direto.
+    """
+    base = df.drop(columns=[c for c in COLUNAS_COMPETENCIA if c in df.columns])
+    resultado = turnover_from_matrix(turnover_matrix_cached(base), ano_filtro, mes_filtro)
+    if resultado is None:
+        resultado = calculate_turnover_by_period(base, ano_filtro, mes_filtro)
+    return resultado
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _risk_features_cached(df):
+    return build_risk_features(df)
+
+
+def risk_features_cached(df):
+    """Matriz de fatores do TRI; mover os pesos não reconstrói a matriz."""
+    return _risk_features_cached(df.drop(columns=[c for c in COLUNAS_COMPETENCIA if c in df.columns]))
+
+
 def view_overview(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     """
     Visão geral com análise do período filtrado e comparação com total.
@@ -299,6 +355,9 @@ def view_overview(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     if df_total is None:
         df_total = dfv
     
+    # Preparar a base uma única vez para todos os cálculos da view
+    wf = prepare_workforce(dfv)
+    
     # Determinar período selecionado
     periodo_txt = "Todo o período"
     if ano_filtro is not None and mes_filtro is not None:
@@ -322,7 +381,7 @@ def view_overview(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # 1. HEADCOUNT ATUAL
     # ============================================================
     st.markdown("### 👥 Headcount Atual")
-    basic_kpis = calculate_basic_kpis(dfv)
+    basic_kpis = calculate_basic_kpis(wf)
     
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Total Ativos", basic_kpis["total_ativos"])
@@ -336,7 +395,7 @@ def view_overview(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # 2. TIPOS DE CONTRATO (TODOS COM % E QUANTIDADE)
     # ============================================================
     st.markdown("### 📋 Tipos de Contrato")
-    contract_types = calculate_contract_types(dfv)
+    contract_types = calculate_contract_types(wf)
     
     if not contract_types.empty:
         # Mostrar métricas principais
@@ -365,10 +424,10 @@ def view_overview(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # Calcular turnover do período selecionado
     # Se só mês selecionado, usar df_total para pegar todos os anos, senão usar dfv
     df_para_calculo = df_total if (mes_filtro is not None and ano_filtro is None) else dfv
-    turnover_periodo = calculate_turnover_by_period(df_para_calculo, ano_filtro, mes_filtro)
+    turnover_periodo = turnover_by_period_cached(df_para_calculo, ano_filtro, mes_filtro)
     
     # Calcular turnover total (sem filtros) para comparação (sempre usar df_total)
-    turnover_total_geral = calculate_turnover_by_period(df_total, None, None)
+    turnover_total_geral = turnover_by_period_cached(df_total, None, None)
     
     # Mostrar período selecionado
     st.markdown(f"#### 📅 Período Selecionado: {periodo_txt}")
@@ -469,7 +528,7 @@ def view_overview(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # 4. DESLIGAMENTOS MÉDIOS POR MÊS
     # ============================================================
     st.markdown("### 📊 Desligamentos por Mês")
-    dismissals_data = calculate_monthly_dismissals(dfv)
+    dismissals_data = calculate_monthly_dismissals(wf)
     
     c21, c22, c23 = st.columns(3)
     c21.metric("Desligamentos Médios/mês", f"{dismissals_data['desligamentos_medio_mes']:.1f}")
@@ -482,7 +541,7 @@ def view_overview(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # 5. TENURE MÉDIO
     # ============================================================
     st.markdown("### ⏳ Tenure (Tempo Médio até Desligamento)")
-    tenure_data = calculate_tenure(dfv)
+    tenure_data = calculate_tenure(wf)
     
     c24, c25, c26 = st.columns(3)
     c24.metric("Tenure Médio Total (meses)", f"{tenure_data['tenure_total']:.1f}")
@@ -534,6 +593,10 @@ def view_headcount(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     if df_total is None:
         df_total = dfv
     
+    # Preparar as bases uma única vez para todos os cálculos da view
+    wf = prepare_workforce(dfv)
+    wf_total = wf if df_total is dfv else prepare_workforce(df_total)
+    
     # Determinar período
     periodo_txt = "Todo o período"
     meses_map = {
@@ -562,14 +625,14 @@ def view_headcount(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     elif ano_filtro is not None:
         data_ref = pd.Timestamp(int(ano_filtro), 12, 31)
     
-    dist = calculate_headcount(dfv if data_ref is None else df_total, "departamento", data_ref)
+    dist = calculate_headcount(wf if data_ref is None else wf_total, "departamento", data_ref)
     
     if dist.empty:
         st.info("Sem dados suficientes para calcular headcount por departamento.")
     else:
         # Comparação com total se houver filtro
         if ano_filtro is not None or mes_filtro is not None:
-            dist_total = calculate_headcount(df_total, "departamento", None)
+            dist_total = calculate_headcount(wf_total, "departamento", None)
             
             if not dist_total.empty:
                 # Mesclar para comparar
@@ -624,7 +687,7 @@ def view_headcount(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # ============================================================
     st.markdown("### 📈 Evolução Temporal do Headcount por Departamento")
     
-    hc_temporal = calculate_headcount_temporal(df_total, "departamento")
+    hc_temporal = calculate_headcount_temporal(wf_total, "departamento")
     
     if not hc_temporal.empty:
         # Filtrar período se necessário para comparação
@@ -837,7 +900,7 @@ def view_headcount(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # ============================================================
     st.markdown("### 👥 Análise por Gênero ao Longo do Tempo")
     
-    hc_genero = calculate_headcount_by_dimension_temporal(df_total, "genero")
+    hc_genero = calculate_headcount_by_dimension_temporal(wf_total, "genero")
     
     if not hc_genero.empty:
         fig4 = px.line(
@@ -859,7 +922,7 @@ def view_headcount(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
         # Distribuição atual por gênero
         gen_col = col_like(dfv, "genero")
         if gen_col:
-            dist_genero = calculate_headcount(dfv if data_ref is None else df_total, "genero", data_ref)
+            dist_genero = calculate_headcount(wf if data_ref is None else wf_total, "genero", data_ref)
             if not dist_genero.empty:
                 c1, c2 = st.columns(2)
                 
@@ -913,7 +976,7 @@ def view_headcount(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # ============================================================
     st.markdown("### ⏳ Análise por Tempo de Casa ao Longo do Tempo")
     
-    hc_tempo_casa = calculate_headcount_by_dimension_temporal(df_total, "tempo_casa")
+    hc_tempo_casa = calculate_headcount_by_dimension_temporal(wf_total, "tempo_casa")
     
     if not hc_tempo_casa.empty:
         fig6 = px.area(
@@ -963,7 +1026,7 @@ def view_headcount(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # ============================================================
     st.markdown("### ⭐ Análise por Performance ao Longo do Tempo")
     
-    hc_performance = calculate_headcount_by_dimension_temporal(df_total, "avaliacao")
+    hc_performance = calculate_headcount_by_dimension_temporal(wf_total, "avaliacao")
     
     if not hc_performance.empty:
         fig8 = px.line(
@@ -1033,6 +1096,10 @@ def view_turnover(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     
     if df_total is None:
         df_total = dfv
+    
+    # Preparar as bases uma única vez para todos os cálculos da view
+    wf = prepare_workforce(dfv)
+    wf_total = wf if df_total is dfv else prepare_workforce(df_total)
 
     # ============================================================
     # 🔹 Análise do Período Selecionado
@@ -1053,7 +1120,7 @@ def view_turnover(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     
     # Se só mês selecionado, usar df_total para pegar todos os anos
     df_para_calculo = df_total if (mes_filtro is not None and ano_filtro is None) else dfv
-    turnover_data = calculate_turnover_by_period(df_para_calculo, ano_filtro, mes_filtro)
+    turnover_data = turnover_by_period_cached(df_para_calculo, ano_filtro, mes_filtro)
     
     st.markdown(f"### 📅 Indicadores do Período Selecionado: {periodo_txt}")
     c1, c2, c3, c4 = st.columns(4)
@@ -1073,7 +1140,7 @@ def view_turnover(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     # 🔸 Construção do histórico completo (usando módulo)
     # ============================================================
     # Usar df_total para histórico completo se houver filtro
-    turn = calculate_turnover_history(df_total if (ano_filtro is not None or mes_filtro is not None) else dfv)
+    turn = calculate_turnover_history(wf_total if (ano_filtro is not None or mes_filtro is not None) else wf)
 
     if turn.empty:
         st.warning("Sem dados suficientes para gerar histórico.")
@@ -1142,10 +1209,155 @@ def view_turnover(dfv, ano_filtro=None, mes_filtro=None, df_total=None):
     )
     st.plotly_chart(fig2, use_container_width=True)
 
+    # ============================================================
+    # 🔁 Gráfico 2b: Admissões x Desligamentos (fluxo)
+    # ============================================================
+    st.markdown("### 🔁 Admissões x Desligamentos")
+    total_adm = int(turn["Admissões"].sum())
+    total_desl = int(turn["Desligados"].sum())
+    c_f1, c_f2, c_f3, c_f4 = st.columns(4)
+    c_f1.metric("Admissões (total)", total_adm)
+    c_f2.metric("Desligamentos (total)", total_desl)
+    c_f3.metric("Saldo", f"{total_adm - total_desl:+d}")
+    c_f4.metric("Taxa de Reposição", f"{(total_adm / total_desl * 100) if total_desl else 0:.1f}%")
+
+    fig_fluxo = go.Figure()
+    fig_fluxo.add_trace(go.Bar(x=turn["Mês"], y=turn["Admissões"], name="Admissões", marker_color="rgba(0,255,153,0.6)"))
+    fig_fluxo.add_trace(go.Bar(x=turn["Mês"], y=-turn["Desligados"], name="Desligados", marker_color="rgba(255,80,80,0.7)"))
+    fig_fluxo.add_trace(go.Scatter(
+        x=turn["Mês"], y=turn["Saldo (Admissões - Desligados)"],
+        mode="lines", name="Saldo",
+        line=dict(color="#00FFFF", width=2)
+    ))
+    fig_fluxo.update_layout(
+        barmode="relative",
+        template="plotly_dark",
+        title="🔁 Entradas x Saídas por Mês (saídas em negativo)",
+        xaxis_title="Mês",
+        yaxis_title="Quantidade",
+        hovermode="x unified"
+    )
+    st.plotly_chart(fig_fluxo, use_container_width=True)
+
+    fluxo_dept = calculate_turnover_history_by_group(
+        wf_total if (ano_filtro is not None or mes_filtro is not None) else wf, "departamento"
+    )
+    if not fluxo_dept.empty:
+        dept_col = fluxo_dept.columns[0]
+        with st.expander("🏢 Fluxo por departamento"):
+            resumo_fluxo = fluxo_dept.groupby(dept_col)[["Admissões", "Desligados"]].sum()
+            resumo_fluxo["Saldo"] = resumo_fluxo["Admissões"] - resumo_fluxo["Desligados"]
+            resumo_fluxo["Taxa de Reposição (%)"] = (
+                resumo_fluxo["Admissões"] / resumo_fluxo["Desligados"].where(resumo_fluxo["Desligados"] > 0) * 100
+            ).round(1)
+            st.dataframe(
+                resumo_fluxo.sort_values("Saldo").reset_index(),
+                use_container_width=True, hide_index=True
+            )
+
+    # ============================================================
+    # 📈 Gráfico 3: Turnover em janela móvel (ex.: últimos 12 meses)
+    # ============================================================
+    st.markdown("### 📈 Turnover Acumulado (Janela Móvel)")
+    c_jan, c_anual = st.columns(2)
+    janela = c_jan.selectbox("Janela (meses)", [12, 6, 3, 24], index=0, key="turnover_janela")
+    anualizacao = c_anual.selectbox(
+        "Anualização",
+        ["linear", "composta", "nenhuma"],
+        format_func=lambda m: {"linear": "Linear (× 12 / janela)", "composta": "Composta", "nenhuma": "Sem anualizar"}[m],
+        key="turnover_anualizacao"
+    )
+
+    wf_hist = wf_total if (ano_filtro is not None or mes_filtro is not None) else wf
+    rolling = calculate_rolling_turnover(wf_hist, janela, anualizacao)
+
+    if rolling.empty:
+        st.info(f"ℹ️ Histórico menor que {janela} meses — não há janela completa para calcular.")
+    else:
+        ultimo = rolling.iloc[-1]
+        c_r1, c_r2, c_r3 = st.columns(3)
+        c_r1.metric(f"Turnover {janela}m ({ultimo['Mês']})", f"{ultimo['Turnover Total (%)']:.1f}%")
+        c_r2.metric("Voluntário", f"{ultimo['Turnover Voluntário (%)']:.1f}%")
+        c_r3.metric("Involuntário", f"{ultimo['Turnover Involuntário (%)']:.1f}%")
+
+        fig3 = go.Figure()
+        fig3.add_trace(go.Scatter(
+            x=rolling["Mês"], y=rolling["Turnover Total (%)"],
+            mode="lines", name="Total",
+            line=dict(color="#00FFFF", width=3)
+        ))
+        fig3.add_trace(go.Scatter(
+            x=rolling["Mês"], y=rolling["Turnover Voluntário (%)"],
+            mode="lines", name="Voluntário",
+            line=dict(color="#FFD700", dash="dash")
+        ))
+        fig3.add_trace(go.Scatter(
+            x=rolling["Mês"], y=rolling["Turnover Involuntário (%)"],
+            mode="lines", name="Involuntário",
+            line=dict(color="#FF4500", dash="dot")
+        ))
+        fig3.update_layout(
+            template="plotly_dark",
+            title=f"📈 Turnover dos Últimos {janela} Meses (%)",
+            xaxis_title="Mês (fim da janela)",
+            yaxis_title="Turnover (%)",
+            hovermode="x unified"
+        )
+        st.plotly_chart(fig3, use_container_width=True)
+
+        # Por departamento
+        rolling_dept = calculate_rolling_turnover(wf_hist, janela, anualizacao, "departamento")
+        if not rolling_dept.empty:
+            dept_col = rolling_dept.columns[0]
+            with st.expander(f"🏢 Turnover {janela}m por departamento"):
+                fig4 = px.line(
+                    rolling_dept, x="Mês", y="Turnover Total (%)", color=dept_col,
+                    template="plotly_dark",
+                    title=f"Turnover dos Últimos {janela} Meses por Departamento (%)"
+                )
+                st.plotly_chart(fig4, use_container_width=True)
+                ultimo_mes = rolling_dept.groupby(dept_col)["Mês"].transform("max") == rolling_dept["Mês"]
+                st.dataframe(
+                    rolling_dept[ultimo_mes].sort_values("Turnover Total (%)", ascending=False),
+                    use_container_width=True, hide_index=True
+                )
+
+    # ============================================================
+    # 🧬 Curvas de retenção (Kaplan-Meier)
+    # ============================================================
+    st.markdown("### 🧬 Retenção por Tempo de Casa (Curvas de Sobrevivência)")
+    st.caption("Probabilidade de o colaborador seguir na empresa após N meses de casa; ativos entram como censurados.")
+    dimensoes_retencao = {
+        "Geral": None,
+        "Departamento": "departamento",
+        "Tipo de Contrato": "tipo_contrato",
+        "Ano de Admissão": HIRE_YEAR_GROUP
+    }
+    dim_sel = st.selectbox("Separar por", list(dimensoes_retencao), key="retencao_dimensao")
+    dim_ret = dimensoes_retencao[dim_sel]
+
+    curvas = calculate_retention_curves(wf, dim_ret)
+    if curvas.empty:
+        st.info("ℹ️ Sem admissões válidas para calcular a retenção.")
+    else:
+        cor = curvas.columns[0] if dim_ret is not None else None
+        fig_ret = px.line(
+            curvas, x="Mês de Casa", y="Retenção (%)", color=cor,
+            line_shape="hv", template="plotly_dark",
+            hover_data=["Em Risco", "Desligamentos"],
+            title="🧬 Curva de Retenção (Kaplan-Meier)"
+        )
+        fig_ret.update_layout(yaxis_range=[0, 100], hovermode="x unified")
+        st.plotly_chart(fig_ret, use_container_width=True)
+
+        resumo_ret = calculate_retention_summary(wf, dim_ret)
+        with st.expander("📋 Retenção nos marcos de tempo de casa"):
+            st.dataframe(resumo_ret, use_container_width=True, hide_index=True)
+
     # ============================================================
     # ⏳ Tenure até o desligamento (usando módulo)
     # ============================================================
-    tenure_data = calculate_tenure(dfv)
+    tenure_data = calculate_tenure(wf)
 
     st.markdown("### ⏳ Tempo Médio até o Desligamento (Tenure)")
     c5, c6, c7 = st.columns(3)
@@ -1192,32 +1404,10 @@ def view_risk(dfv):
     # ============================================
     # CONFIGURAÇÃO DE VARIÁVEIS BASE
     # ============================================
-    now = pd.Timestamp.now()
-    dfv["meses_desde_promocao"] = (
-        now - pd.to_datetime(dfv.get("ultima promoção"), errors="coerce")
-    ).dt.days / 30 if "ultima promoção" in dfv.columns else 0
-    dfv["meses_desde_merito"] = (
-        now - pd.to_datetime(dfv.get("ultimo mérito"), errors="coerce")
-    ).dt.days / 30 if "ultimo mérito" in dfv.columns else 0
-
-    # Tamanho da equipe (auto cálculo)
-    if "matricula do gestor" in dfv.columns:
-        gsize = dfv.groupby("matricula do gestor")["matricula"].count().rename("tamanho_equipe_calc")
-        dfv = dfv.merge(gsize, left_on="matricula do gestor", right_index=True, how="left")
-        dfv["tamanho_equipe"] = dfv["tamanho_equipe_calc"].fillna(0)
-    else:
-        dfv["tamanho_equipe"] = 0
-
-    # Performance
-    perf_map = {"excepcional":10, "acima do esperado":7, "dentro do esperado":4, "abaixo do esperado":1}
-    dfv["score_perf_raw"] = dfv.get("avaliação", "").astype(str).str.lower().map(perf_map).fillna(4)
-
-    # Normalização
-    dfv["score_perf_inv"] = 1 - norm_0_1(dfv["score_perf_raw"])
-    dfv["score_tempo_promo"] = norm_0_1(dfv["meses_desde_promocao"])
-    dfv["score_tempo_casa"] = norm_0_1(dfv.get("tempo_casa", 0))
-    dfv["score_merito"] = norm_0_1(dfv["meses_desde_merito"])
-    dfv["score_tamanho_eq"] = norm_0_1(dfv["tamanho_equipe"])
+    # Matriz de fatores normalizados (0–1), montada uma vez por base
+    features = risk_features_cached(dfv)
+    dfv = dfv.copy()
+    dfv["meses_desde_promocao"] = features.brutos["meses_desde_promocao"]
 
     # ============================================
     # CONTROLES INTERATIVOS DE PESO
@@ -1241,14 +1431,7 @@ def view_risk(dfv):
     # ============================================
     # CÁLCULO DO RISCO (TRI)
     # ============================================
-    dfv["risco_turnover"] = (
-        weights["perf"] * dfv["score_perf_inv"] +
-        weights["promo"] * dfv["score_tempo_promo"] +
-        weights["casa"] * dfv["score_tempo_casa"] +
-        weights["eq"] * dfv["score_tamanho_eq"] +
-        weights["merito"] * dfv["score_merito"]
-    ) * 100
-    dfv["risco_turnover"] = dfv["risco_turnover"].clip(0, 100)
+    dfv["risco_turnover"] = features.score(weights)
 
     avg_risk = safe_mean(dfv["risco_turnover"])
     pct_high = round((dfv["risco_turnover"] > 60).mean() * 100, 1)
@@ -1257,6 +1440,50 @@ def view_risk(dfv):
     c1.metric("⚠️ Risco Médio (TRI)", f"{avg_risk}%")
     c2.metric("🚨 % Risco Alto", f"{pct_high}%")
 
+    # ============================================
+    # SIMULAÇÃO DE CENÁRIOS DE PESOS (WHAT-IF)
+    # ============================================
+    with st.expander("🧪 Comparar cenários de pesos", expanded=False):
+        st.caption("Pesos em %. Todos os cenários são calculados de uma vez sobre os mesmos fatores.")
+        cenarios_padrao = pd.DataFrame([
+            {"Cenário": "Atual", **{f: round(w * 100) for f, w in weights.items()}},
+            {"Cenário": "Padrão", **{f: round(w * 100) for f, w in DEFAULT_RISK_WEIGHTS.items()}},
+            {"Cenário": "Foco em performance", "perf": 60, "promo": 10, "casa": 10, "eq": 10, "merito": 10},
+            {"Cenário": "Foco em carreira", "perf": 20, "promo": 40, "casa": 0, "eq": 0, "merito": 40}
+        ])
+        cenarios = st.data_editor(
+            cenarios_padrao,
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            key="risco_cenarios",
+            column_config={
+                "perf": st.column_config.NumberColumn("Performance", min_value=0, max_value=100),
+                "promo": st.column_config.NumberColumn("Tempo s/ Promoção", min_value=0, max_value=100),
+                "casa": st.column_config.NumberColumn("Tempo de Casa", min_value=0, max_value=100),
+                "eq": st.column_config.NumberColumn("Tam. Equipe", min_value=0, max_value=100),
+                "merito": st.column_config.NumberColumn("Tempo s/ Mérito", min_value=0, max_value=100)
+            }
+        ).dropna(subset=list(RISK_FACTORS), how="all")
+
+        if not cenarios.empty:
+            pesos_cenarios = [
+                {f: float(linha[f]) / 100 if pd.notna(linha[f]) else 0.0 for f in RISK_FACTORS}
+                for _, linha in cenarios.iterrows()
+            ]
+            resultados = evaluate_weight_scenarios(features, pesos_cenarios, top_n=5)
+            nomes = dfv["nome"].to_numpy() if "nome" in dfv.columns else None
+            comparacao = pd.DataFrame([
+                {
+                    "Cenário": nome_cenario,
+                    "Risco Médio (%)": r["risco_medio"],
+                    "% Risco Alto": r["pct_risco_alto"],
+                    "Top 5": ", ".join(map(str, nomes[r["top"]])) if nomes is not None else ""
+                }
+                for nome_cenario, r in zip(cenarios["Cenário"].fillna("—"), resultados)
+            ])
+            st.dataframe(comparacao, use_container_width=True, hide_index=True)
+
     st.divider()
 
     # ============================================
@@ -1292,29 +1519,62 @@ def view_risk(dfv):
     fig_risco.update_layout(template="plotly_dark")
     st.plotly_chart(fig_risco, use_container_width=True)
 
+    # ============================================
+    # TURNOVER POR ESTRUTURA (CADEIA DE GESTÃO)
+    # ============================================
+    st.markdown("### 🏢 Turnover por Estrutura de Gestão")
+    st.caption("Considera toda a cadeia abaixo de cada gestor (liderados diretos e indiretos).")
+    hierarquia = build_org_hierarchy(dfv)
+    if hierarquia is None:
+        st.info("ℹ️ Faltam as colunas de matrícula e matrícula do gestor para montar a hierarquia.")
+    else:
+        if len(hierarquia.orfaos):
+            st.warning(
+                f"⚠️ {len(hierarquia.orfaos)} colaborador(es) com gestor que não está na base "
+                "(tratados como topo da estrutura)."
+            )
+        if hierarquia.ciclos:
+            st.error(
+                f"🔁 {len(hierarquia.ciclos)} ciclo(s) na cadeia de gestão — esses colaboradores ficam fora da análise: "
+                + "; ".join(" → ".join(ciclo[:6]) + (" …" if len(ciclo) > 6 else "") for ciclo in hierarquia.ciclos[:5])
+            )
+        c_per, c_min = st.columns(2)
+        periodo_estrutura = c_per.selectbox("Período (meses)", [12, 6, 3, 24], index=0, key="estrutura_periodo")
+        minimo_estrutura = c_min.number_input("Headcount mínimo da estrutura", min_value=0, value=5, step=1, key="estrutura_minimo")
+        por_gestor = calculate_manager_turnover(dfv, periodo_estrutura, hierarquia=hierarquia)
+        if por_gestor.empty:
+            st.info("ℹ️ Nenhum gestor com liderados na hierarquia.")
+        else:
+            por_gestor = por_gestor[por_gestor["Headcount Início"] >= minimo_estrutura]
+            st.dataframe(por_gestor.head(50), use_container_width=True, hide_index=True)
+
     # ============================================
     # ANÁLISE INDIVIDUAL / ANALÍTICO
     # ============================================
     st.markdown("### 🧾 Análise Individual de Risco")
 
-    def explain_risk(row):
-        motivos = []
-        if row["score_perf_inv"] > 0.6: motivos.append("baixa performance")
-        if row["score_tempo_promo"] > 0.6: motivos.append("muito tempo sem promoção")
-        if row["score_tamanho_eq"] > 0.6: motivos.append("gestor com equipe grande")
-        if row["score_merito"] > 0.6: motivos.append("sem mérito recente")
-        if row["score_tempo_casa"] < 0.2: motivos.append("pouco tempo de casa (fase inicial)")
-        if not motivos: return "Perfil estável"
-        return ", ".join(motivos).capitalize()
+    f_dep, f_faixa, f_pag, f_tam = st.columns([3, 3, 1, 1])
+    departamentos = sorted(dfv["departamento"].dropna().astype(str).unique()) if "departamento" in dfv.columns else []
+    sel_departamentos = f_dep.multiselect("Departamento", departamentos, key="risco_departamentos")
+    sel_faixas = f_faixa.multiselect("Faixa de risco", RISK_BAND_LABELS, key="risco_faixas")
+    por_pagina = f_tam.selectbox("Por página", [25, 50, 100, 200], index=1, key="risco_por_pagina")
 
-    dfv["motivo_risco"] = dfv.apply(explain_risk, axis=1)
+    # Só a página pedida é ordenada, explicada e enviada ao navegador
+    risco = dfv["risco_turnover"].to_numpy()
+    linhas = filter_risk_rows(features, risco, sel_departamentos or None, sel_faixas or None)
+    total_paginas = max(1, -(-len(linhas) // por_pagina))
+    pagina = min(int(f_pag.number_input("Página", min_value=1, value=1, step=1, key="risco_pagina")), total_paginas)
+    pagina_linhas = top_risk_page(risco, pagina, por_pagina, linhas)
 
     cols_show = [
-        c for c in ["nome", "departamento", "cargo", "avaliação", "risco_turnover", "motivo_risco"]
+        c for c in ["nome", "departamento", "cargo", "avaliação", "risco_turnover"]
         if c in dfv.columns
     ]
+    tabela = dfv.iloc[pagina_linhas][cols_show].reset_index(drop=True)
+    tabela["motivo_risco"] = explain_risk_codes(features.reason_codes(pagina_linhas))
+    st.caption(f"{len(linhas)} colaborador(es) — página {pagina} de {total_paginas}")
     st.dataframe(
-        dfv[cols_show].sort_values("risco_turnover", ascending=False).reset_index(drop=True),
+        tabela,
         use_container_width=True,
         hide_index=True
     )
@@ -1356,6 +1616,14 @@ def view_ai(dfv):
         
         if not insights["alertas"] and not insights["tendencias"] and not insights["recomendacoes"]:
             st.info("✅ Nenhum insight crítico identificado. Os indicadores estão dentro dos parâmetros normais.")
+        
+        with st.expander("🔎 Anomalias de turnover por departamento × cargo"):
+            st.caption("Células com turnover fora do padrão da própria série (z-score robusto e EWMA).")
+            anomalias = detect_turnover_anomalies(dfv, top_n=20)
+            if anomalias.empty:
+                st.info("✅ Nenhuma anomalia encontrada.")
+            else:
+                st.dataframe(anomalias.round(2), use_container_width=True, hide_index=True)
     
     with tab2:
         st.markdown("### Apresentação Automática")
@@ -1377,8 +1645,12 @@ def view_ai(dfv):
         st.markdown("### Análise Preditiva de Turnover")
         st.caption("Previsão baseada em padrões históricos identificados nos dados.")
         
+        c_hor, c_saz = st.columns(2)
+        horizonte = c_hor.slider("Meses de previsão", 3, 12, 3, key="previsao_horizonte")
+        sazonal = c_saz.checkbox("Considerar sazonalidade mensal", value=False, key="previsao_sazonal")
+        
         with st.spinner("Gerando análise preditiva..."):
-            pred = generate_predictive_analysis(dfv)
+            pred = generate_predictive_analysis(dfv, horizonte=horizonte, sazonal=sazonal)
         
         if "mensagem" in pred:
             st.info(pred["mensagem"])
@@ -1394,6 +1666,46 @@ def view_ai(dfv):
             st.markdown(f"**Tendência Identificada:** {pred['tendencia'].upper()}")
             if "coeficiente_tendencia" in pred:
                 st.caption(f"Coeficiente de tendência: {pred['coeficiente_tendencia']}")
+        
+        if pred.get("previsao"):
+            previsao = pd.DataFrame(pred["previsao"])
+            historico = calculate_turnover_history(dfv).tail(24)
+            fig_prev = go.Figure()
+            fig_prev.add_trace(go.Scatter(
+                x=historico["Mês"], y=historico["Turnover Total (%)"],
+                mode="lines+markers", name="Histórico"
+            ))
+            fig_prev.add_trace(go.Scatter(
+                x=list(previsao["Mês"]) + list(previsao["Mês"][::-1]),
+                y=list(previsao["Limite Superior (%)"]) + list(previsao["Limite Inferior (%)"][::-1]),
+                fill="toself", line=dict(width=0), opacity=0.25, name="Intervalo 95%"
+            ))
+            fig_prev.add_trace(go.Scatter(
+                x=previsao["Mês"], y=previsao["Previsão (%)"],
+                mode="lines+markers", line=dict(dash="dash"), name="Previsão"
+            ))
+            fig_prev.update_layout(template="plotly_dark", title="🔮 Turnover Mensal — Histórico e Previsão", yaxis_title="%")
+            st.plotly_chart(fig_prev, use_container_width=True)
+        
+        # Todas as séries da dimensão são ajustadas juntas
+        st.markdown("#### Previsão por Departamento / Cargo")
+        dimensao_prev = st.selectbox("Dimensão", ["departamento", "cargo"], key="previsao_dimensao")
+        por_grupo = calculate_turnover_forecast(dfv, dimensao_prev, horizonte=horizonte, sazonal=sazonal)
+        if por_grupo.empty:
+            st.info("ℹ️ Nenhum grupo com histórico suficiente para previsão.")
+        else:
+            col_grupo = por_grupo.columns[0]
+            resumo_grupo = por_grupo.groupby(col_grupo, sort=False).agg(**{
+                "Previsão Média (%)": ("Previsão (%)", "mean"),
+                "Limite Inferior (%)": ("Limite Inferior (%)", "mean"),
+                "Limite Superior (%)": ("Limite Superior (%)", "mean"),
+                "Tendência (p.p./mês)": ("Tendência (p.p./mês)", "first"),
+                "Meses de Histórico": ("Meses de Histórico", "first")
+            }).sort_values("Previsão Média (%)", ascending=False).round(2).reset_index()
+            st.dataframe(resumo_grupo, use_container_width=True, hide_index=True)
+            
+            with st.expander("📋 Previsão mês a mês por grupo"):
+                st.dataframe(por_grupo.round(2), use_container_width=True, hide_index=True)
 
 
 # =========================================================
@@ -48,6 +48,20 @@ if (-not (Test-Path "backend")) {
     exit 1
 }
 
+# Núcleo de KPIs compartilhado com o dashboard (fica na raiz do repositório)
+if (-not (Test-Path "kpi_core")) {
+    Write-Host "❌ Diretório 'kpi_core' não encontrado!" -ForegroundColor Red
+    exit 1
+}
+
+Write-Host "📦 Copiando kpi_core para o backend..." -ForegroundColor Cyan
+if (Test-Path "backend\kpi_core") {
+    Remove-Item -Recurse -Force "backend\kpi_core"
+}
+Copy-Item -Recurse "kpi_core" "backend\kpi_core"
+Write-Host "✅ kpi_core copiado" -ForegroundColor Green
+Write-Host ""
+
 Write-Host "🚀 Iniciando deploy no Cloud Run..." -ForegroundColor Cyan
 Write-Host "   Isso pode levar alguns minutos..." -ForegroundColor Yellow
 Write-Host ""
@@ -86,4 +100,8 @@ try {
     }
 } finally {
     Pop-Location
+    # Remover a cópia temporária do núcleo
+    if (Test-Path "backend\kpi_core") {
+        Remove-Item -Recurse -Force "backend\kpi_core"
+    }
 }
@@ -1,24 +1,30 @@
 import React, { useState, useEffect } from 'react'
 import { Row, Col, Card, Spinner, Alert } from 'react-bootstrap'
-import { apiService } from '../services/api'
+import { apiService, turnoverFromMatrix } from '../services/api'
 
 function Overview({ datasetId, anoFiltro, mesFiltro }) {
   const [data, setData] = useState(null)
+  const [matrix, setMatrix] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
 
+  // Filtros de competência só mudam a consulta à matriz: carrega uma vez por dataset
   useEffect(() => {
     if (datasetId) {
       loadData()
     }
-  }, [datasetId, anoFiltro, mesFiltro])
+  }, [datasetId])
 
   const loadData = async () => {
     setLoading(true)
     setError(null)
     try {
-      const response = await apiService.getOverview(datasetId, anoFiltro, mesFiltro)
+      const [response, matrixResponse] = await Promise.all([
+        apiService.getOverview(datasetId),
+        apiService.getTurnoverMatrix(datasetId),
+      ])
       setData(response.data.results)
+      setMatrix(matrixResponse.data.results)
     } catch (err) {
       setError(err.message || 'Erro ao carregar dados')
     } finally {
@@ -45,7 +51,7 @@ function Overview({ datasetId, anoFiltro, mesFiltro }) {
   }
 
   const basicKPIs = data.basic_kpis || {}
-  const turnover = data.turnover || {}
+  const turnover = turnoverFromMatrix(matrix, anoFiltro, mesFiltro)
   const turnoverTotal = data.turnover_total || {}
   const contractTypes = data.contract_types || []
   const monthlyDismissals = data.monthly_dismissals || {}
@@ -1,25 +1,31 @@
 import React, { useState, useEffect } from 'react'
 import { Row, Col, Card, Spinner, Alert } from 'react-bootstrap'
-import { LineChart, Line, AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts'
-import { apiService } from '../services/api'
+import { LineChart, Line, AreaChart, Area, ComposedChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts'
+import { apiService, turnoverFromMatrix } from '../services/api'
 
 function Turnover({ datasetId, anoFiltro, mesFiltro }) {
   const [data, setData] = useState(null)
+  const [matrix, setMatrix] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
 
+  // Filtros de competência só mudam a consulta à matriz: carrega uma vez por dataset
   useEffect(() => {
     if (datasetId) {
       loadData()
     }
-  }, [datasetId, anoFiltro, mesFiltro])
+  }, [datasetId])
 
   const loadData = async () => {
     setLoading(true)
     setError(null)
     try {
-      const response = await apiService.getTurnover(datasetId, anoFiltro, mesFiltro)
+      const [response, matrixResponse] = await Promise.all([
+        apiService.getTurnover(datasetId),
+        apiService.getTurnoverMatrix(datasetId),
+      ])
       setData(response.data.results)
+      setMatrix(matrixResponse.data.results)
     } catch (err) {
       setError(err.message || 'Erro ao carregar dados')
     } finally {
@@ -45,7 +51,7 @@ function Turnover({ datasetId, anoFiltro, mesFiltro }) {
     return <Alert variant="info">Carregue um dataset para ver os dados</Alert>
   }
 
-  const turnoverPeriod = data.turnover_period || {}
+  const turnoverPeriod = turnoverFromMatrix(matrix, anoFiltro, mesFiltro)
   const turnoverHistory = data.turnover_history || []
 
   return (
@@ -99,6 +105,27 @@ function Turnover({ datasetId, anoFiltro, mesFiltro }) {
           </Card.Body>
         </Card>
       )}
+
+      {/* Entradas x Saídas */}
+      {turnoverHistory.length > 0 && (
+        <Card className="mb-4">
+          <Card.Header><h5>🔁 Admissões x Desligamentos</h5></Card.Header>
+          <Card.Body>
+            <ResponsiveContainer width="100%" height={400}>
+              <ComposedChart data={turnoverHistory}>
+                <CartesianGrid strokeDasharray="3 3" />
+                <XAxis dataKey="Mês" />
+                <YAxis />
+                <Tooltip />
+                <Legend />
+                <Bar dataKey="Admissões" fill="#43e97b" />
+                <Bar dataKey="Desligados" fill="#f5576c" />
+                <Line type="monotone" dataKey="Saldo (Admissões - Desligados)" stroke="#667eea" strokeWidth={2} dot={false} />
+              </ComposedChart>
+            </ResponsiveContainer>
+          </Card.Body>
+        </Card>
+      )}
     </div>
   )
 }
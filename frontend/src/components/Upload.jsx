@@ -1,6 +1,8 @@
 import React, { useState } from 'react'
 import { Card } from 'react-bootstrap'
 
+const ACCEPTED_EXTENSIONS = ['.xlsx', '.xls', '.csv', '.parquet', '.zip']
+
 function Upload({ onUpload, loading }) {
   const [dragActive, setDragActive] = useState(false)
 
@@ -21,10 +23,10 @@ function Upload({ onUpload, loading }) {
     
     if (e.dataTransfer.files && e.dataTransfer.files[0]) {
       const file = e.dataTransfer.files[0]
-      if (file.name.endsWith('.xlsx') || file.name.endsWith('.xls')) {
+      if (ACCEPTED_EXTENSIONS.some(ext => file.name.toLowerCase().endsWith(ext))) {
         onUpload(file)
       } else {
-        alert('Por favor, envie apenas arquivos Excel (.xlsx ou .xls)')
+        alert('Por favor, envie um arquivo Excel (.xlsx, .xls), CSV, Parquet ou .zip')
       }
     }
   }
@@ -53,7 +55,7 @@ function Upload({ onUpload, loading }) {
     >
       <input
         type="file"
-        accept=".xlsx,.xls"
+        accept={ACCEPTED_EXTENSIONS.join(',')}
         onChange={handleFileInput}
         disabled={loading}
         style={{ display: 'none' }}
@@ -61,12 +63,12 @@ function Upload({ onUpload, loading }) {
       />
       <label htmlFor="file-upload" style={{ cursor: 'pointer', width: '100%' }}>
         <div>
-          <h5>📂 Carregue o Excel (.xlsx)</h5>
+          <h5>📂 Carregue o Excel (.xlsx), CSV ou Parquet</h5>
           <p className="text-muted mb-3">
             Arraste e solte o arquivo aqui ou clique para selecionar
           </p>
           <p className="text-muted small">
-            O arquivo deve conter as abas: <strong>empresa</strong>, <strong>colaboradores</strong> e <strong>performance</strong>
+            O arquivo deve conter as abas: <strong>empresa</strong>, <strong>colaboradores</strong> e <strong>performance</strong> (em .zip, um CSV/Parquet por aba)
           </p>
           {loading && (
             <div className="mt-3">
@@ -69,6 +69,41 @@ export const apiService = {
       analysis_type: 'turnover',
     }),
 
+  // Turnover de todas as competências (consultar com turnoverFromMatrix)
+  getTurnoverMatrix: (datasetId) =>
+    api.post('/api/v1/analyses/turnover/matrix', {
+      dataset_id: datasetId,
+      analysis_type: 'turnover_matrix',
+    }),
+
+  getRetention: (datasetId) =>
+    api.post('/api/v1/analyses/retention', {
+      dataset_id: datasetId,
+      analysis_type: 'retention',
+    }),
+
+  getCohorts: (datasetId, dimensao) =>
+    api.post('/api/v1/analyses/cohorts', {
+      dataset_id: datasetId,
+      dimensao,
+      analysis_type: 'cohorts',
+    }),
+
+  getForecast: (datasetId, horizonte = 3, sazonal = false) =>
+    api.post('/api/v1/analyses/forecast', {
+      dataset_id: datasetId,
+      horizonte,
+      sazonal,
+      analysis_type: 'forecast',
+    }),
+
+  getAnomalies: (datasetId, topN = 10) =>
+    api.post('/api/v1/analyses/anomalies', {
+      dataset_id: datasetId,
+      top_n: topN,
+      analysis_type: 'anomalies',
+    }),
+
   getRisk: (datasetId) =>
     api.post('/api/v1/analyses/risk', {
       dataset_id: datasetId,
@@ -76,4 +111,15 @@ export const apiService = {
     }),
 }
 
+// Turnover do filtro de competência a partir da matriz já carregada
+export const turnoverFromMatrix = (matrix, anoFiltro, mesFiltro) => {
+  if (!matrix) return {}
+  if (anoFiltro && mesFiltro) {
+    return matrix.competencias[`${anoFiltro}-${String(mesFiltro).padStart(2, '0')}`] || {}
+  }
+  if (anoFiltro) return matrix.anos[String(anoFiltro)] || {}
+  if (mesFiltro) return matrix.meses[String(mesFiltro)] || {}
+  return matrix.total || {}
+}
+
 export default apiService
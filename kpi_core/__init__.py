@@ -0,0 +1,137 @@
+"""
+Núcleo de cálculos de KPIs compartilhado pelo dashboard Streamlit e pela API.
+
+Depende apenas de pandas/numpy: não importa Streamlit nem Firebase, então
+pode ser usado em workers e scripts sem carregar a interface.
+"""
+from kpi_core.columns import (
+    col_like,
+    DATE_COLS,
+    COLUMN_SYNONYMS,
+    ColumnResolver,
+    column_resolver,
+    register_column_synonyms
+)
+from kpi_core.exit_types import (
+    classify_exits,
+    TIPO_SAIDA_NENHUMA,
+    TIPO_SAIDA_VOLUNTARIA,
+    TIPO_SAIDA_INVOLUNTARIA
+)
+from kpi_core.workforce import (
+    PreparedWorkforce,
+    WorkforceData,
+    prepare_workforce,
+    as_workforce
+)
+from kpi_core.kpi_helpers import (
+    calculate_turnover,
+    calculate_turnover_by_period,
+    calculate_turnover_matrix,
+    turnover_from_matrix,
+    calculate_turnover_history,
+    calculate_turnover_by_group,
+    calculate_turnover_history_by_group,
+    calculate_rolling_turnover,
+    calculate_tenure,
+    calculate_headcount,
+    calculate_headcount_temporal,
+    calculate_headcount_growth,
+    calculate_headcount_by_dimension_temporal,
+    calculate_basic_kpis,
+    calculate_contract_types,
+    calculate_monthly_dismissals,
+    calculate_overview_kpis,
+    build_monthly_aggregates,
+    safe_mean,
+    norm_0_1
+)
+from kpi_core.hierarchy import (
+    OrgHierarchy,
+    build_org_hierarchy,
+    calculate_manager_turnover
+)
+from kpi_core.survival import (
+    HIRE_YEAR_GROUP,
+    calculate_retention_curves,
+    calculate_retention_summary,
+    calculate_cohort_retention
+)
+from kpi_core.anomalies import detect_turnover_anomalies
+from kpi_core.forecast import (
+    MIN_FORECAST_MONTHS,
+    forecast_series,
+    calculate_turnover_forecast
+)
+from kpi_core.risk import (
+    RISK_FACTORS,
+    DEFAULT_RISK_WEIGHTS,
+    RISK_BAND_LABELS,
+    RISK_REASONS,
+    RiskFeatures,
+    build_risk_features,
+    evaluate_weight_scenarios,
+    explain_risk_codes,
+    filter_risk_rows,
+    top_risk_page,
+    risk_summary
+)
+
+__all__ = [
+    "col_like",
+    "DATE_COLS",
+    "COLUMN_SYNONYMS",
+    "ColumnResolver",
+    "column_resolver",
+    "register_column_synonyms",
+    "classify_exits",
+    "TIPO_SAIDA_NENHUMA",
+    "TIPO_SAIDA_VOLUNTARIA",
+    "TIPO_SAIDA_INVOLUNTARIA",
+    "PreparedWorkforce",
+    "WorkforceData",
+    "prepare_workforce",
+    "as_workforce",
+    "calculate_turnover",
+    "calculate_turnover_by_period",
+    "calculate_turnover_matrix",
+    "turnover_from_matrix",
+    "calculate_turnover_history",
+    "calculate_turnover_by_group",
+    "calculate_turnover_history_by_group",
+    "calculate_rolling_turnover",
+    "calculate_tenure",
+    "calculate_headcount",
+    "calculate_headcount_temporal",
+    "calculate_headcount_growth",
+    "calculate_headcount_by_dimension_temporal",
+    "calculate_basic_kpis",
+    "calculate_contract_types",
+    "calculate_monthly_dismissals",
+    "calculate_overview_kpis",
+    "build_monthly_aggregates",
+    "safe_mean",
+    "norm_0_1",
+    "OrgHierarchy",
+    "build_org_hierarchy",
+    "calculate_manager_turnover",
+    "HIRE_YEAR_GROUP",
+    "calculate_retention_curves",
+    "calculate_retention_summary",
+    "calculate_cohort_retention",
+    "detect_turnover_anomalies",
+    "MIN_FORECAST_MONTHS",
+    "forecast_series",
+    "calculate_turnover_forecast",
+    "RISK_FACTORS",
+    "DEFAULT_RISK_WEIGHTS",
+    "RISK_BAND_LABELS",
+    "RISK_REASONS",
+    "RiskFeatures",
+    "build_risk_features",
+    "evaluate_weight_scenarios",
+    "explain_risk_codes",
+    "filter_risk_rows",
+    "top_risk_page",
+    "risk_summary"
+]
@@ -0,0 +1,208 @@
+"""
+Detecção de anomalias no turnover mensal de cada célula de dimensão
+(ex.: departamento × cargo × mês).
+
+Cada célula é comparada com o histórico da própria série por dois critérios:
+z-score robusto (mediana e MAD da série) e desvio em relação à EWMA dos
+meses anteriores. A célula é anômala quando os dois passam do limite no
+mesmo sentido. Tudo é calculado sobre a matriz séries × meses de uma vez.
+"""
+import pandas as pd
+import numpy as np
+from typing import Optional, Sequence
+from kpi_core.workforce import WorkforceData, as_workforce
+from kpi_core.kpi_helpers import _history_grid, _pct
+
+
+# Dimensões padrão das séries
+ANOMALY_DIMENSIONS = ("departamento", "cargo")
+
+# Limites padrão dos dois critérios
+ROBUST_Z_THRESHOLD = 3.5
+EWMA_Z_THRESHOLD = 3.0
+
+# Constantes de escala para aproximar o desvio padrão de uma normal
+_MAD_SCALE = 1.4826
+_MEAN_AD_SCALE = 1.2533
+
+
+def _combined_codes(wf, dimensoes: Sequence[str]):
+    """
+    Código único por combinação das dimensões (-1 se alguma estiver vazia).
+    
+    Returns:
+        (colunas, códigos, categorias por dimensão) ou None se faltar coluna
+    """
+    colunas, codigos, categorias = [], [], []
+    for dimensao in dimensoes:
+        coluna, codes, cats = wf.group_codes(dimensao)
+        if not coluna:
+            return None
+        colunas.append(coluna)
+        codigos.append(codes.astype(np.int64))
+        categorias.append(cats)
+    
+    validos = np.logical_and.reduce([c >= 0 for c in codigos])
+    chave = np.zeros(len(wf), dtype=np.int64)
+    for codes, cats in zip(codigos, categorias):
+        chave = chave * max(len(cats), 1) + np.maximum(codes, 0)
+    # Só as combinações que existem viram grupos
+    existentes, inverso = np.unique(chave[validos], return_inverse=True)
+    combinado = np.full(len(wf), -1, dtype=np.int64)
+    combinado[validos] = inverso
+    
+    rotulos = []
+    resto = existentes
+    for cats in reversed(categorias):
+        base = max(len(cats), 1)
+        rotulos.append(cats[resto % base])
+        resto = resto // base
+    return colunas, combinado, rotulos[::-1]
+
+
+def _robust_z(valores: np.ndarray, observado: np.ndarray):
+    """
+    Z-score robusto por série: (x - mediana) / (1,4826 · MAD).
+    
+    Séries com MAD zero (comum em grupos pequenos, com muitos meses sem
+    desligamento) usam 1,2533 · desvio absoluto médio; se também for zero,
+    o z fica NaN.
+    """
+    mascarado = np.where(observado, valores, np.nan)
+    mediana = np.nanmedian(mascarado, axis=1)
+    desvio = np.abs(mascarado - mediana[:, None])
+    escala = _MAD_SCALE * np.nanmedian(desvio, axis=1)
+    sem_mad = escala == 0
+    escala[sem_mad] = _MEAN_AD_SCALE * np.nanmean(desvio[sem_mad], axis=1)
+    escala[escala == 0] = np.nan
+    return (mascarado - mediana[:, None]) / escala[:, None], mediana, escala
+
+
+def _ewma_z(
+    valores: np.ndarray,
+    observado: np.ndarray,
+    alpha: float,
+    min_historico: int,
+    escala_minima: np.ndarray
+):
+    """
+    Desvio de cada mês em relação à EWMA (e variância EW) dos meses anteriores.
+    
+    A recursão anda mês a mês, mas cada passo atualiza todas as séries de
+    uma vez; meses não observados mantêm o estado. O desvio padrão EW tem
+    piso em `escala_minima` para não explodir em séries quase constantes.
+    """
+    n_series, n_meses = valores.shape
+    media = np.zeros(n_series)
+    variancia = np.zeros(n_series)
+    vistos = np.zeros(n_series, dtype=np.int64)
+    z = np.full((n_series, n_meses), np.nan)
+    ewma = np.full((n_series, n_meses), np.nan)
+    
+    for t in range(n_meses):
+        obs = observado[:, t]
+        x = valores[:, t]
+        pronto = obs & (vistos >= min_historico)
+        desvio_padrao = np.fmax(np.sqrt(variancia), escala_minima)
+        ewma[pronto, t] = media[pronto]
+        pronto &= desvio_padrao > 0
+        z[pronto, t] = (x[pronto] - media[pronto]) / desvio_padrao[pronto]
+        
+        # Atualiza o estado só onde houve observação
+        primeiro = obs & (vistos == 0)
+        seguinte = obs & (vistos > 0)
+        diferenca = x - media
+        variancia = np.where(seguinte, (1 - alpha) * (variancia + alpha * diferenca ** 2), variancia)
+        media = np.where(seguinte, media + alpha * diferenca, media)
+        media = np.where(primeiro, x, media)
+        vistos += obs
+    return z, ewma
+
+
+def detect_turnover_anomalies(
+    df: WorkforceData,
+    dimensoes: Sequence[str] = ANOMALY_DIMENSIONS,
+    top_n: Optional[int] = 20,
+    meses_recentes: Optional[int] = None,
+    min_headcount: int = 5,
+    min_historico: int = 6,
+    alpha: float = 0.3,
+    limite_robusto: float = ROBUST_Z_THRESHOLD,
+    limite_ewma: float = EWMA_Z_THRESHOLD
+) -> pd.DataFrame:
+    """
+    Ranking das células (combinação das dimensões × mês) com turnover anômalo.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        dimensoes: Colunas que definem as séries (ex.: departamento, cargo)
+        top_n: Quantidade de anomalias no ranking (None = todas)
+        meses_recentes: Considerar só os últimos N meses da grade (None = todos)
+        min_headcount: Headcount mínimo no início do mês para a célula ser avaliada
+        min_historico: Meses anteriores observados exigidos pela EWMA
+        alpha: Fator de suavização da EWMA
+        limite_robusto: |z| robusto mínimo
+        limite_ewma: |z| EWMA mínimo
+    
+    Returns:
+        DataFrame com as colunas das dimensões, Mês, Headcount (início),
+        Desligados, Turnover (%), Mediana (%), EWMA (%), Z Robusto, Z EWMA,
+        Score (menor dos dois |z|) e Direção ("alta"/"queda"), ordenado por
+        Score decrescente
+    """
+    wf = as_workforce(df)
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return pd.DataFrame()
+    
+    combinacao = _combined_codes(wf, dimensoes)
+    if combinacao is None:
+        return pd.DataFrame()
+    colunas, codes, rotulos = combinacao
+    n_series = len(rotulos[0])
+    if n_series == 0:
+        return pd.DataFrame()
+    
+    grade = _history_grid(wf, codes, n_series)
+    if grade is None:
+        return pd.DataFrame()
+    headcount, desligados = grade["headcount"], grade["desligados"]
+    observado = grade["janela"] & (headcount > 0)
+    turnover = _pct(desligados, headcount)
+    
+    z_robusto, mediana, escala = _robust_z(turnover, observado)
+    z_ewma, ewma = _ewma_z(turnover, observado, alpha, min_historico, np.nan_to_num(escala, nan=0.0))
+    
+    with np.errstate(invalid="ignore"):
+        mesmo_sentido = np.sign(z_robusto) == np.sign(z_ewma)
+        candidatas = (
+            observado & (headcount >= min_headcount) & mesmo_sentido &
+            (np.abs(z_robusto) >= limite_robusto) & (np.abs(z_ewma) >= limite_ewma)
+        )
+    if meses_recentes is not None:
+        candidatas[:, :max(len(grade["meses"]) - meses_recentes, 0)] = False
+    
+    serie, mes = np.nonzero(candidatas)
+    if len(serie) == 0:
+        return pd.DataFrame()
+    score = np.minimum(np.abs(z_robusto[serie, mes]), np.abs(z_ewma[serie, mes]))
+    escolhidas = np.arange(len(score))
+    if top_n is not None and top_n < len(score):
+        # Seleção parcial antes de ordenar
+        escolhidas = np.argpartition(-score, top_n - 1)[:top_n]
+    ordem = escolhidas[np.argsort(-score[escolhidas], kind="stable")]
+    serie, mes, score = serie[ordem], mes[ordem], score[ordem]
+    
+    resultado = pd.DataFrame({
+        coluna: rotulo[serie] for coluna, rotulo in zip(colunas, rotulos)
+    })
+    resultado["Mês"] = grade["meses"].strftime("%Y-%m")[mes]
+    resultado["Headcount (início)"] = headcount[serie, mes]
+    resultado["Desligados"] = desligados[serie, mes]
+    resultado["Turnover (%)"] = turnover[serie, mes]
+    resultado["Mediana (%)"] = mediana[serie]
+    resultado["EWMA (%)"] = ewma[serie, mes]
+    resultado["Z Robusto"] = z_robusto[serie, mes]
+    resultado["Z EWMA"] = z_ewma[serie, mes]
+    resultado["Score"] = score
+    resultado["Direção"] = np.where(z_robusto[serie, mes] > 0, "alta", "queda")
+    return resultado
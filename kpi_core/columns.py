@@ -0,0 +1,156 @@
+"""
+Resolução de colunas da planilha de colaboradores.
+
+Os nomes são comparados já normalizados (minúsculas, sem acentos, com "_",
+"-" e espaços repetidos tratados como um espaço) e cada nome conhecido tem
+uma lista de sinônimos comuns em exportações de sistemas de RH. O índice
+nome normalizado -> coluna é montado uma vez por conjunto de colunas.
+"""
+import threading
+import unicodedata
+import weakref
+import pandas as pd
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+
+DATE_COLS = ["data de admissão", "data de desligamento", "ultima promoção", "ultimo mérito"]
+
+# Nome usado no código -> sinônimos aceitos nos cabeçalhos (comparados normalizados).
+# Palavras soltas e ambíguas ("gestor", "motivo", "nota", "rating"...) ficam de fora:
+# cabeçalhos próprios de um cliente entram por register_column_synonyms.
+COLUMN_SYNONYMS: Dict[str, List[str]] = {
+    "matricula": ["matrícula", "id colaborador", "id funcionario", "cod colaborador", "employee id"],
+    "nome": ["nome completo", "nome do colaborador", "employee name"],
+    "empresa": ["nome empresa", "razao social", "company name"],
+    "departamento": ["depto", "setor", "department"],
+    "cargo": ["funcao", "job title", "job position"],
+    "matricula do gestor": ["matricula gestor", "id gestor", "manager id"],
+    "tipo_contrato": ["tipo de contrato", "contract type"],
+    "genero": ["sexo", "gender"],
+    "data de admissão": ["admissao", "dt admissao", "data admissao", "hire date", "admission date"],
+    "data de desligamento": [
+        "desligamento", "dt desligamento", "data desligamento", "data de demissao",
+        "data demissao", "dt demissao", "data de saida", "termination date"
+    ],
+    "tipo desligamento": ["tipo de desligamento", "termination type"],
+    "motivo de desligamento": ["motivo desligamento", "termination reason"],
+    "avaliação": ["nota avaliacao", "performance rating"],
+    "ultima promoção": ["data ultima promocao", "dt ultima promocao", "last promotion date"],
+    "ultimo mérito": ["data ultimo merito", "dt ultimo merito", "last merit date"],
+    "data de encerramento do ciclo": ["fim do ciclo", "encerramento do ciclo", "cycle end date"],
+}
+
+_SEPARATORS = str.maketrans({"_": " ", "-": " ", ".": " ", "/": " "})
+
+
+def normalize_column_name(name: Hashable) -> str:
+    """Minúsculas, sem acentos e com separadores ("_", "-", ".", "/") como espaço."""
+    texto = unicodedata.normalize("NFKD", str(name))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().translate(_SEPARATORS).split())
+
+
+def _synonym_index(sinonimos: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Nome normalizado -> candidatos normalizados (o nome canônico primeiro)."""
+    indice = {}
+    for canonico, lista in sinonimos.items():
+        candidatos = [normalize_column_name(canonico)]
+        candidatos += [n for n in map(normalize_column_name, lista) if n not in candidatos]
+        for nome in candidatos:
+            indice.setdefault(nome, candidatos)
+    return indice
+
+
+_synonyms_lock = threading.Lock()
+_synonym_candidates = _synonym_index(COLUMN_SYNONYMS)
+
+
+def register_column_synonyms(canonico: str, sinonimos: Iterable[str]) -> None:
+    """
+    Acrescenta sinônimos a um nome de coluna (ex.: cabeçalhos de um cliente).
+    
+    Args:
+        canonico: Nome usado no código (ex.: "data de admissão")
+        sinonimos: Cabeçalhos aceitos como esse nome
+    """
+    global _synonym_candidates
+    with _synonyms_lock:
+        lista = COLUMN_SYNONYMS.setdefault(canonico, [])
+        lista.extend(s for s in sinonimos if s not in lista)
+        _synonym_candidates = _synonym_index(COLUMN_SYNONYMS)
+        _resolvers.clear()
+
+
+def canonical_column_name(name: Hashable) -> Optional[str]:
+    """Nome usado no código para um cabeçalho (ex.: "dt_admissao" -> "data de admissão")."""
+    normalizado = normalize_column_name(name)
+    for canonico in COLUMN_SYNONYMS:
+        if normalizado in _synonym_candidates.get(normalize_column_name(canonico), ()):
+            return canonico
+    return None
+
+
+class ColumnResolver:
+    """
+    Índice nome normalizado -> coluna real de um conjunto de colunas.
+    
+    Procura primeiro o nome pedido e depois, na ordem, o nome canônico e
+    os sinônimos do grupo a que ele pertence. Com colunas repetidas após a
+    normalização vale a primeira. Resultados ficam em cache por nome.
+    """
+    
+    def __init__(self, columns: Sequence[Hashable]):
+        self._indice: Dict[str, Hashable] = {}
+        for coluna in columns:
+            self._indice.setdefault(normalize_column_name(coluna), coluna)
+        self._resolvidos: Dict[Hashable, Optional[Hashable]] = {}
+    
+    def resolve(self, name: Hashable) -> Optional[Hashable]:
+        """Coluna real para `name` (nome da planilha ou sinônimo) ou None."""
+        try:
+            return self._resolvidos[name]
+        except KeyError:
+            pass
+        normalizado = normalize_column_name(name)
+        coluna = self._indice.get(normalizado)
+        if coluna is None:
+            for candidato in _synonym_candidates.get(normalizado, ()):
+                coluna = self._indice.get(candidato)
+                if coluna is not None:
+                    break
+        self._resolvidos[name] = coluna
+        return coluna
+    
+    def __contains__(self, name: Hashable) -> bool:
+        return self.resolve(name) is not None
+
+
+# id do Index de colunas -> (referência fraca ao Index, resolvedor)
+_resolvers: Dict[int, tuple] = {}
+_resolvers_lock = threading.Lock()
+
+
+def column_resolver(df: pd.DataFrame) -> ColumnResolver:
+    """
+    Resolvedor de colunas do DataFrame, montado uma vez por Index de colunas.
+    
+    Adicionar, remover ou renomear colunas troca o Index do DataFrame, então
+    o próximo acesso monta um resolvedor novo.
+    """
+    colunas = df.columns
+    chave = id(colunas)
+    item = _resolvers.get(chave)
+    if item is not None and item[0]() is colunas:
+        return item[1]
+    
+    resolver = ColumnResolver(colunas)
+    with _resolvers_lock:
+        _resolvers[chave] = (weakref.ref(colunas, lambda _, chave=chave: _resolvers.pop(chave, None)), resolver)
+    return resolver
+
+
+def col_like(df: pd.DataFrame, name: str) -> Optional[str]:
+    """Encontra coluna por nome (sem diferenciar maiúsculas, acentos e separadores, aceitando sinônimos)."""
+    if df is None or df.empty:
+        return None
+    return column_resolver(df).resolve(name)
@@ -0,0 +1,88 @@
+"""
+Classificação dos desligamentos em voluntário/involuntário.
+Roda uma única vez por base e gera um código int8 por colaborador,
+para que os cálculos de turnover e tenure apenas somem códigos.
+"""
+import re
+import unicodedata
+import pandas as pd
+import numpy as np
+from typing import Iterable, Optional
+
+
+# Códigos de tipo de saída
+TIPO_SAIDA_NENHUMA = 0
+TIPO_SAIDA_VOLUNTARIA = 1
+TIPO_SAIDA_INVOLUNTARIA = 2
+
+# Palavras-chave (comparadas sem acento e sem diferenciar maiúsculas)
+PALAVRAS_VOLUNTARIO = ("voluntario", "pedido", "demissao", "rescisao")
+# Têm precedência sobre as voluntárias (ex.: "involuntário" contém "voluntário")
+PALAVRAS_INVOLUNTARIO = ("involuntario", "justa causa", "dispensa")
+
+
+def normalize_text(texto: str) -> str:
+    """Minúsculas, sem acentos e com espaços simples."""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().split())
+
+
+def _keyword_flags(valores: pd.Series, palavras: Iterable[str]) -> np.ndarray:
+    """
+    Marca valores que contêm alguma palavra-chave.
+    A normalização roda uma vez por valor distinto, não por linha.
+    """
+    palavras = [normalize_text(p) for p in palavras if str(p).strip()]
+    if not palavras:
+        return np.zeros(len(valores), dtype=bool)
+    
+    codes, uniques = pd.factorize(valores.astype(str))
+    normalizados = pd.Index([normalize_text(u) for u in uniques], dtype=object)
+    padrao = "|".join(re.escape(p) for p in palavras)
+    flags = np.asarray(normalizados.str.contains(padrao, regex=True), dtype=bool)
+    return flags[codes]
+
+
+def classify_exits(
+    desligamento: pd.Series,
+    tipo: Optional[pd.Series] = None,
+    motivo: Optional[pd.Series] = None,
+    palavras_voluntario: Optional[Iterable[str]] = None,
+    palavras_involuntario: Optional[Iterable[str]] = None
+) -> np.ndarray:
+    """
+    Classifica o tipo de saída de cada colaborador.
+    
+    Usa a coluna de tipo desligamento quando existir, senão o motivo.
+    Quem não tem data de desligamento recebe TIPO_SAIDA_NENHUMA; desligados
+    sem palavra-chave voluntária são involuntários.
+    
+    Args:
+        desligamento: Datas de desligamento
+        tipo: Coluna "tipo desligamento" (opcional)
+        motivo: Coluna "motivo de desligamento" (opcional)
+        palavras_voluntario: Palavras que indicam saída voluntária
+        palavras_involuntario: Palavras que indicam saída involuntária (precedência)
+    
+    Returns:
+        Array int8 com TIPO_SAIDA_* por linha
+    """
+    if palavras_voluntario is None:
+        palavras_voluntario = PALAVRAS_VOLUNTARIO
+    if palavras_involuntario is None:
+        palavras_involuntario = PALAVRAS_INVOLUNTARIO
+    
+    desligado = np.asarray(pd.notna(pd.to_datetime(desligamento, errors="coerce")), dtype=bool)
+    codigos = np.where(desligado, TIPO_SAIDA_INVOLUNTARIA, TIPO_SAIDA_NENHUMA).astype(np.int8)
+    
+    origem = tipo if tipo is not None else motivo
+    if origem is None:
+        return codigos
+    
+    voluntario = (
+        _keyword_flags(origem, palavras_voluntario) &
+        ~_keyword_flags(origem, palavras_involuntario)
+    )
+    codigos[desligado & voluntario] = TIPO_SAIDA_VOLUNTARIA
+    return codigos
@@ -0,0 +1,180 @@
+"""
+Previsão de turnover mensal para muitas séries de uma vez.
+
+Cada série (empresa, departamento, cargo...) é ajustada por mínimos
+quadrados com tendência linear e, opcionalmente, sazonalidade mensal
+(dummies de mês do ano). Todas as séries compartilham a mesma grade de
+meses: as equações normais de todas são montadas e resolvidas em lote, e
+os meses fora do histórico de cada série só recebem peso zero.
+"""
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from statistics import NormalDist
+from typing import Dict, Optional
+from kpi_core.workforce import WorkforceData, as_workforce
+from kpi_core.kpi_helpers import _group_history, _history_months, _pct, _sweep_monthly_counts
+
+
+# Mínimo de meses observados para prever uma série
+MIN_FORECAST_MONTHS = 6
+
+# Horizonte máximo de previsão (meses)
+MAX_FORECAST_HORIZON = 12
+
+
+def _design(t: np.ndarray, mes_do_ano: Optional[np.ndarray]) -> np.ndarray:
+    """Matriz de regressores: intercepto, tendência e (opcional) 11 dummies de mês."""
+    colunas = [np.ones(len(t)), t.astype(float)]
+    if mes_do_ano is not None:
+        colunas += [(mes_do_ano == m).astype(float) for m in range(2, 13)]
+    return np.column_stack(colunas)
+
+
+def forecast_series(
+    y: np.ndarray,
+    observado: np.ndarray,
+    horizonte: int = 3,
+    mes_do_ano: Optional[np.ndarray] = None,
+    nivel: float = 0.95
+) -> Dict[str, np.ndarray]:
+    """
+    Ajusta e prevê várias séries mensais em lote.
+    
+    Args:
+        y: Valores (séries x meses); ignorados onde `observado` é False
+        observado: Máscara dos meses que entram no ajuste de cada série
+        horizonte: Quantidade de meses previstos após o último mês da grade
+        mes_do_ano: Mês do ano (1–12) de cada mês da grade e do horizonte
+            (len = meses + horizonte); None = sem sazonalidade
+        nivel: Nível de confiança do intervalo de previsão
+    
+    Returns:
+        Dict com 'previsao', 'inferior' e 'superior' (séries x horizonte),
+        'tendencia' (variação por mês) e 'sigma' (desvio dos resíduos) por
+        série. Intervalos ficam NaN para séries sem graus de liberdade.
+    """
+    y = np.asarray(y, dtype=float)
+    peso = np.asarray(observado, dtype=bool) & np.isfinite(y)
+    n_series, n_meses = y.shape
+    
+    # Tempo relativo ao último mês da grade (melhora o condicionamento)
+    t = np.arange(n_meses + horizonte) - (n_meses - 1)
+    X_total = _design(t, mes_do_ano)
+    X, X_futuro = X_total[:n_meses], X_total[n_meses:]
+    w = peso.astype(float)
+    y0 = np.where(peso, y, 0.0)
+    
+    # Equações normais de todas as séries: (X' W X) b = X' W y
+    xtwx = np.einsum("st,tp,tq->spq", w, X, X)
+    xtwy = np.einsum("st,tp->sp", w * y0, X)
+    xtwx_inv = np.linalg.pinv(xtwx)
+    beta = np.einsum("spq,sq->sp", xtwx_inv, xtwy)
+    
+    residuos = np.where(peso, y0 - beta @ X.T, 0.0)
+    gl = peso.sum(axis=1) - np.linalg.matrix_rank(xtwx)
+    sigma = np.full(n_series, np.nan)
+    com_gl = gl > 0
+    sigma[com_gl] = np.sqrt((residuos[com_gl] ** 2).sum(axis=1) / gl[com_gl])
+    
+    previsao = beta @ X_futuro.T
+    alavanca = np.einsum("hp,spq,hq->sh", X_futuro, xtwx_inv, X_futuro)
+    z = NormalDist().inv_cdf((1 + nivel) / 2)
+    margem = z * sigma[:, None] * np.sqrt(1 + np.maximum(alavanca, 0))
+    
+    return {
+        "previsao": previsao,
+        "inferior": previsao - margem,
+        "superior": previsao + margem,
+        "tendencia": beta[:, 1],
+        "sigma": sigma
+    }
+
+
+def calculate_turnover_forecast(
+    df: WorkforceData,
+    group_by: Optional[str] = None,
+    horizonte: int = 3,
+    sazonal: bool = False,
+    nivel: float = 0.95,
+    data_referencia: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Previsão do turnover total mensal (%) da empresa ou de cada grupo.
+    
+    Usa só meses completos até `data_referencia`. Entram os grupos com
+    histórico até o último mês e pelo menos MIN_FORECAST_MONTHS meses com
+    headcount (ou parâmetros do modelo + 2, com sazonalidade).
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        group_by: Coluna de agrupamento (None = empresa inteira)
+        horizonte: Meses previstos (1 a MAX_FORECAST_HORIZON)
+        sazonal: Incluir sazonalidade mensal
+        nivel: Nível de confiança do intervalo de previsão
+        data_referencia: Data de corte do histórico (None = agora)
+    
+    Returns:
+        DataFrame longo com [coluna do grupo], Mês, Previsão (%), Limite
+        Inferior (%), Limite Superior (%), Tendência (p.p./mês) e Meses de
+        Histórico (um registro por série e mês previsto)
+    """
+    horizonte = int(min(max(horizonte, 1), MAX_FORECAST_HORIZON))
+    wf = as_workforce(df)
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return pd.DataFrame()
+    
+    if group_by is None:
+        meses = _history_months(wf)
+        if len(meses) == 0:
+            return pd.DataFrame()
+        counts = _sweep_monthly_counts(wf.admissao, wf.desligamento, meses, wf.tipo_saida)
+        headcount = counts["headcount"][None, :]
+        desligados = counts["desligados"][None, :]
+        janela = np.ones_like(headcount, dtype=bool)
+        coluna, categorias = None, None
+    else:
+        hist = _group_history(wf, group_by)
+        if hist is None:
+            return pd.DataFrame()
+        meses = hist["meses"]
+        headcount, desligados, janela = hist["headcount"], hist["desligados"], hist["janela"]
+        coluna, categorias = hist["coluna"], hist["categorias"]
+    
+    # Só meses completos
+    referencia = pd.Timestamp(data_referencia) if data_referencia is not None else pd.Timestamp.now()
+    completos = int(np.searchsorted(meses + pd.offsets.MonthBegin(1), referencia, side="right"))
+    if completos == 0:
+        return pd.DataFrame()
+    meses = meses[:completos]
+    headcount, desligados, janela = headcount[:, :completos], desligados[:, :completos], janela[:, :completos]
+    
+    observado = janela & (headcount > 0)
+    n_params = 13 if sazonal else 2
+    n_obs = observado.sum(axis=1)
+    validas = observado[:, -1] & (n_obs >= max(MIN_FORECAST_MONTHS, n_params + 2))
+    if not validas.any():
+        return pd.DataFrame()
+    
+    futuros = pd.date_range(meses[-1] + pd.offsets.MonthBegin(1), periods=horizonte, freq="MS")
+    mes_do_ano = np.concatenate([meses.month, futuros.month]) if sazonal else None
+    ajuste = forecast_series(
+        _pct(desligados[validas], headcount[validas]),
+        observado[validas],
+        horizonte,
+        mes_do_ano,
+        nivel
+    )
+    
+    n_series = int(validas.sum())
+    resultado = pd.DataFrame({
+        "Mês": np.tile(futuros.strftime("%Y-%m"), n_series),
+        "Previsão (%)": np.maximum(ajuste["previsao"], 0).ravel(),
+        "Limite Inferior (%)": np.maximum(ajuste["inferior"], 0).ravel(),
+        "Limite Superior (%)": np.maximum(ajuste["superior"], 0).ravel(),
+        "Tendência (p.p./mês)": np.repeat(ajuste["tendencia"], horizonte),
+        "Meses de Histórico": np.repeat(n_obs[validas], horizonte)
+    })
+    if coluna is not None:
+        resultado.insert(0, coluna, np.repeat(categorias[validas], horizonte))
+    return resultado
@@ -0,0 +1,326 @@
+"""
+Índice da hierarquia organizacional (matrícula -> matrícula do gestor).
+
+Cada colaborador recebe um intervalo [entrada, entrada + tamanho) na ordem
+de um percurso em profundidade (Euler tour): a estrutura inteira abaixo de
+um gestor ocupa posições contíguas, então qualquer agregado da subárvore é
+uma consulta de soma de prefixos. O índice é montado com operações
+vetorizadas por nível da árvore (sem recursão nem laço por colaborador) e
+reporta gestores inexistentes (órfãos) e ciclos na cadeia de comando.
+"""
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+from kpi_core.workforce import WorkforceData, as_workforce
+from kpi_core.exit_types import TIPO_SAIDA_VOLUNTARIA
+
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    arr.setflags(write=False)
+    return arr
+
+
+def _id_keys(series: pd.Series) -> pd.Series:
+    """Normaliza matrículas para texto ("123", "123.0" e 123 viram "123")."""
+    chaves = series.astype("string").str.strip().str.replace(r"\.0+$", "", regex=True)
+    return chaves.mask(chaves.isin(["", "nan", "None", "NaT"]))
+
+
+def _jump(parent: np.ndarray, passos: int) -> np.ndarray:
+    """
+    Ancestral `passos` níveis acima (parando na raiz) por duplicação de
+    ponteiros: O(N log passos).
+    """
+    # Raízes apontam para si mesmas para o salto parar nelas
+    prox = np.where(parent >= 0, parent, np.arange(len(parent)))
+    resultado = np.arange(len(parent))
+    while passos:
+        if passos & 1:
+            resultado = prox[resultado]
+        prox = prox[prox]
+        passos >>= 1
+    return resultado
+
+
+def _depths(gestor: np.ndarray, no_indice: np.ndarray) -> np.ndarray:
+    """Profundidade de cada nó alcançável (duplicação de ponteiros com distâncias)."""
+    salto = np.where(no_indice, gestor, -1)
+    distancia = (salto >= 0).astype(np.int64)
+    while (salto >= 0).any():
+        com_salto = salto >= 0
+        alvo = np.where(com_salto, salto, 0)
+        distancia = np.where(com_salto, distancia + distancia[alvo], distancia)
+        salto = np.where(com_salto, salto[alvo], -1)
+    return np.where(no_indice, distancia, -1)
+
+
+def _cycles(gestor: np.ndarray, em_ciclo: np.ndarray, ids: np.ndarray) -> List[List[str]]:
+    """Agrupa os nós em ciclo: cada ciclo é rotulado pelo menor índice."""
+    n = len(gestor)
+    rotulo = np.where(em_ciclo, np.arange(n), n)
+    salto = np.where(em_ciclo, gestor, np.arange(n))
+    # Após k rodadas o rótulo é o mínimo de 2^k nós consecutivos do ciclo
+    for _ in range(int(np.ceil(np.log2(max(n, 2)))) + 1):
+        rotulo = np.minimum(rotulo, rotulo[salto])
+        salto = salto[salto]
+    membros = np.flatnonzero(em_ciclo)
+    return [[str(i) for i in ids[membros[rotulo[membros] == r]]] for r in np.unique(rotulo[membros])]
+
+
+def _euler_intervals(
+    gestor: np.ndarray,
+    nivel: np.ndarray,
+    no_indice: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posição de entrada no percurso em profundidade e tamanho da subárvore.
+    
+    Tamanhos sobem nível a nível (bincount dos filhos no pai); posições
+    descem nível a nível: filho entra logo após o pai, deslocado pela soma
+    dos tamanhos dos irmãos anteriores. O custo é um passo vetorizado por
+    nível da árvore.
+    """
+    n = len(gestor)
+    tamanho = no_indice.astype(np.int64)
+    profundidade = int(nivel.max()) if n else -1
+    por_nivel = [np.flatnonzero(nivel == k) for k in range(profundidade + 1)]
+    
+    for nos in reversed(por_nivel[1:]):
+        tamanho += np.bincount(gestor[nos], weights=tamanho[nos], minlength=n).astype(np.int64)
+    
+    entrada = np.full(n, -1, dtype=np.int64)
+    if profundidade < 0:
+        return entrada, tamanho
+    
+    raizes = por_nivel[0]
+    entrada[raizes] = np.cumsum(tamanho[raizes]) - tamanho[raizes]
+    for nos in por_nivel[1:]:
+        nos = nos[np.argsort(gestor[nos], kind="stable")]
+        pais = gestor[nos]
+        antes = np.cumsum(tamanho[nos]) - tamanho[nos]
+        # Desconta o acumulado até o primeiro irmão de cada pai
+        primeiro = np.flatnonzero(np.r_[True, pais[1:] != pais[:-1]])
+        inicio_grupo = np.repeat(antes[primeiro], np.diff(np.r_[primeiro, len(nos)]))
+        entrada[nos] = entrada[pais] + 1 + antes - inicio_grupo
+    return entrada, tamanho
+
+
+@dataclass(frozen=True)
+class OrgHierarchy:
+    """
+    Hierarquia indexada por intervalos (imutável).
+    
+    Os nós são as matrículas distintas; arrays alinhados a `ids`. Nós em
+    ciclos (ou abaixo deles) não entram no percurso: `no_indice` é False e
+    `entrada`/`tamanho` valem -1/0.
+    
+    Attributes:
+        ids: Matrícula de cada nó (texto normalizado)
+        gestor: Índice do nó do gestor (-1 = raiz)
+        nivel: Profundidade na árvore (0 = raiz; -1 fora do índice)
+        entrada: Posição do nó no percurso em profundidade
+        tamanho: Quantidade de nós na subárvore (inclui o próprio nó)
+        no_indice: Máscara dos nós alcançáveis a partir de uma raiz
+        orfaos: Nós cujo gestor informado não existe na base (viram raízes)
+        ciclos: Matrículas de cada ciclo encontrado na cadeia de comando
+        no_da_linha: Nó de cada linha do DataFrame (-1 = sem matrícula)
+    """
+    ids: np.ndarray
+    gestor: np.ndarray
+    nivel: np.ndarray
+    entrada: np.ndarray
+    tamanho: np.ndarray
+    no_indice: np.ndarray
+    orfaos: np.ndarray
+    ciclos: List[List[str]]
+    no_da_linha: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def diretos(self) -> np.ndarray:
+        """Quantidade de liderados diretos de cada nó."""
+        com_gestor = self.gestor >= 0
+        return np.bincount(self.gestor[com_gestor], minlength=len(self))
+    
+    def subtree_sum(self, valores_por_no: np.ndarray, incluir_no: bool = True) -> np.ndarray:
+        """
+        Soma de `valores_por_no` na subárvore de cada nó.
+        
+        Uma soma de prefixos na ordem do percurso responde todos os nós:
+        subárvore(v) = P[entrada + tamanho] - P[entrada]. Nós fora do
+        índice recebem 0.
+        """
+        valores = np.asarray(valores_por_no)
+        no_indice = self.no_indice
+        na_ordem = np.zeros(int(no_indice.sum()), dtype=valores.dtype)
+        na_ordem[self.entrada[no_indice]] = valores[no_indice]
+        prefixo = np.concatenate([[0], np.cumsum(na_ordem)])
+        
+        soma = np.zeros(len(self), dtype=prefixo.dtype)
+        inicio = self.entrada[no_indice]
+        soma[no_indice] = prefixo[inicio + self.tamanho[no_indice]] - prefixo[inicio]
+        if not incluir_no:
+            soma = soma - np.where(no_indice, valores, 0)
+        return soma
+    
+    def per_node(self, valores_por_linha: np.ndarray) -> np.ndarray:
+        """Soma valores das linhas do DataFrame em cada nó (bincount)."""
+        com_no = self.no_da_linha >= 0
+        return np.bincount(
+            self.no_da_linha[com_no],
+            weights=np.asarray(valores_por_linha, dtype=float)[com_no],
+            minlength=len(self)
+        )
+
+
+def build_org_hierarchy(df: WorkforceData) -> Optional[OrgHierarchy]:
+    """
+    Monta o índice da hierarquia a partir de matrícula e matrícula do gestor.
+    
+    Matrículas repetidas (ex.: recontratações) viram um único nó, com o
+    gestor da última linha. Autogestão (gestor = a própria matrícula) é
+    tratada como raiz.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+    
+    Returns:
+        OrgHierarchy, ou None se faltarem as colunas de matrícula/gestor
+    """
+    wf = as_workforce(df)
+    if not wf.cols["matricula"] or not wf.cols["gestor"]:
+        return None
+    
+    matriculas = _id_keys(wf.df[wf.cols["matricula"]])
+    gestores = _id_keys(wf.df[wf.cols["gestor"]])
+    
+    no_da_linha, ids = pd.factorize(matriculas)
+    n = len(ids)
+    ids = np.asarray(ids, dtype=object)
+    
+    # Gestor de cada nó: o da última linha com aquela matrícula
+    com_no = no_da_linha >= 0
+    ultima_linha = np.full(n, -1, dtype=np.int64)
+    ultima_linha[no_da_linha[com_no]] = np.flatnonzero(com_no)
+    gestor_id = gestores.to_numpy(dtype=object)[ultima_linha] if n else np.array([], dtype=object)
+    gestor = pd.Index(ids).get_indexer(gestor_id).astype(np.int64)
+    
+    informado = pd.notna(gestor_id)
+    orfaos = np.flatnonzero(informado & (gestor < 0))
+    gestor[gestor == np.arange(n)] = -1
+    
+    # Todo nó chega a uma raiz em até n passos; quem não chega está em um ciclo ou abaixo dele
+    topo = _jump(gestor, n)
+    no_indice = gestor[topo] < 0
+    
+    ciclos = []
+    if not no_indice.all():
+        # Após n passos a partir de um nó sem raiz só se está dentro do ciclo
+        em_ciclo = np.zeros(n, dtype=bool)
+        em_ciclo[topo[~no_indice]] = True
+        ciclos = _cycles(gestor, em_ciclo, ids)
+    
+    nivel = _depths(gestor, no_indice)
+    entrada, tamanho = _euler_intervals(gestor, nivel, no_indice)
+    
+    return OrgHierarchy(
+        ids=_read_only(ids),
+        gestor=_read_only(gestor),
+        nivel=_read_only(nivel),
+        entrada=_read_only(entrada),
+        tamanho=_read_only(tamanho),
+        no_indice=_read_only(no_indice),
+        orfaos=_read_only(orfaos),
+        ciclos=ciclos,
+        no_da_linha=_read_only(no_da_linha.astype(np.int64))
+    )
+
+
+def calculate_manager_turnover(
+    df: WorkforceData,
+    periodo_meses: int = 12,
+    data_referencia: Optional[datetime] = None,
+    hierarquia: Optional[OrgHierarchy] = None
+) -> pd.DataFrame:
+    """
+    Headcount, desligamentos e turnover da estrutura inteira de cada gestor.
+    
+    A estrutura é toda a cadeia abaixo do gestor (liderados diretos e
+    indiretos, sem o próprio gestor). Os contadores são somados por
+    colaborador e cada estrutura sai de uma consulta de prefixo no índice
+    da hierarquia, então ranquear milhares de gestores não percorre a
+    árvore de novo.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        periodo_meses: Meses até a data de referência considerados no turnover
+        data_referencia: Fim do período (None = hoje)
+        hierarquia: Índice já montado com `build_org_hierarchy` (opcional)
+    
+    Returns:
+        DataFrame com Gestor, [Nome], Nível, Liderados Diretos, Estrutura
+        (pessoas), Headcount Início, Headcount Atual, Desligados,
+        Voluntários e Turnover da Estrutura (%) — desligados / headcount
+        médio (início e fim do período). Ordenado pelo turnover. Vazio se
+        faltar a hierarquia.
+    """
+    if periodo_meses < 1:
+        raise ValueError("periodo_meses deve ser >= 1")
+    
+    wf = as_workforce(df)
+    h = hierarquia if hierarquia is not None else build_org_hierarchy(wf)
+    if h is None or len(h) == 0:
+        return pd.DataFrame()
+    
+    fim = pd.Timestamp(data_referencia) if data_referencia is not None else pd.Timestamp.now().normalize()
+    inicio = np.datetime64(fim - pd.DateOffset(months=int(periodo_meses)), "ns")
+    fim = np.datetime64(fim, "ns")
+    
+    adm = wf.admissao
+    desl = wf.desligamento
+    tem_desl = ~np.isnat(desl)
+    
+    def _ativo_em(data: np.datetime64) -> np.ndarray:
+        return (adm <= data) & (~tem_desl | (desl > data))
+    
+    desligado = tem_desl & (desl > inicio) & (desl <= fim) & ~(adm > desl)
+    contadores = {
+        "Headcount Início": _ativo_em(inicio),
+        "Headcount Atual": _ativo_em(fim),
+        "Desligados": desligado,
+        "Voluntários": desligado & (wf.tipo_saida == TIPO_SAIDA_VOLUNTARIA)
+    }
+    estrutura = {
+        nome: h.subtree_sum(h.per_node(valores), incluir_no=False).astype(np.int64)
+        for nome, valores in contadores.items()
+    }
+    
+    gestores = np.flatnonzero((h.diretos > 0) & h.no_indice)
+    resultado = pd.DataFrame({"Gestor": h.ids[gestores]})
+    if wf.cols["nome"]:
+        # Nome da última linha de cada matrícula
+        com_no = h.no_da_linha >= 0
+        nomes = np.empty(len(h), dtype=object)
+        nomes[h.no_da_linha[com_no]] = wf.df[wf.cols["nome"]].to_numpy(dtype=object)[com_no]
+        resultado["Nome"] = nomes[gestores]
+    resultado["Nível"] = h.nivel[gestores]
+    resultado["Liderados Diretos"] = h.diretos[gestores]
+    resultado["Estrutura (pessoas)"] = h.tamanho[gestores] - 1
+    for nome, valores in estrutura.items():
+        resultado[nome] = valores[gestores]
+    
+    medio = (resultado["Headcount Início"] + resultado["Headcount Atual"]) / 2
+    resultado["Turnover da Estrutura (%)"] = np.round(
+        np.divide(
+            resultado["Desligados"] * 100.0, medio,
+            out=np.zeros(len(resultado)), where=medio.to_numpy() > 0
+        ),
+        1
+    )
+    return resultado.sort_values(
+        ["Turnover da Estrutura (%)", "Desligados"], ascending=False
+    ).reset_index(drop=True)
@@ -0,0 +1,1531 @@
+"""
+Módulo para cálculos de KPIs com validação e revisão.
+Todos os cálculos são validados e documentados.
+
+Todas as funções aceitam o DataFrame de colaboradores ou uma
+`PreparedWorkforce` já preparada; ao receber a base preparada, datas,
+colunas e flags não são recalculadas.
+"""
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Tuple, Optional
+from kpi_core.workforce import WorkforceData, as_workforce
+from kpi_core.exit_types import TIPO_SAIDA_VOLUNTARIA
+
+
+def safe_mean(series: pd.Series) -> float:
+    """Calcula média de forma segura, tratando erros."""
+    try:
+        return round(pd.to_numeric(series, errors="coerce").dropna().mean(), 1)
+    except Exception:
+        return 0.0
+
+
+def norm_0_1(s: pd.Series) -> pd.Series:
+    """Normaliza série para escala 0-1."""
+    s = pd.to_numeric(s, errors="coerce").fillna(0).astype(float)
+    if s.empty:
+        return s
+    minv, maxv = s.min(), s.max()
+    rng = maxv - minv
+    if rng == 0 or pd.isna(rng):
+        return s * 0
+    return (s - minv) / rng
+
+
+def _sweep_monthly_counts(
+    adm: np.ndarray,
+    desl: np.ndarray,
+    meses: pd.DatetimeIndex,
+    tipo_saida: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Conta headcount no início de cada mês e desligamentos no mês por varredura.
+    
+    As datas são ordenadas uma única vez e cada mês é resolvido com
+    `searchsorted`, então o custo total é O(N log N + M) em vez de O(N × M).
+    
+    Args:
+        adm: Datas de admissão (datetime64[ns], NaT permitido)
+        desl: Datas de desligamento (datetime64[ns], NaT = ativo)
+        meses: Inícios de mês a avaliar
+        tipo_saida: Códigos int8 de tipo de saída (ver exit_types)
+    
+    Returns:
+        Dict com arrays 'headcount', 'desligados', 'voluntarios' e 'admissoes'
+        (um valor por mês)
+    """
+    inicio = meses.to_numpy(dtype="datetime64[ns]")
+    fim = (meses + pd.offsets.MonthBegin(1)).to_numpy(dtype="datetime64[ns]")
+    
+    adm_ok = ~np.isnat(adm)
+    desl_ok = ~np.isnat(desl)
+    
+    # Headcount no início do mês: admitidos até a data menos quem já saiu.
+    # Só sai do headcount quem também já tinha entrado, por isso usa max(adm, desl).
+    entradas = np.sort(adm[adm_ok])
+    ambos = adm_ok & desl_ok
+    saidas = np.sort(np.maximum(adm[ambos], desl[ambos]))
+    headcount = (
+        np.searchsorted(entradas, inicio, side="right") -
+        np.searchsorted(saidas, inicio, side="right")
+    )
+    
+    # Desligados no mês: desligamento em [início do mês, início do mês seguinte)
+    def _no_mes(datas: np.ndarray) -> np.ndarray:
+        datas = np.sort(datas)
+        return np.searchsorted(datas, fim, side="left") - np.searchsorted(datas, inicio, side="left")
+    
+    desligados = _no_mes(desl[desl_ok])
+    if tipo_saida is not None:
+        voluntarios = _no_mes(desl[desl_ok & (tipo_saida == TIPO_SAIDA_VOLUNTARIA)])
+    else:
+        voluntarios = np.zeros(len(meses), dtype=np.int64)
+    
+    # Admitidos no mês: reaproveita as admissões já ordenadas do headcount
+    admissoes = (
+        np.searchsorted(entradas, fim, side="left") -
+        np.searchsorted(entradas, inicio, side="left")
+    )
+    
+    return {
+        "headcount": headcount,
+        "desligados": desligados,
+        "voluntarios": voluntarios,
+        "admissoes": admissoes
+    }
+
+
+def _flow_columns(admissoes: np.ndarray, desligados: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Colunas de fluxo do histórico: entradas, saldo e taxa de reposição.
+    
+    Taxa de reposição = admissões / desligados * 100 (0 nos meses sem
+    desligamentos).
+    """
+    return {
+        "Admissões": admissoes,
+        "Saldo (Admissões - Desligados)": admissoes - desligados,
+        "Taxa de Reposição (%)": _pct(admissoes, desligados)
+    }
+
+
+def _pct(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Percentual num/den * 100, com 0 onde o denominador é 0."""
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    out = np.zeros(np.broadcast(num, den).shape, dtype=float)
+    np.divide(num * 100, den, out=out, where=den > 0)
+    return out
+
+
+def _date_range(datas: np.ndarray) -> Tuple[Optional[np.datetime64], Optional[np.datetime64]]:
+    """Retorna (menor, maior) data válida de um array datetime64 (None se vazio)."""
+    validas = datas[~np.isnat(datas)]
+    if not validas.size:
+        return None, None
+    return validas.min(), validas.max()
+
+
+def _history_months(wf) -> pd.DatetimeIndex:
+    """Meses do histórico: da primeira admissão ao último desligamento (ou hoje)."""
+    dmin, _ = _date_range(wf.admissao)
+    _, dmax = _date_range(wf.desligamento)
+    if dmin is None:
+        return pd.DatetimeIndex([])
+    if dmax is None:
+        dmax = datetime.now()
+    return pd.date_range(dmin, dmax, freq="MS")
+
+
+def _empty_turnover() -> Dict[str, float]:
+    return {
+        "turnover_total": 0.0,
+        "turnover_vol": 0.0,
+        "turnover_inv": 0.0,
+        "ativos": 0,
+        "desligados": 0,
+        "voluntarios": 0,
+        "involuntarios": 0
+    }
+
+
+def _month_number(ano: int, mes: int) -> int:
+    """Número sequencial do mês (ano * 12 + mês - 1)."""
+    return int(ano) * 12 + int(mes) - 1
+
+
+def _parse_month(mes: str) -> int:
+    """Converte 'YYYY-MM' em número sequencial do mês."""
+    ano, numero = mes.split("-")
+    return _month_number(int(ano), int(numero))
+
+
+def _total_series(wf) -> Optional[Dict[str, object]]:
+    """
+    Série mensal da base inteira, base de todos os filtros de competência.
+    
+    Cobre do mês do primeiro evento (admissão ou desligamento) até o mês
+    seguinte ao último; depois disso o headcount não muda mais e pode ser
+    repetido.
+    
+    Returns:
+        Dict com 'meses', 'numeros' (número sequencial de cada mês), os
+        arrays de `_group_monthly_counts` (1-D) e a janela do histórico
+        ('inicio_historico'/'fim_historico' como número do mês; fim None =
+        sem desligamentos, vai até hoje). None se não houver admissões.
+    """
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return None
+    
+    dmin, _ = _date_range(wf.admissao)
+    if dmin is None:
+        return None
+    _, dmax = _date_range(wf.desligamento)
+    
+    primeiro, ultimo = _date_range(np.concatenate([wf.admissao, wf.desligamento]))
+    meses = pd.date_range(
+        pd.Timestamp(primeiro).to_period("M").to_timestamp(),
+        pd.Timestamp(ultimo).to_period("M").to_timestamp() + pd.offsets.MonthBegin(1),
+        freq="MS"
+    )
+    counts = _group_monthly_counts(
+        wf.admissao, wf.desligamento, wf.tipo_saida,
+        np.zeros(len(wf), dtype=np.int32), 1, meses
+    )
+    
+    # Janela de `_history_months`: primeiro início de mês após a primeira admissão
+    inicio_historico = pd.date_range(pd.Timestamp(dmin), periods=1, freq="MS")[0]
+    fim_historico = pd.Timestamp(dmax) if dmax is not None else None
+    
+    return {
+        "meses": meses,
+        "numeros": meses.year.to_numpy() * 12 + meses.month.to_numpy() - 1,
+        **{chave: valores[0] for chave, valores in counts.items()},
+        "inicio_historico": _month_number(inicio_historico.year, inicio_historico.month),
+        "fim_historico": _month_number(fim_historico.year, fim_historico.month) if fim_historico is not None else None
+    }
+
+
+def _series_from_aggregates(agregados: Dict[str, object]) -> Optional[Dict[str, object]]:
+    """Reconstrói a série de `_total_series` a partir da tabela salva."""
+    total = agregados.get("total") or []
+    if not total or not agregados.get("inicio_historico"):
+        return None
+    
+    serie = {
+        "numeros": np.array([_parse_month(linha["mes"]) for linha in total]),
+        "inicio_historico": _parse_month(agregados["inicio_historico"]),
+        "fim_historico": _parse_month(agregados["fim_historico"]) if agregados.get("fim_historico") else None
+    }
+    for chave in ("headcount", "desligados", "voluntarios", "admissoes"):
+        serie[chave] = np.array([linha[chave] for linha in total], dtype=np.int64)
+    return serie
+
+
+def build_monthly_aggregates(df: WorkforceData) -> Optional[Dict[str, object]]:
+    """
+    Materializa a tabela mensal usada pelas análises sem reler colaboradores.
+    
+    Já vem em formato serializável (listas de dicts) para ser salva junto
+    do dataset. Só o total da empresa é guardado: é o que as análises leem,
+    e o documento do dataset já carrega todos os colaboradores (limite de
+    1 MiB do Firestore).
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+    
+    Returns:
+        Dict com 'inicio_historico' e 'fim_historico' ('YYYY-MM'; fim None =
+        sem desligamentos, vai até hoje) e 'total' (uma linha por mês).
+        None se não houver datas de admissão.
+    """
+    wf = as_workforce(df)
+    serie = _total_series(wf)
+    if serie is None:
+        return None
+    
+    total = pd.DataFrame({
+        "mes": serie["meses"].strftime("%Y-%m"),
+        "headcount": serie["headcount"],
+        "desligados": serie["desligados"],
+        "voluntarios": serie["voluntarios"],
+        "involuntarios": serie["desligados"] - serie["voluntarios"],
+        "admissoes": serie["admissoes"]
+    })
+    
+    def _rotulo(numero: Optional[int]) -> Optional[str]:
+        return f"{numero // 12:04d}-{numero % 12 + 1:02d}" if numero is not None else None
+    
+    return {
+        "inicio_historico": _rotulo(serie["inicio_historico"]),
+        "fim_historico": _rotulo(serie["fim_historico"]),
+        "total": total.to_dict("records")
+    }
+
+
+def _turnover_from_series(
+    serie: Optional[Dict[str, object]],
+    ano_filtro: Optional[int] = None,
+    mes_filtro: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Turnover de um filtro de competência a partir da série mensal.
+    
+    Meses antes da série têm headcount 0; meses depois repetem o headcount
+    do último mês, sem desligamentos.
+    """
+    if serie is None:
+        return _empty_turnover()
+    
+    numeros = serie["numeros"]
+    
+    # Definir meses baseado no filtro
+    if ano_filtro is not None and mes_filtro is not None:
+        # Caso 1: Ano + Mês específico → apenas aquele mês
+        data = pd.Timestamp(int(ano_filtro), mes_filtro, 1)
+        selecionados = np.array([_month_number(data.year, data.month)])
+    elif ano_filtro is not None:
+        # Caso 2: Só ano → todos os meses daquele ano
+        selecionados = _month_number(int(ano_filtro), 1) + np.arange(12)
+    elif mes_filtro is not None:
+        # Caso 3: Só mês → aquele mês em todos os anos com admissão ou desligamento
+        if not 1 <= mes_filtro <= 12:
+            return _empty_turnover()
+        com_evento = (serie["admissoes"] > 0) | (serie["desligados"] > 0)
+        anos = np.unique(numeros[com_evento] // 12)
+        selecionados = anos * 12 + mes_filtro - 1
+    else:
+        # Caso 4: Nenhum filtro → TODO o período
+        fim = serie["fim_historico"]
+        if fim is None:
+            agora = datetime.now()
+            fim = _month_number(agora.year, agora.month)
+        selecionados = np.arange(serie["inicio_historico"], fim + 1)
+    
+    if len(selecionados) == 0:
+        return _empty_turnover()
+    
+    hc, d, dv = _series_values(serie, selecionados)
+    return _average_turnover(hc, d, dv)
+
+
+def _series_values(
+    serie: Dict[str, object],
+    selecionados: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Headcount, desligados e voluntários da série nos meses pedidos.
+    
+    `selecionados` (números de mês) pode ter qualquer formato; o resultado
+    tem o mesmo formato.
+    """
+    numeros = serie["numeros"]
+    idx = selecionados - numeros[0]
+    na_serie = (idx >= 0) & (idx < len(numeros))
+    pos = np.clip(idx, 0, len(numeros) - 1)
+    hc = np.where(na_serie, serie["headcount"][pos], np.where(idx < 0, 0, serie["headcount"][-1]))
+    d = np.where(na_serie, serie["desligados"][pos], 0)
+    dv = np.where(na_serie, serie["voluntarios"][pos], 0)
+    return hc, d, dv
+
+
+def _average_turnover(hc: np.ndarray, d: np.ndarray, dv: np.ndarray) -> Dict[str, float]:
+    """Média mensal de turnover e quantidades dos meses com headcount."""
+    return _average_turnover_rows(hc[np.newaxis], d[np.newaxis], dv[np.newaxis])[0]
+
+
+def _average_turnover_rows(hc: np.ndarray, d: np.ndarray, dv: np.ndarray) -> List[Dict[str, float]]:
+    """
+    `_average_turnover` aplicado a cada linha de matrizes (períodos x meses).
+    
+    As médias de todas as linhas saem de uma única redução; só a montagem
+    dos dicts é feita por linha.
+    """
+    # Meses sem headcount no início não entram na média
+    validos = hc > 0
+    meses_validos = validos.sum(axis=1)
+    di = d - dv
+    
+    def _media(valores: np.ndarray) -> np.ndarray:
+        return np.where(validos, valores, 0).sum(axis=1) / np.maximum(meses_validos, 1)
+    
+    colunas = {
+        "turnover_total": _media(_pct(d, hc)),
+        "turnover_vol": _media(_pct(dv, hc)),
+        "turnover_inv": _media(_pct(di, hc)),
+        "ativos": _media(hc),
+        "desligados": _media(d),
+        "voluntarios": _media(dv),
+        "involuntarios": _media(di)
+    }
+    
+    linhas = []
+    for i, n in enumerate(meses_validos.tolist()):
+        if n == 0:
+            linhas.append(_empty_turnover())
+            continue
+        linhas.append({
+            "turnover_total": round(float(colunas["turnover_total"][i]), 1),
+            "turnover_vol": round(float(colunas["turnover_vol"][i]), 1),
+            "turnover_inv": round(float(colunas["turnover_inv"][i]), 1),
+            "ativos": int(colunas["ativos"][i]),
+            "desligados": round(float(colunas["desligados"][i]), 1),
+            "voluntarios": round(float(colunas["voluntarios"][i]), 1),
+            "involuntarios": round(float(colunas["involuntarios"][i]), 1),
+            "meses_considerados": n
+        })
+    return linhas
+
+
+def calculate_turnover_by_period(
+    df: WorkforceData,
+    ano_filtro: Optional[int] = None,
+    mes_filtro: Optional[int] = None,
+    agregados: Optional[Dict[str, object]] = None
+) -> Dict[str, float]:
+    """
+    Calcula turnover baseado no filtro de competência.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        ano_filtro: Ano selecionado (None = todos os anos)
+        mes_filtro: Mês selecionado (None = todos os meses)
+        agregados: Tabela de `build_monthly_aggregates` (opcional). Quando
+            informada, o resultado sai da tabela e `df` não é lido.
+    
+    Lógica:
+    - Se ambos None → média mensal de TODO o período
+    - Se só ano → média mensal daquele ano
+    - Se ano + mês → dados daquele mês específico
+    - Se só mês → média mensal daquele mês em todos os anos
+    
+    Returns:
+        Dict com turnover e quantidades
+    """
+    if agregados is not None:
+        serie = _series_from_aggregates(agregados)
+    else:
+        serie = _total_series(as_workforce(df))
+    return _turnover_from_series(serie, ano_filtro, mes_filtro)
+
+
+def calculate_turnover_matrix(
+    df: WorkforceData,
+    agregados: Optional[Dict[str, object]] = None
+) -> Dict[str, object]:
+    """
+    Calcula o turnover de todos os filtros de competência de uma vez.
+    
+    Cada combinação de ano/mês é só um recorte diferente da mesma série
+    mensal: a série é montada uma vez, os meses de todos os anos viram uma
+    matriz (anos x 12) e as médias por competência, por ano e por mês do
+    ano saem de reduções sobre essa matriz. O resultado é uma tabela de
+    consulta que a interface pode guardar em cache e ler a cada troca de
+    filtro (ver `turnover_from_matrix`).
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        agregados: Tabela de `build_monthly_aggregates` (opcional). Quando
+            informada, o resultado sai da tabela e `df` não é lido.
+    
+    Returns:
+        Dict serializável com:
+        - 'total': sem filtro (todo o período)
+        - 'anos': {'YYYY': ...} média mensal de cada ano
+        - 'meses': {'M': ...} média de cada mês em todos os anos
+        - 'competencias': {'YYYY-MM': ...} cada mês de cada ano
+        Os valores têm o mesmo formato de `calculate_turnover_by_period`.
+    """
+    if agregados is not None:
+        serie = _series_from_aggregates(agregados)
+    else:
+        serie = _total_series(as_workforce(df))
+    
+    matriz = {
+        "total": _turnover_from_series(serie, None, None),
+        "anos": {},
+        "meses": {},
+        "competencias": {}
+    }
+    if serie is None:
+        matriz["meses"] = {str(mes): _empty_turnover() for mes in range(1, 13)}
+        return matriz
+    
+    numeros = serie["numeros"]
+    com_evento = (serie["admissoes"] > 0) | (serie["desligados"] > 0)
+    anos_evento = np.unique(numeros[com_evento] // 12)
+    # Todos os anos cobertos pela série (inclui anos sem evento no meio)
+    anos = np.arange(numeros[0] // 12, numeros[-1] // 12 + 1)
+    
+    hc, d, dv = _series_values(serie, anos[:, np.newaxis] * 12 + np.arange(12))
+    
+    por_competencia = _average_turnover_rows(hc.reshape(-1, 1), d.reshape(-1, 1), dv.reshape(-1, 1))
+    por_ano = _average_turnover_rows(hc, d, dv)
+    
+    # Filtro só de mês considera apenas os anos com admissão ou desligamento
+    linhas_evento = np.isin(anos, anos_evento)
+    por_mes = _average_turnover_rows(
+        hc[linhas_evento].T, d[linhas_evento].T, dv[linhas_evento].T
+    )
+    
+    for i, ano in enumerate(anos.tolist()):
+        matriz["anos"][str(ano)] = por_ano[i]
+        for mes in range(12):
+            matriz["competencias"][f"{ano:04d}-{mes + 1:02d}"] = por_competencia[i * 12 + mes]
+    matriz["meses"] = {str(mes + 1): por_mes[mes] for mes in range(12)}
+    return matriz
+
+
+def turnover_from_matrix(
+    matriz: Dict[str, object],
+    ano_filtro: Optional[int] = None,
+    mes_filtro: Optional[int] = None
+) -> Optional[Dict[str, float]]:
+    """
+    Consulta na matriz de `calculate_turnover_matrix` o filtro de competência.
+    
+    Returns:
+        O mesmo resultado de `calculate_turnover_by_period`, ou None se o
+        ano pedido estiver fora da série (o chamador pode recalcular).
+    """
+    if ano_filtro is not None and mes_filtro is not None:
+        return matriz["competencias"].get(f"{int(ano_filtro):04d}-{int(mes_filtro):02d}")
+    if ano_filtro is not None:
+        return matriz["anos"].get(str(int(ano_filtro)))
+    if mes_filtro is not None:
+        return matriz["meses"].get(str(int(mes_filtro)), _empty_turnover())
+    return matriz["total"]
+
+
+def calculate_turnover(
+    df: WorkforceData,
+    periodo_mes: Optional[datetime] = None
+) -> Dict[str, float]:
+    """
+    Calcula turnover total, voluntário e involuntário usando tipo desligamento e motivo.
+    
+    Fórmula: Turnover = (Desligados no mês / Headcount no início do mês) * 100
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        periodo_mes: Data de referência (se None, calcula histórico médio)
+    
+    Returns:
+        Dict com turnover_total, turnover_vol, turnover_inv e quantidades
+    """
+    wf = as_workforce(df)
+    
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return _empty_turnover()
+    
+    # Se tem período específico (competência)
+    if periodo_mes and "ativo" in wf.df.columns and "desligado_no_mes" in wf.df.columns:
+        # Headcount: ativos no início do mês (antes dos desligamentos)
+        a = int(wf.ativo.sum())
+        # Desligados no mês
+        mask_deslig = (wf.df["desligado_no_mes"] == True).to_numpy(dtype=bool)
+        d = int(mask_deslig.sum())
+        
+        if a == 0:
+            return _empty_turnover()
+        
+        # Tipo de saída já classificado no preparo
+        dv = int((wf.tipo_saida[mask_deslig] == TIPO_SAIDA_VOLUNTARIA).sum())
+        di = d - dv
+        
+        return {
+            "turnover_total": round((d / a) * 100, 1),
+            "turnover_vol": round((dv / a) * 100, 1),
+            "turnover_inv": round((di / a) * 100, 1),
+            "ativos": a,
+            "desligados": d,
+            "voluntarios": dv,
+            "involuntarios": di
+        }
+    
+    # Caso histórico (média mensal) - usando headcount do início de cada mês
+    resultado = calculate_turnover_by_period(wf, None, None)
+    resultado.pop("meses_considerados", None)
+    return resultado
+
+
+def calculate_turnover_history(df: WorkforceData) -> pd.DataFrame:
+    """
+    Calcula histórico mensal de turnover usando headcount do início do mês.
+    
+    Usa varredura sobre datas ordenadas (ver `_sweep_monthly_counts`):
+    o histórico inteiro custa O(N log N + M) mesmo em bases longas. As
+    admissões do mês saem da mesma varredura.
+    
+    Returns:
+        DataFrame com colunas: Mês, Headcount (início), Desligados, Voluntários,
+        Involuntários, Turnover Total (%), Turnover Voluntário (%),
+        Turnover Involuntário (%), Admissões, Saldo (Admissões - Desligados)
+        e Taxa de Reposição (%)
+    """
+    wf = as_workforce(df)
+    
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return pd.DataFrame()
+    
+    meses = _history_months(wf)
+    if len(meses) == 0:
+        return pd.DataFrame()
+    
+    counts = _sweep_monthly_counts(wf.admissao, wf.desligamento, meses, wf.tipo_saida)
+    hc = counts["headcount"]
+    d = counts["desligados"]
+    dv = counts["voluntarios"]
+    di = d - dv
+    
+    return pd.DataFrame({
+        "Mês": meses.strftime("%Y-%m"),
+        "Headcount (início)": hc,
+        "Desligados": d,
+        "Voluntários": dv,
+        "Involuntários": di,
+        "Turnover Total (%)": _pct(d, hc),
+        "Turnover Voluntário (%)": _pct(dv, hc),
+        "Turnover Involuntário (%)": _pct(di, hc),
+        **_flow_columns(counts["admissoes"], d)
+    })
+
+
+def _interval_cube(
+    grupos: np.ndarray,
+    inicio_idx: np.ndarray,
+    fim_idx: np.ndarray,
+    n_grupos: int,
+    n_meses: int
+) -> np.ndarray:
+    """
+    Matriz grupo × mês com 1 para cada intervalo [inicio_idx, fim_idx).
+    
+    Usa vetor de diferenças (+1 no início, -1 no fim) e soma acumulada;
+    índices iguais a `n_meses` caem numa coluna extra descartada.
+    """
+    largura = n_meses + 1
+    tamanho = n_grupos * largura
+    ok = fim_idx > inicio_idx
+    delta = (
+        np.bincount(grupos[ok] * largura + inicio_idx[ok], minlength=tamanho) -
+        np.bincount(grupos[ok] * largura + fim_idx[ok], minlength=tamanho)
+    )
+    return delta.reshape(n_grupos, largura).cumsum(axis=1)[:, :n_meses]
+
+
+def _group_monthly_counts(
+    adm: np.ndarray,
+    desl: np.ndarray,
+    tipo_saida: np.ndarray,
+    codes: np.ndarray,
+    n_grupos: int,
+    meses: pd.DatetimeIndex
+) -> Dict[str, np.ndarray]:
+    """
+    Versão agrupada de `_sweep_monthly_counts`: matrizes grupo × mês.
+    
+    Cada colaborador vira +1 no mês em que entra no headcount e -1 no mês
+    em que sai (vetor de diferenças), e os desligamentos caem direto na
+    célula (grupo, mês). Tudo é resolvido com `searchsorted` + `bincount`
+    numa única passada, sem filtrar o DataFrame por grupo.
+    
+    Args:
+        adm: Datas de admissão (datetime64[ns], NaT permitido)
+        desl: Datas de desligamento (datetime64[ns], NaT = ativo)
+        tipo_saida: Códigos int8 de tipo de saída (ver exit_types)
+        codes: Código do grupo de cada colaborador (-1 = sem grupo)
+        n_grupos: Quantidade de grupos
+        meses: Inícios de mês a avaliar (consecutivos)
+    
+    Returns:
+        Dict com matrizes 'headcount', 'desligados', 'voluntarios' e 'admissoes'
+        (n_grupos × meses)
+    """
+    n_meses = len(meses)
+    inicio = meses.to_numpy(dtype="datetime64[ns]")
+    fim = (meses + pd.offsets.MonthBegin(1)).to_numpy(dtype="datetime64[ns]")
+    
+    com_grupo = codes >= 0
+    adm_ok = com_grupo & ~np.isnat(adm)
+    desl_ok = com_grupo & ~np.isnat(desl)
+    
+    # Headcount: entra no primeiro mês com início >= admissão e sai no primeiro
+    # mês com início >= max(admissão, desligamento)
+    entrada = np.searchsorted(inicio, adm[adm_ok], side="left")
+    saida = np.full(len(entrada), n_meses)
+    com_saida = desl_ok[adm_ok]
+    saida[com_saida] = np.searchsorted(
+        inicio, np.maximum(adm[adm_ok][com_saida], desl[adm_ok][com_saida]), side="left"
+    )
+    headcount = _interval_cube(codes[adm_ok], entrada, saida, n_grupos, n_meses)
+    
+    # Eventos no mês: mês cujo intervalo [início, fim) contém a data
+    def _celulas(datas: np.ndarray, grupos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        idx = np.searchsorted(inicio, datas, side="right") - 1
+        no_grid = idx >= 0
+        no_grid[no_grid] = datas[no_grid] < fim[idx[no_grid]]
+        return grupos[no_grid] * n_meses + idx[no_grid], no_grid
+    
+    tamanho = n_grupos * n_meses
+    celulas, no_grid = _celulas(desl[desl_ok], codes[desl_ok])
+    voluntario = tipo_saida[desl_ok][no_grid] == TIPO_SAIDA_VOLUNTARIA
+    desligados = np.bincount(celulas, minlength=tamanho)
+    voluntarios = np.bincount(celulas[voluntario], minlength=tamanho)
+    celulas, _ = _celulas(adm[adm_ok], codes[adm_ok])
+    admissoes = np.bincount(celulas, minlength=tamanho)
+    
+    return {
+        "headcount": headcount,
+        "desligados": desligados.reshape(n_grupos, n_meses),
+        "voluntarios": voluntarios.reshape(n_grupos, n_meses),
+        "admissoes": admissoes.reshape(n_grupos, n_meses)
+    }
+
+
+def _group_history(wf, group_by: str) -> Optional[Dict[str, object]]:
+    """
+    Monta as matrizes grupo × mês e a janela de histórico de cada grupo.
+    
+    A janela repete `_history_months` aplicada ao grupo isolado: do primeiro
+    início de mês após a menor admissão até o último desligamento (ou hoje).
+    
+    Returns:
+        Dict com 'coluna', 'categorias', 'meses', 'janela' (máscara grupo × mês)
+        e as matrizes de `_group_monthly_counts`; None se não houver dados
+    """
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return None
+    
+    group_col, codes, categorias = wf.group_codes(group_by)
+    if not group_col or len(categorias) == 0:
+        return None
+    
+    grade = _history_grid(wf, codes, len(categorias))
+    if grade is None:
+        return None
+    return {
+        "coluna": group_col,
+        "categorias": categorias,
+        **grade
+    }
+
+
+def _history_grid(wf, codes: np.ndarray, n_grupos: int) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Grade grupo × mês para códigos de grupo já calculados (-1 = sem grupo).
+    
+    Returns:
+        Dict com 'meses', 'janela' e as matrizes de `_group_monthly_counts`;
+        None se nenhum grupo tiver admissão
+    """
+    # Menor admissão e maior desligamento por grupo (int64; NaT = mínimo int64)
+    nat = np.iinfo(np.int64).min
+    adm_i8 = wf.admissao.view("int64")
+    desl_i8 = wf.desligamento.view("int64")
+    
+    primeira_adm = np.full(n_grupos, np.iinfo(np.int64).max, dtype=np.int64)
+    ok = (codes >= 0) & (adm_i8 != nat)
+    np.minimum.at(primeira_adm, codes[ok], adm_i8[ok])
+    ultimo_desl = np.full(n_grupos, nat, dtype=np.int64)
+    ok = (codes >= 0) & (desl_i8 != nat)
+    np.maximum.at(ultimo_desl, codes[ok], desl_i8[ok])
+    
+    com_adm = primeira_adm != np.iinfo(np.int64).max
+    if not com_adm.any():
+        return None
+    ultimo_desl[ultimo_desl == nat] = pd.Timestamp(datetime.now()).value
+    
+    meses = pd.date_range(
+        pd.Timestamp(primeira_adm[com_adm].min()),
+        pd.Timestamp(ultimo_desl[com_adm].max()),
+        freq="MS"
+    )
+    inicio = meses.to_numpy(dtype="datetime64[ns]").view("int64")
+    primeiro_mes = np.searchsorted(inicio, primeira_adm, side="left")
+    fim_mes = np.searchsorted(inicio, ultimo_desl, side="right")
+    posicao = np.arange(len(meses))
+    janela = (
+        com_adm[:, None] &
+        (posicao[None, :] >= primeiro_mes[:, None]) &
+        (posicao[None, :] < fim_mes[:, None])
+    )
+    
+    counts = _group_monthly_counts(
+        wf.admissao, wf.desligamento, wf.tipo_saida, codes, n_grupos, meses
+    )
+    return {
+        "meses": meses,
+        "janela": janela,
+        **counts
+    }
+
+
+def calculate_turnover_history_by_group(df: WorkforceData, group_by: str = "departamento") -> pd.DataFrame:
+    """
+    Histórico mensal de turnover de todos os grupos em uma única passada.
+    
+    Equivale a chamar `calculate_turnover_history` para cada valor de
+    `group_by`, mas sem filtrar o DataFrame grupo a grupo.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        group_by: Coluna de agrupamento (ex.: departamento, cargo)
+    
+    Returns:
+        DataFrame longo com a coluna do grupo e as colunas de
+        `calculate_turnover_history` (um registro por grupo e mês do histórico do grupo)
+    """
+    wf = as_workforce(df)
+    hist = _group_history(wf, group_by)
+    if hist is None:
+        return pd.DataFrame()
+    
+    janela = hist["janela"]
+    grupo_idx, mes_idx = np.nonzero(janela)
+    hc = hist["headcount"][janela]
+    d = hist["desligados"][janela]
+    dv = hist["voluntarios"][janela]
+    di = d - dv
+    
+    return pd.DataFrame({
+        hist["coluna"]: hist["categorias"][grupo_idx],
+        "Mês": hist["meses"].strftime("%Y-%m")[mes_idx],
+        "Headcount (início)": hc,
+        "Desligados": d,
+        "Voluntários": dv,
+        "Involuntários": di,
+        "Turnover Total (%)": _pct(d, hc),
+        "Turnover Voluntário (%)": _pct(dv, hc),
+        "Turnover Involuntário (%)": _pct(di, hc),
+        **_flow_columns(hist["admissoes"][janela], d)
+    })
+
+
+def calculate_turnover_by_group(df: WorkforceData, group_by: str = "departamento") -> Dict[object, Dict[str, float]]:
+    """
+    Turnover médio histórico de cada grupo em uma única passada.
+    
+    Cada valor é igual a `calculate_turnover(df[df[group_by] == grupo])`.
+    Meses sem headcount não entram na média.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        group_by: Coluna de agrupamento (ex.: departamento, cargo)
+    
+    Returns:
+        Dict {grupo: dict no formato de `calculate_turnover`}
+    """
+    wf = as_workforce(df)
+    hist = _group_history(wf, group_by)
+    if hist is None:
+        return {}
+    
+    hc = hist["headcount"]
+    d = hist["desligados"]
+    dv = hist["voluntarios"]
+    di = d - dv
+    
+    validos = hist["janela"] & (hc > 0)
+    n_validos = validos.sum(axis=1)
+    
+    def _media(valores: np.ndarray) -> np.ndarray:
+        soma = np.where(validos, valores, 0).sum(axis=1)
+        return np.divide(soma, n_validos, out=np.zeros(len(soma)), where=n_validos > 0)
+    
+    turnover_total = _media(_pct(d, hc))
+    turnover_vol = _media(_pct(dv, hc))
+    turnover_inv = _media(_pct(di, hc))
+    ativos = _media(hc)
+    desligados = _media(d)
+    voluntarios = _media(dv)
+    involuntarios = _media(di)
+    
+    resultado = {}
+    for g, grupo in enumerate(hist["categorias"]):
+        if n_validos[g] == 0:
+            resultado[grupo] = _empty_turnover()
+            continue
+        resultado[grupo] = {
+            "turnover_total": round(float(turnover_total[g]), 1),
+            "turnover_vol": round(float(turnover_vol[g]), 1),
+            "turnover_inv": round(float(turnover_inv[g]), 1),
+            "ativos": int(ativos[g]),
+            "desligados": round(float(desligados[g]), 1),
+            "voluntarios": round(float(voluntarios[g]), 1),
+            "involuntarios": round(float(involuntarios[g]), 1)
+        }
+    return resultado
+
+
+# Métodos de anualização do turnover em janela móvel
+ANNUALIZATION_METHODS = ("nenhuma", "linear", "composta")
+
+
+def _rolling_sum(valores: np.ndarray, janela: int) -> np.ndarray:
+    """
+    Soma móvel no último eixo via somas acumuladas: cada janela custa O(1).
+    Posições sem janela completa ficam com NaN.
+    """
+    valores = np.asarray(valores, dtype=float)
+    acumulado = np.cumsum(valores, axis=-1)
+    zeros = np.zeros(valores.shape[:-1] + (1,))
+    acumulado = np.concatenate([zeros, acumulado], axis=-1)
+    soma = np.full(valores.shape, np.nan)
+    if janela <= valores.shape[-1]:
+        soma[..., janela - 1:] = acumulado[..., janela:] - acumulado[..., :-janela]
+    return soma
+
+
+def _rolling_rates(
+    hc: np.ndarray,
+    d: np.ndarray,
+    dv: np.ndarray,
+    janela: int,
+    anualizacao: str
+) -> Dict[str, np.ndarray]:
+    """
+    Turnover em janela móvel: desligados da janela / headcount médio da janela.
+    
+    Anualização:
+    - "nenhuma": taxa da janela como está
+    - "linear": taxa da janela × 12 / janela
+    - "composta": 1 - (1 - taxa mensal média) ^ 12
+    """
+    hc_medio = _rolling_sum(hc, janela) / janela
+    somas = {
+        "desligados": _rolling_sum(d, janela),
+        "voluntarios": _rolling_sum(dv, janela),
+        "involuntarios": _rolling_sum(np.asarray(d) - np.asarray(dv), janela)
+    }
+    
+    taxas = {}
+    for chave, soma in somas.items():
+        taxa = np.divide(soma, hc_medio, out=np.zeros(hc_medio.shape), where=hc_medio > 0)
+        if anualizacao == "linear":
+            taxa = taxa * 12 / janela
+        elif anualizacao == "composta":
+            taxa = 1 - (1 - np.clip(taxa / janela, 0, 1)) ** 12
+        taxas[chave] = np.where(np.isnan(hc_medio), np.nan, taxa * 100)
+    
+    return {"headcount_medio": hc_medio, **somas, "taxas": taxas}
+
+
+def calculate_rolling_turnover(
+    df: WorkforceData,
+    janela: int = 12,
+    anualizacao: str = "linear",
+    group_by: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Turnover em janela móvel (ex.: últimos 12 meses) para cada mês do histórico.
+    
+    Soma os desligamentos e tira a média do headcount (início do mês) dos
+    últimos `janela` meses usando somas acumuladas, então o histórico
+    inteiro custa O(meses). Só entram meses com janela completa.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        janela: Tamanho da janela em meses
+        anualizacao: "nenhuma", "linear" ou "composta" (ver `_rolling_rates`)
+        group_by: Coluna de agrupamento (ex.: departamento); None = empresa toda
+    
+    Returns:
+        DataFrame com Mês (último mês da janela), Headcount Médio, Desligados,
+        Voluntários, Involuntários e Turnover Total/Voluntário/Involuntário (%),
+        mais a coluna do grupo quando `group_by` é informado
+    """
+    if janela < 1:
+        raise ValueError("janela deve ser de pelo menos 1 mês")
+    if anualizacao not in ANNUALIZATION_METHODS:
+        raise ValueError(f"anualizacao deve ser uma de {ANNUALIZATION_METHODS}")
+    
+    wf = as_workforce(df)
+    
+    if group_by is None:
+        if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+            return pd.DataFrame()
+        meses = _history_months(wf)
+        if len(meses) < janela:
+            return pd.DataFrame()
+        counts = _sweep_monthly_counts(wf.admissao, wf.desligamento, meses, wf.tipo_saida)
+        movel = _rolling_rates(counts["headcount"], counts["desligados"], counts["voluntarios"], janela, anualizacao)
+        completos = ~np.isnan(movel["headcount_medio"])
+        colunas = {"Mês": meses.strftime("%Y-%m")[completos]}
+    else:
+        hist = _group_history(wf, group_by)
+        if hist is None:
+            return pd.DataFrame()
+        meses = hist["meses"]
+        movel = _rolling_rates(hist["headcount"], hist["desligados"], hist["voluntarios"], janela, anualizacao)
+        # Janela completa dentro do histórico do próprio grupo
+        completos = _rolling_sum(hist["janela"], janela) == janela
+        grupo_idx, mes_idx = np.nonzero(completos)
+        colunas = {
+            hist["coluna"]: hist["categorias"][grupo_idx],
+            "Mês": meses.strftime("%Y-%m")[mes_idx]
+        }
+    
+    taxas = movel["taxas"]
+    resultado = pd.DataFrame({
+        **colunas,
+        "Headcount Médio": movel["headcount_medio"][completos].round(1),
+        "Desligados": movel["desligados"][completos].astype(int),
+        "Voluntários": movel["voluntarios"][completos].astype(int),
+        "Involuntários": movel["involuntarios"][completos].astype(int),
+        "Turnover Total (%)": taxas["desligados"][completos].round(2),
+        "Turnover Voluntário (%)": taxas["voluntarios"][completos].round(2),
+        "Turnover Involuntário (%)": taxas["involuntarios"][completos].round(2)
+    })
+    return resultado
+
+
+def calculate_tenure(df: WorkforceData) -> Dict[str, float]:
+    """
+    Calcula tenure médio (tempo até desligamento).
+    
+    Returns:
+        Dict com tenure_total, tenure_vol, tenure_inv (em meses)
+    """
+    wf = as_workforce(df)
+    
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return {"tenure_total": 0.0, "tenure_vol": 0.0, "tenure_inv": 0.0}
+    
+    # Filtrar apenas desligados
+    mask_desl = ~wf.ativo if wf.tem_flag_ativo else np.ones(len(wf), dtype=bool)
+    
+    if not mask_desl.any():
+        return {"tenure_total": 0.0, "tenure_vol": 0.0, "tenure_inv": 0.0}
+    
+    tenure_meses = pd.Series(
+        pd.TimedeltaIndex(wf.desligamento[mask_desl] - wf.admissao[mask_desl]).days / 30
+    )
+    
+    tenure_total = safe_mean(tenure_meses)
+    
+    # Tipo de saída já classificado no preparo
+    mask_vol = wf.tipo_saida[mask_desl] == TIPO_SAIDA_VOLUNTARIA
+    
+    if mask_vol.any():
+        tenure_vol = safe_mean(tenure_meses[mask_vol])
+        tenure_inv = safe_mean(tenure_meses[~mask_vol])
+    else:
+        tenure_vol = tenure_total
+        tenure_inv = tenure_total
+    
+    return {
+        "tenure_total": tenure_total,
+        "tenure_vol": tenure_vol,
+        "tenure_inv": tenure_inv
+    }
+
+
+def _active_at(wf, data_referencia) -> np.ndarray:
+    """Máscara de quem estava ativo na data (admitido até ela e não desligado antes)."""
+    ref = np.datetime64(pd.Timestamp(data_referencia), "ns")
+    return (wf.admissao <= ref) & (np.isnat(wf.desligamento) | (wf.desligamento > ref))
+
+
+def calculate_headcount(df: WorkforceData, group_by: str = "departamento", data_referencia: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Calcula headcount agrupado por coluna especificada em uma data de referência.
+    Exclui apenas quem tem data de desligamento anterior à referência.
+    
+    Args:
+        df: DataFrame com colaboradores (ou PreparedWorkforce)
+        group_by: Coluna para agrupar (padrão: "departamento")
+        data_referencia: Data de referência (None = atual)
+    
+    Returns:
+        DataFrame com headcount e percentual
+    """
+    wf = as_workforce(df)
+    group_col = wf.col(group_by)
+    
+    if not group_col:
+        return pd.DataFrame()
+    
+    adm_col = wf.cols["admissao"]
+    desl_col = wf.cols["desligamento"]
+    
+    if data_referencia is None:
+        data_referencia = datetime.now()
+    
+    # Filtrar quem estava ativo na data de referência
+    if adm_col and desl_col:
+        mask = _active_at(wf, data_referencia)
+    elif desl_col:
+        ref = np.datetime64(pd.Timestamp(data_referencia), "ns")
+        mask = np.isnat(wf.desligamento) | (wf.desligamento > ref)
+    elif "ativo" in wf.df.columns:
+        mask = wf.ativo
+    else:
+        mask = np.ones(len(wf), dtype=bool)
+    
+    base = wf.df[mask]
+    
+    if base.empty:
+        return pd.DataFrame()
+    
+    mat_col = wf.cols["matricula"]
+    if not mat_col:
+        return pd.DataFrame()
+    
+    dist = base.groupby(group_col)[mat_col].count().reset_index()
+    dist.columns = [group_by, "Headcount"]
+    dist["%"] = (dist["Headcount"] / dist["Headcount"].sum()) * 100
+    
+    return dist.sort_values("Headcount", ascending=False).reset_index(drop=True)
+
+
+# Faixas de tempo de casa (meses) usadas na evolução do headcount
+FAIXAS_TEMPO_CASA = [0, 6, 12, 24, 36, np.inf]
+FAIXAS_TEMPO_CASA_LABELS = ["0-6m", "6-12m", "12-24m", "24-36m", "+36m"]
+
+
+def _active_month_indices(wf, meses: pd.DatetimeIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intervalo de meses [início, fim) em que cada colaborador está ativo.
+    
+    Ativo no início do mês m: admissão <= m e (sem desligamento ou desligamento > m),
+    o mesmo critério de `_active_at`. Sem admissão = nunca ativo.
+    """
+    inicio = meses.to_numpy(dtype="datetime64[ns]")
+    n_meses = len(meses)
+    
+    entrada = np.full(len(wf), n_meses)
+    adm_ok = ~np.isnat(wf.admissao)
+    entrada[adm_ok] = np.searchsorted(inicio, wf.admissao[adm_ok], side="left")
+    
+    saida = np.full(len(wf), n_meses)
+    desl_ok = ~np.isnat(wf.desligamento)
+    saida[desl_ok] = np.searchsorted(inicio, wf.desligamento[desl_ok], side="left")
+    return entrada, saida
+
+
+def _headcount_cube(
+    wf,
+    meses: pd.DatetimeIndex,
+    codes: np.ndarray,
+    n_grupos: int,
+    contar: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cubo grupo × mês de headcount no início do mês.
+    
+    Args:
+        wf: Base preparada
+        meses: Inícios de mês (consecutivos)
+        codes: Código do grupo de cada colaborador (-1 = fora dos grupos)
+        n_grupos: Quantidade de grupos
+        contar: Máscara de quem entra na contagem (ex.: matrícula preenchida)
+    
+    Returns:
+        (headcount, presentes): contagem de `contar` e de todos os ativos
+        por grupo e mês
+    """
+    entrada, saida = _active_month_indices(wf, meses)
+    ok = codes >= 0
+    presentes = _interval_cube(codes[ok], entrada[ok], saida[ok], n_grupos, len(meses))
+    ok &= contar
+    headcount = _interval_cube(codes[ok], entrada[ok], saida[ok], n_grupos, len(meses))
+    return headcount, presentes
+
+
+def _tenure_band_cube(wf, meses: pd.DatetimeIndex, contar: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cubo faixa de tempo de casa × mês.
+    
+    A faixa muda com o tempo: cada colaborador ativo é dividido em um
+    intervalo de meses por faixa. Tempo de casa = dias completos / 30, com
+    limites fechados à direita (0-6m inclui 0 e 6).
+    """
+    inicio = meses.to_numpy(dtype="datetime64[ns]")
+    n_meses = len(meses)
+    n_faixas = len(FAIXAS_TEMPO_CASA_LABELS)
+    entrada, saida = _active_month_indices(wf, meses)
+    
+    # Mês a partir do qual cada colaborador passa do limite superior da faixa:
+    # dias > limite * 30  <=>  mês >= admissão + (limite * 30 + 1) dias
+    adm_ok = ~np.isnat(wf.admissao)
+    cortes = [entrada]
+    for limite in FAIXAS_TEMPO_CASA[1:-1]:
+        corte = np.full(len(wf), n_meses)
+        virada = wf.admissao[adm_ok] + np.timedelta64(int(limite * 30) + 1, "D")
+        corte[adm_ok] = np.searchsorted(inicio, virada, side="left")
+        cortes.append(np.clip(corte, entrada, np.maximum(saida, entrada)))
+    cortes.append(np.maximum(saida, entrada))
+    
+    grupos = np.repeat(np.arange(n_faixas), len(wf))
+    comeca = np.concatenate(cortes[:-1])
+    termina = np.concatenate(cortes[1:])
+    presentes = _interval_cube(grupos, comeca, termina, n_faixas, n_meses)
+    ok = np.tile(contar, n_faixas)
+    headcount = _interval_cube(grupos[ok], comeca[ok], termina[ok], n_faixas, n_meses)
+    return headcount, presentes
+
+
+def _cube_to_long(
+    headcount: np.ndarray,
+    manter: np.ndarray,
+    meses: pd.DatetimeIndex,
+    categorias,
+    col_name: str
+) -> pd.DataFrame:
+    """Converte o cubo grupo × mês em formato longo: {col_name}, Headcount, Mês."""
+    mes_idx, grupo_idx = np.nonzero(manter.T)
+    return pd.DataFrame({
+        col_name: categorias[grupo_idx],
+        "Headcount": headcount[grupo_idx, mes_idx],
+        "Mês": meses.strftime("%Y-%m")[mes_idx]
+    })
+
+
+def calculate_headcount_temporal(df: WorkforceData, group_by: str = "departamento") -> pd.DataFrame:
+    """
+    Calcula evolução temporal do headcount agrupado por coluna especificada.
+    
+    Monta o cubo grupo × mês de uma vez (ver `_headcount_cube`) em vez de
+    filtrar a base mês a mês.
+    
+    Args:
+        df: DataFrame com colaboradores (ou PreparedWorkforce)
+        group_by: Coluna para agrupar (padrão: "departamento")
+    
+    Returns:
+        DataFrame com colunas: Mês, {group_by}, Headcount
+    """
+    wf = as_workforce(df)
+    group_col, codes, categorias = wf.group_codes(group_by)
+    mat_col = wf.cols["matricula"]
+    
+    if not group_col or not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return pd.DataFrame()
+    
+    meses = _history_months(wf)
+    if len(meses) == 0 or not mat_col or len(categorias) == 0:
+        return pd.DataFrame()
+    
+    contar = wf.df[mat_col].notna().to_numpy()
+    headcount, presentes = _headcount_cube(wf, meses, codes, len(categorias), contar)
+    if not presentes.any():
+        return pd.DataFrame()
+    
+    result = _cube_to_long(headcount, presentes > 0, meses, categorias, group_by)
+    return result.sort_values(["Mês", group_by]).reset_index(drop=True)
+
+
+def calculate_headcount_growth(df_temporal: pd.DataFrame, group_by: str = "departamento") -> pd.DataFrame:
+    """
+    Calcula crescimento do headcount ao longo do tempo.
+    
+    Args:
+        df_temporal: DataFrame retornado por calculate_headcount_temporal
+        group_by: Coluna de agrupamento
+    
+    Returns:
+        DataFrame com crescimento absoluto e percentual
+    """
+    if df_temporal.empty or "Mês" not in df_temporal.columns or "Headcount" not in df_temporal.columns:
+        return pd.DataFrame()
+    
+    df_growth = df_temporal.copy()
+    df_growth = df_growth.sort_values(["Mês", group_by])
+    
+    # Calcular crescimento por grupo
+    df_growth["Headcount_anterior"] = df_growth.groupby(group_by)["Headcount"].shift(1)
+    df_growth["Crescimento_Absoluto"] = df_growth["Headcount"] - df_growth["Headcount_anterior"]
+    df_growth["Crescimento_%"] = (
+        ((df_growth["Headcount"] - df_growth["Headcount_anterior"]) / df_growth["Headcount_anterior"]) * 100
+    ).round(2)
+    df_growth["Crescimento_%"] = df_growth["Crescimento_%"].fillna(0)
+    
+    return df_growth
+
+
+def _category_counts(wf, key: str, mask: np.ndarray) -> np.ndarray:
+    """
+    Quantidade de linhas em `mask` por código de uma coluna categórica.
+    A última posição conta os vazios (código -1).
+    """
+    n = len(wf.categorias[key])
+    codes = wf.codes[key][mask]
+    return np.bincount(np.where(codes < 0, n, codes), minlength=n + 1)
+
+
+def _contract_types(wf, contagens: Optional[np.ndarray]) -> pd.DataFrame:
+    """Distribuição de tipos de contrato a partir das contagens por categoria."""
+    if contagens is None or contagens[:-1].sum() == 0:
+        return pd.DataFrame()
+    
+    # Vazios não entram (como em value_counts)
+    presentes = contagens[:-1] > 0
+    dist = pd.DataFrame({
+        "Tipo": wf.categorias["tipo_contrato"][presentes],
+        "Quantidade": contagens[:-1][presentes]
+    })
+    dist["Percentual (%)"] = (dist["Quantidade"] / dist["Quantidade"].sum() * 100).round(1)
+    
+    return dist.sort_values("Quantidade", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def calculate_contract_types(df: WorkforceData) -> pd.DataFrame:
+    """
+    Calcula distribuição de todos os tipos de contrato com % e quantidade.
+    
+    Returns:
+        DataFrame com Tipo, Quantidade, Percentual
+    """
+    wf = as_workforce(df)
+    
+    if not wf.cols["tipo_contrato"] or not wf.ativo.any():
+        return pd.DataFrame()
+    
+    return _contract_types(wf, _category_counts(wf, "tipo_contrato", wf.ativo))
+
+
+def calculate_headcount_by_dimension_temporal(df: WorkforceData, dimension: str) -> pd.DataFrame:
+    """
+    Calcula evolução temporal do headcount por dimensão específica (gênero, tempo de casa, performance).
+    
+    Args:
+        df: DataFrame com colaboradores (ou PreparedWorkforce)
+        dimension: "genero", "tempo_casa" (faixas), ou "avaliacao" (performance)
+    
+    Returns:
+        DataFrame temporal com evolução
+    """
+    wf = as_workforce(df)
+    
+    if not wf.cols["admissao"] or not wf.cols["desligamento"]:
+        return pd.DataFrame()
+    
+    meses = _history_months(wf)
+    if len(meses) == 0:
+        return pd.DataFrame()
+    
+    # Mapear dimensão para coluna
+    if dimension == "genero":
+        dim_key = "genero"
+        col_name = "Gênero"
+    elif dimension == "tempo_casa":
+        dim_key = None  # Vamos calcular faixas
+        col_name = "Faixa Tempo de Casa"
+    elif dimension == "avaliacao" or dimension == "performance":
+        dim_key = "avaliacao"
+        col_name = "Performance"
+    else:
+        return pd.DataFrame()
+    
+    mat_col = wf.cols["matricula"]
+    if not mat_col:
+        return pd.DataFrame()
+    contar = wf.df[mat_col].notna().to_numpy()
+    
+    if dimension == "tempo_casa":
+        headcount, presentes = _tenure_band_cube(wf, meses, contar)
+        # Todas as faixas aparecem nos meses com algum ativo
+        manter = np.broadcast_to(presentes.sum(axis=0) > 0, presentes.shape)
+        categorias = np.asarray(FAIXAS_TEMPO_CASA_LABELS, dtype=object)
+    elif dim_key in wf.codes:
+        categorias = wf.categorias[dim_key]
+        headcount, presentes = _headcount_cube(wf, meses, wf.codes[dim_key], len(categorias), contar)
+        manter = presentes > 0
+    else:
+        return pd.DataFrame()
+    
+    if not manter.any():
+        return pd.DataFrame()
+    
+    result = _cube_to_long(headcount, manter, meses, categorias, col_name)
+    if dimension == "tempo_casa":
+        result[col_name] = pd.Categorical(result[col_name], categories=FAIXAS_TEMPO_CASA_LABELS, ordered=True)
+    return result.sort_values(["Mês", col_name]).reset_index(drop=True)
+
+
+def calculate_monthly_dismissals(df: WorkforceData) -> Dict[str, float]:
+    """
+    Calcula desligamentos médios por mês.
+    
+    Returns:
+        Dict com desligamentos_medio_mes e detalhamento
+    """
+    wf = as_workforce(df)
+    
+    if not wf.cols["desligamento"]:
+        return {
+            "desligamentos_medio_mes": 0.0,
+            "total_desligados": 0,
+            "meses_com_dados": 0
+        }
+    
+    # Apenas quem tem data de desligamento, agrupado por mês
+    desligados = wf.desligamento[~np.isnat(wf.desligamento)]
+    
+    if not desligados.size:
+        return {
+            "desligamentos_medio_mes": 0.0,
+            "total_desligados": 0,
+            "meses_com_dados": 0
+        }
+    
+    _, desligados_por_mes = np.unique(desligados.astype("datetime64[M]"), return_counts=True)
+    
+    return {
+        "desligamentos_medio_mes": round(float(desligados_por_mes.mean()), 1),
+        "total_desligados": int(desligados.size),
+        "meses_com_dados": int(desligados_por_mes.size)
+    }
+
+
+def _count_matching(contagens: np.ndarray, categorias: np.ndarray, predicate) -> int:
+    """
+    Soma as contagens por categoria (ver `_category_counts`) que satisfazem `predicate`.
+    O predicado é avaliado uma vez por categoria (texto) em vez de por linha.
+    """
+    textos = pd.Index(categorias).astype(str)
+    # Código -1 (vazio) vira o texto "nan", como em astype(str)
+    flags = np.append(np.asarray(predicate(textos), dtype=bool), bool(predicate(pd.Index(["nan"]))[0]))
+    return int(contagens[flags].sum())
+
+
+def _basic_kpis(wf, contagens: Dict[str, np.ndarray]) -> Dict[str, any]:
+    """KPIs básicos a partir das contagens de ativos por categoria."""
+    total_ativos = int(wf.ativo.sum())
+    
+    # Tipo de contrato
+    if "tipo_contrato" in contagens and total_ativos > 0:
+        qtd_clt = _count_matching(
+            contagens["tipo_contrato"], wf.categorias["tipo_contrato"], lambda t: t.str.upper() == "CLT"
+        )
+        pct_clt = round((qtd_clt / total_ativos) * 100, 1)
+    else:
+        qtd_clt = 0
+        pct_clt = 0.0
+    
+    # Gênero
+    if "genero" in contagens and total_ativos > 0:
+        qtd_fem = _count_matching(
+            contagens["genero"], wf.categorias["genero"], lambda t: t.str.lower() == "feminino"
+        )
+        qtd_masc = _count_matching(
+            contagens["genero"], wf.categorias["genero"], lambda t: t.str.lower().isin(["masculino", "m"])
+        )
+        pct_fem = round((qtd_fem / total_ativos) * 100, 1)
+        pct_masc = round((qtd_masc / total_ativos) * 100, 1)
+    else:
+        qtd_fem = 0
+        qtd_masc = 0
+        pct_fem = 0.0
+        pct_masc = 0.0
+    
+    # Liderança
+    if "cargo" in contagens and total_ativos > 0:
+        qtd_lider = _count_matching(
+            contagens["cargo"], wf.categorias["cargo"],
+            lambda t: t.str.lower().str.contains("coord|gerente|diretor", na=False)
+        )
+        pct_lider = round((qtd_lider / total_ativos) * 100, 1)
+    else:
+        qtd_lider = 0
+        pct_lider = 0.0
+    
+    return {
+        "total_ativos": total_ativos,
+        "qtd_clt": qtd_clt,
+        "pct_clt": pct_clt,
+        "qtd_feminino": qtd_fem,
+        "pct_feminino": pct_fem,
+        "qtd_masculino": qtd_masc,
+        "pct_masculino": pct_masc,
+        "qtd_lideranca": qtd_lider,
+        "pct_lideranca": pct_lider
+    }
+
+
+def _active_category_counts(wf) -> Dict[str, np.ndarray]:
+    """Contagens de ativos por categoria das colunas usadas na visão geral."""
+    return {
+        key: _category_counts(wf, key, wf.ativo)
+        for key in ("tipo_contrato", "genero", "cargo")
+        if key in wf.codes
+    }
+
+
+def calculate_basic_kpis(df: WorkforceData) -> Dict[str, any]:
+    """
+    Calcula KPIs básicos consolidados com quantidades e percentuais.
+    
+    Returns:
+        Dict com todos os KPIs básicos incluindo quantidades
+    """
+    wf = as_workforce(df)
+    return _basic_kpis(wf, _active_category_counts(wf))
+
+
+def calculate_overview_kpis(
+    df: WorkforceData,
+    ano_filtro: Optional[int] = None,
+    mes_filtro: Optional[int] = None,
+    agregados: Optional[Dict[str, object]] = None
+) -> Dict[str, object]:
+    """
+    Calcula todos os KPIs da visão geral a partir de intermediários compartilhados.
+    
+    A série mensal é montada uma vez e responde ao turnover filtrado, ao
+    turnover total e aos desligamentos por mês; as contagens de ativos por
+    categoria alimentam KPIs básicos e tipos de contrato.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        ano_filtro: Ano selecionado (None = todos os anos)
+        mes_filtro: Mês selecionado (None = todos os meses)
+        agregados: Tabela de `build_monthly_aggregates` (opcional)
+    
+    Returns:
+        Dict com basic_kpis, turnover, turnover_total, contract_types
+        (DataFrame), monthly_dismissals e tenure
+    """
+    wf = as_workforce(df)
+    
+    if agregados is not None:
+        serie = _series_from_aggregates(agregados)
+    else:
+        serie = _total_series(wf)
+    
+    contagens = _active_category_counts(wf)
+    
+    # Desligamentos por mês saem da mesma série do turnover
+    if serie is not None:
+        por_mes = serie["desligados"][serie["desligados"] > 0]
+        if por_mes.size:
+            monthly_dismissals = {
+                "desligamentos_medio_mes": round(float(por_mes.mean()), 1),
+                "total_desligados": int(por_mes.sum()),
+                "meses_com_dados": int(por_mes.size)
+            }
+        else:
+            monthly_dismissals = {
+                "desligamentos_medio_mes": 0.0,
+                "total_desligados": 0,
+                "meses_com_dados": 0
+            }
+    else:
+        monthly_dismissals = calculate_monthly_dismissals(wf)
+    
+    if "tipo_contrato" in contagens and wf.ativo.any():
+        contract_types = _contract_types(wf, contagens["tipo_contrato"])
+    else:
+        contract_types = pd.DataFrame()
+    
+    return {
+        "basic_kpis": _basic_kpis(wf, contagens),
+        "turnover": _turnover_from_series(serie, ano_filtro, mes_filtro),
+        "turnover_total": _turnover_from_series(serie, None, None),
+        "contract_types": contract_types,
+        "monthly_dismissals": monthly_dismissals,
+        "tenure": calculate_tenure(wf)
+    }
@@ -0,0 +1,393 @@
+"""
+Índice de risco de turnover (TRI).
+
+O TRI é uma média ponderada de cinco fatores normalizados em [0, 1]:
+performance (invertida), tempo sem promoção, tempo de casa, tamanho da
+equipe do gestor e tempo sem mérito. A matriz de fatores (colaboradores x
+fatores) é montada uma vez por base; qualquer combinação de pesos é
+calculada com um único produto matriz-vetor.
+"""
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from kpi_core.columns import col_like
+from kpi_core.workforce import WorkforceData, as_workforce
+
+
+# Fatores do TRI na ordem das colunas da matriz
+RISK_FACTORS = ("perf", "promo", "casa", "eq", "merito")
+
+RISK_FACTOR_LABELS = {
+    "perf": "Performance",
+    "promo": "Tempo s/ Promoção",
+    "casa": "Tempo de Casa",
+    "eq": "Tam. Equipe",
+    "merito": "Tempo s/ Mérito"
+}
+
+# Pesos padrão (somam 1)
+DEFAULT_RISK_WEIGHTS = {"perf": 0.30, "promo": 0.25, "casa": 0.15, "eq": 0.15, "merito": 0.15}
+
+# Avaliação -> nota bruta (ausente ou desconhecida = 4)
+PERFORMANCE_SCORES = {
+    "excepcional": 10,
+    "acima do esperado": 7,
+    "dentro do esperado": 4,
+    "abaixo do esperado": 1
+}
+
+# Faixas de risco para distribuição
+RISK_BANDS = [0, 20, 40, 60, 80, 100]
+RISK_BAND_LABELS = ["0–20", "20–40", "40–60", "60–80", "80–100"]
+
+# Risco a partir do qual o colaborador é considerado de risco alto
+HIGH_RISK_THRESHOLD = 60
+
+# Motivos do risco: (chave, fator, operador, limite, texto). O motivo na
+# posição i é o bit 1 << i do código; a chave permite traduzir o texto.
+RISK_REASONS = (
+    ("baixa_performance", "perf", ">", 0.6, "baixa performance"),
+    ("sem_promocao", "promo", ">", 0.6, "muito tempo sem promoção"),
+    ("equipe_grande", "eq", ">", 0.6, "gestor com equipe grande"),
+    ("sem_merito", "merito", ">", 0.6, "sem mérito recente"),
+    ("pouco_tempo_casa", "casa", "<", 0.2, "pouco tempo de casa (fase inicial)")
+)
+
+# Texto do código 0 (nenhum motivo)
+STABLE_PROFILE_TEXT = "Perfil estável"
+
+_REASON_COLUMNS = np.array([RISK_FACTORS.index(fator) for _, fator, _, _, _ in RISK_REASONS])
+_REASON_LIMITS = np.array([limite for _, _, _, limite, _ in RISK_REASONS])
+# x > limite  <=>  (x - limite) * 1 > 0;  x < limite  <=>  (x - limite) * -1 > 0
+_REASON_SIGNS = np.array([1.0 if operador == ">" else -1.0 for _, _, operador, _, _ in RISK_REASONS])
+_REASON_BITS = 1 << np.arange(len(RISK_REASONS))
+
+
+def _reason_text(codigo: int) -> str:
+    motivos = [texto for bit, (_, _, _, _, texto) in enumerate(RISK_REASONS) if codigo >> bit & 1]
+    return ", ".join(motivos).capitalize() if motivos else STABLE_PROFILE_TEXT
+
+
+# Texto de cada código possível (tabela de consulta)
+_REASON_TEXTS = np.array([_reason_text(c) for c in range(1 << len(RISK_REASONS))], dtype=object)
+
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    arr.setflags(write=False)
+    return arr
+
+
+def _norm_0_1(valores: np.ndarray) -> np.ndarray:
+    """Mesma regra de `norm_0_1` sobre arrays (vazio = 0; faixa nula vira 0)."""
+    valores = np.nan_to_num(np.asarray(valores, dtype=float), nan=0.0)
+    if not len(valores):
+        return valores
+    minimo, maximo = valores.min(), valores.max()
+    faixa = maximo - minimo
+    if faixa == 0 or not np.isfinite(faixa):
+        return valores * 0
+    return (valores - minimo) / faixa
+
+
+def _months_since(df: pd.DataFrame, coluna: Optional[str], agora: pd.Timestamp) -> np.ndarray:
+    """Meses (dias / 30) desde a data da coluna; coluna ausente vale 0."""
+    if not coluna:
+        return np.zeros(len(df))
+    datas = pd.to_datetime(df[coluna], errors="coerce")
+    return ((agora - datas).dt.days / 30).to_numpy(dtype=float)
+
+
+def _team_sizes(wf) -> np.ndarray:
+    """Tamanho da equipe do gestor de cada colaborador (0 se sem gestor)."""
+    if not wf.cols["gestor"]:
+        return np.zeros(len(wf))
+    codes, _ = pd.factorize(wf.df[wf.cols["gestor"]])
+    conta = codes >= 0
+    if wf.cols["matricula"]:
+        conta &= wf.df[wf.cols["matricula"]].notna().to_numpy()
+    if not conta.any():
+        return np.zeros(len(codes))
+    tamanhos = np.bincount(codes[conta], minlength=codes.max() + 1)
+    return np.where(codes >= 0, tamanhos[np.maximum(codes, 0)], 0).astype(float)
+
+
+@dataclass(frozen=True)
+class RiskFeatures:
+    """
+    Matriz de fatores do TRI (imutável), alinhada às linhas de `df`.
+    
+    Attributes:
+        df: DataFrame original (não é copiado nem modificado)
+        matriz: Fatores normalizados (colaboradores x RISK_FACTORS)
+        brutos: Valores antes da normalização (meses_desde_promocao,
+            meses_desde_merito, tamanho_equipe, score_perf_raw, tempo_casa)
+        ativo: Máscara de colaboradores sem desligamento
+    """
+    df: pd.DataFrame
+    matriz: np.ndarray
+    brutos: Dict[str, np.ndarray]
+    ativo: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.df)
+    
+    def score(self, pesos: Optional[Mapping[str, float]] = None) -> np.ndarray:
+        """TRI (0–100) de todos os colaboradores: matriz @ pesos."""
+        return np.clip(self.matriz @ weight_vector(pesos) * 100, 0, 100)
+    
+    def factor(self, nome: str) -> np.ndarray:
+        """Coluna normalizada de um fator."""
+        return self.matriz[:, RISK_FACTORS.index(nome)]
+    
+    def reason_codes(self, linhas: Optional[np.ndarray] = None) -> np.ndarray:
+        """Código de motivos (bits de RISK_REASONS) de todos ou só de `linhas`."""
+        matriz = self.matriz if linhas is None else self.matriz[linhas]
+        flags = (matriz[:, _REASON_COLUMNS] - _REASON_LIMITS) * _REASON_SIGNS > 0
+        return (flags @ _REASON_BITS).astype(np.uint8)
+
+
+def weight_vector(pesos: Optional[Mapping[str, float]] = None) -> np.ndarray:
+    """
+    Converte pesos por fator no vetor na ordem de RISK_FACTORS.
+    
+    Fatores ausentes valem 0; sem pesos usa DEFAULT_RISK_WEIGHTS. Os pesos
+    não são renormalizados.
+    
+    Raises:
+        ValueError: fator desconhecido ou peso negativo
+    """
+    if pesos is None:
+        pesos = DEFAULT_RISK_WEIGHTS
+    desconhecidos = set(pesos) - set(RISK_FACTORS)
+    if desconhecidos:
+        raise ValueError(f"Fatores de risco desconhecidos: {', '.join(sorted(desconhecidos))}")
+    vetor = np.array([float(pesos.get(f, 0.0)) for f in RISK_FACTORS])
+    if (vetor < 0).any():
+        raise ValueError("Pesos de risco não podem ser negativos")
+    return vetor
+
+
+def weight_matrix(cenarios: Sequence[Optional[Mapping[str, float]]]) -> np.ndarray:
+    """Pesos de vários cenários como matriz (fatores x cenários)."""
+    if not len(cenarios):
+        raise ValueError("Informe ao menos um cenário de pesos")
+    return np.column_stack([weight_vector(pesos) for pesos in cenarios]).reshape(len(RISK_FACTORS), len(cenarios))
+
+
+def evaluate_weight_scenarios(
+    features: RiskFeatures,
+    cenarios: Sequence[Optional[Mapping[str, float]]],
+    top_n: int = 10,
+    linhas: Optional[np.ndarray] = None
+) -> List[Dict]:
+    """
+    Avalia vários conjuntos de pesos de uma vez (matriz de fatores @ matriz
+    de pesos), sem recalcular os fatores.
+    
+    Args:
+        features: Matriz de fatores da base
+        cenarios: Pesos de cada cenário (None = DEFAULT_RISK_WEIGHTS)
+        top_n: Quantidade de colaboradores de maior risco por cenário
+        linhas: Posições das linhas consideradas (None = todas)
+    
+    Returns:
+        Uma entrada por cenário com pesos, risco_medio, pct_risco_alto, top
+        (posições das linhas em `features.df`, do maior risco para o menor)
+        e risco_top (TRI dessas linhas)
+    
+    Raises:
+        ValueError: fator desconhecido ou peso negativo
+    """
+    pesos = weight_matrix(cenarios)
+    if linhas is None:
+        linhas = np.arange(len(features))
+    risco = np.clip(features.matriz[linhas] @ pesos * 100, 0, 100)
+    
+    n = min(top_n, len(linhas))
+    if n:
+        # Seleção parcial por coluna; só os n escolhidos são ordenados
+        candidatos = np.argpartition(-risco, n - 1, axis=0)[:n]
+        valores = np.take_along_axis(risco, candidatos, axis=0)
+        top = np.take_along_axis(candidatos, np.argsort(-valores, axis=0, kind="stable"), axis=0)
+    else:
+        top = np.zeros((0, len(cenarios)), dtype=np.intp)
+    
+    com_linhas = len(linhas) > 0
+    medias = risco.mean(axis=0) if com_linhas else np.zeros(len(cenarios))
+    altos = (risco > HIGH_RISK_THRESHOLD).mean(axis=0) * 100 if com_linhas else np.zeros(len(cenarios))
+    
+    resultados = []
+    for k in range(len(cenarios)):
+        resultados.append({
+            "pesos": dict(zip(RISK_FACTORS, pesos[:, k].tolist())),
+            "risco_medio": round(float(medias[k]), 1),
+            "pct_risco_alto": round(float(altos[k]), 1),
+            "top": linhas[top[:, k]],
+            "risco_top": risco[top[:, k], k]
+        })
+    return resultados
+
+
+def risk_bands(risco: np.ndarray) -> np.ndarray:
+    """Índice da faixa de RISK_BAND_LABELS de cada TRI (mesmos limites de `pd.cut`)."""
+    return np.searchsorted(np.asarray(RISK_BANDS[1:-1], dtype=float), risco, side="left")
+
+
+def filter_risk_rows(
+    features: RiskFeatures,
+    risco: np.ndarray,
+    departamentos: Optional[Sequence[str]] = None,
+    faixas: Optional[Sequence[str]] = None,
+    apenas_ativos: bool = False
+) -> np.ndarray:
+    """
+    Posições das linhas que passam nos filtros do ranking.
+    
+    Args:
+        features: Matriz de fatores da base
+        risco: TRI de todas as linhas (ex.: features.score(pesos))
+        departamentos: Departamentos aceitos (None = todos)
+        faixas: Rótulos de RISK_BAND_LABELS aceitos (None = todas)
+        apenas_ativos: Considerar só colaboradores sem desligamento
+    
+    Raises:
+        ValueError: faixa de risco desconhecida
+    """
+    mascara = features.ativo.copy() if apenas_ativos else np.ones(len(features), dtype=bool)
+    if faixas:
+        desconhecidas = set(faixas) - set(RISK_BAND_LABELS)
+        if desconhecidas:
+            raise ValueError(f"Faixas de risco desconhecidas: {', '.join(sorted(desconhecidas))}")
+        aceitas = np.isin(np.arange(len(RISK_BAND_LABELS)), [RISK_BAND_LABELS.index(f) for f in faixas])
+        mascara &= aceitas[risk_bands(risco)]
+    if departamentos:
+        col = col_like(features.df, "departamento")
+        if col:
+            mascara &= features.df[col].astype(str).isin([str(d) for d in departamentos]).to_numpy()
+        else:
+            mascara[:] = False
+    return np.flatnonzero(mascara)
+
+
+def top_risk_page(
+    risco: np.ndarray,
+    pagina: int = 1,
+    por_pagina: int = 50,
+    linhas: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Posições das linhas de uma página do ranking (maior TRI primeiro).
+    
+    Usa seleção parcial (argpartition) e ordena só as `pagina * por_pagina`
+    primeiras linhas. Empates são desfeitos pela posição, então as páginas
+    são estáveis entre chamadas.
+    
+    Args:
+        risco: TRI de todas as linhas
+        pagina: Página (começa em 1)
+        por_pagina: Linhas por página
+        linhas: Posições candidatas (None = todas)
+    """
+    if linhas is None:
+        linhas = np.arange(len(risco))
+    k = min(pagina * por_pagina, len(linhas))
+    if k <= 0:
+        return linhas[:0]
+    valores = risco[linhas]
+    if k < len(linhas):
+        # k-ésimo maior TRI; entram todos os empatados com ele
+        limiar = valores[np.argpartition(-valores, k - 1)[k - 1]]
+        escolhidas = np.flatnonzero(valores >= limiar)
+    else:
+        escolhidas = np.arange(len(linhas))
+    ordem = escolhidas[np.lexsort((escolhidas, -valores[escolhidas]))][:k]
+    return linhas[ordem[(pagina - 1) * por_pagina:]]
+
+
+def explain_risk_codes(codigos) -> np.ndarray:
+    """
+    Texto dos motivos para cada código (ex.: "Baixa performance, sem mérito
+    recente"). Use só nas linhas exibidas ou exportadas.
+    """
+    return _REASON_TEXTS[np.asarray(codigos, dtype=np.intp)]
+
+
+def build_risk_features(
+    df: WorkforceData,
+    data_referencia: Optional[datetime] = None
+) -> RiskFeatures:
+    """
+    Monta a matriz de fatores do TRI.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        data_referencia: Data usada nos "meses desde" (None = agora)
+    
+    Returns:
+        RiskFeatures
+    """
+    wf = as_workforce(df)
+    base = wf.df
+    agora = pd.Timestamp(data_referencia) if data_referencia is not None else pd.Timestamp.now()
+    
+    meses_promo = _months_since(base, wf.cols["ultima_promocao"], agora)
+    meses_merito = _months_since(base, wf.cols["ultimo_merito"], agora)
+    tamanho_equipe = _team_sizes(wf)
+    
+    if wf.cols["avaliacao"]:
+        perf_raw = (
+            base[wf.cols["avaliacao"]].astype(str).str.lower()
+            .map(PERFORMANCE_SCORES).fillna(4).to_numpy(dtype=float)
+        )
+    else:
+        perf_raw = np.full(len(base), 4.0)
+    
+    casa_col = col_like(base, "tempo_casa")
+    if casa_col:
+        tempo_casa = pd.to_numeric(base[casa_col], errors="coerce").to_numpy(dtype=float)
+    else:
+        tempo_casa = (agora - pd.Series(wf.admissao)).dt.days.to_numpy(dtype=float) / 30
+    
+    colunas = {
+        "perf": 1 - _norm_0_1(perf_raw),
+        "promo": _norm_0_1(meses_promo),
+        "casa": _norm_0_1(tempo_casa),
+        "eq": _norm_0_1(tamanho_equipe),
+        "merito": _norm_0_1(meses_merito)
+    }
+    matriz = np.column_stack([colunas[f] for f in RISK_FACTORS]).reshape(len(base), len(RISK_FACTORS))
+    
+    return RiskFeatures(
+        df=base,
+        matriz=_read_only(np.ascontiguousarray(matriz)),
+        brutos={
+            "meses_desde_promocao": _read_only(meses_promo),
+            "meses_desde_merito": _read_only(meses_merito),
+            "tamanho_equipe": _read_only(tamanho_equipe),
+            "score_perf_raw": _read_only(perf_raw),
+            "tempo_casa": _read_only(tempo_casa)
+        },
+        ativo=_read_only(np.isnat(wf.desligamento))
+    )
+
+
+def risk_summary(risco: np.ndarray) -> Tuple[Dict[str, float], pd.Series]:
+    """
+    Risco médio, % de risco alto e distribuição por faixa (%).
+    
+    Returns:
+        (dict com risco_medio, pct_risco_alto e colaboradores; Series com o
+        % de colaboradores em cada faixa de RISK_BAND_LABELS)
+    """
+    serie = pd.Series(risco)
+    media = serie.mean()
+    resumo = {
+        "risco_medio": round(float(media), 1) if pd.notna(media) else 0.0,
+        "pct_risco_alto": round(float((serie > HIGH_RISK_THRESHOLD).mean() * 100), 1) if len(serie) else 0.0,
+        "colaboradores": int(len(serie))
+    }
+    faixas = pd.cut(serie, bins=RISK_BANDS, labels=RISK_BAND_LABELS, include_lowest=True)
+    distribuicao = faixas.value_counts(normalize=True).reindex(RISK_BAND_LABELS, fill_value=0) * 100
+    return resumo, distribuicao
@@ -0,0 +1,341 @@
+"""
+Análise de sobrevivência (retenção) dos colaboradores.
+
+Curvas de Kaplan-Meier: probabilidade de o colaborador ainda estar na
+empresa após N meses de casa. Ativos (e desligamentos posteriores à data
+de referência) entram como observações censuradas: ficam expostos até o
+último mês observado, sem contar como saída.
+
+Todos os grupos são ajustados juntos: o tempo de casa em meses completos
+vira índice de uma grade grupo x mês contada com um único bincount; em
+risco e sobrevivência saem de somas e produtos acumulados ao longo dos
+meses, sem laço por grupo.
+"""
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+from kpi_core.workforce import WorkforceData, as_workforce
+
+
+# Agrupamento especial: ano da data de admissão (coorte de contratação)
+HIRE_YEAR_GROUP = "ano_admissao"
+HIRE_YEAR_LABEL = "Ano de Admissão"
+
+# Marcos padrão do resumo de retenção (meses de casa)
+RETENTION_MILESTONES = (3, 6, 12, 24, 36)
+
+
+def _complete_months(inicio: np.ndarray, fim: np.ndarray) -> np.ndarray:
+    """Meses completos entre duas datas (datetime64, sem NaT)."""
+    mes_inicio = inicio.astype("datetime64[M]")
+    mes_fim = fim.astype("datetime64[M]")
+    meses = (mes_fim - mes_inicio).astype(np.int64)
+    # Mês ainda não completo se o dia/hora do fim vem antes do dia/hora do início
+    incompleto = (fim - mes_fim.astype(fim.dtype)) < (inicio - mes_inicio.astype(inicio.dtype))
+    return meses - incompleto
+
+
+def _reference_date(data_referencia: Optional[datetime]) -> np.datetime64:
+    ref = pd.Timestamp(data_referencia) if data_referencia is not None else pd.Timestamp.now()
+    return np.datetime64(ref.normalize(), "ns")
+
+
+def _durations(wf, data_referencia: Optional[datetime]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Tempo de casa observado de cada colaborador.
+    
+    Returns:
+        (meses completos, flag de desligamento observado, máscara das
+        linhas válidas). Ficam de fora admissões vazias ou posteriores à
+        referência e desligamentos anteriores à admissão.
+    """
+    ref = _reference_date(data_referencia)
+    adm = wf.admissao
+    desl = wf.desligamento
+    
+    evento = ~np.isnat(desl) & (desl <= ref)
+    fim = np.where(evento, desl, ref)
+    validos = ~np.isnat(adm) & (adm <= ref) & (fim >= adm)
+    
+    duracao = _complete_months(adm[validos], fim[validos])
+    return duracao, evento[validos], validos
+
+
+def _survival_groups(
+    wf,
+    group_by: Optional[str],
+    validos: np.ndarray
+) -> Tuple[Optional[str], np.ndarray, np.ndarray]:
+    """(coluna, códigos, categorias) das linhas válidas; -1 = sem grupo."""
+    if group_by is None:
+        return None, np.zeros(int(validos.sum()), dtype=np.int64), np.array([None], dtype=object)
+    
+    if group_by == HIRE_YEAR_GROUP:
+        anos = wf.admissao[validos].astype("datetime64[Y]").astype(np.int64) + 1970
+        categorias, codes = np.unique(anos, return_inverse=True)
+        return HIRE_YEAR_LABEL, codes.astype(np.int64), categorias.astype(object)
+    
+    coluna, codes, categorias = wf.group_codes(group_by)
+    return coluna, codes[validos].astype(np.int64), categorias
+
+
+def _kaplan_meier_grid(
+    duracao: np.ndarray,
+    evento: np.ndarray,
+    codes: np.ndarray,
+    n_grupos: int,
+    meses_max: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Estimador de Kaplan-Meier de todos os grupos em matrizes (grupos x meses).
+    
+    A coluna t é o mês de casa t+1 (de t a t+1 meses completos): quem tem
+    t meses completos está em risco nela; desligamentos com t meses
+    completos saem nela. Tempos além de `meses_max` continuam em risco até
+    o fim da grade, sem saída.
+    
+    Returns:
+        Dict com 'em_risco', 'desligamentos', 'censurados' e 'sobrevivencia'
+        (probabilidade de continuar após o fim de cada mês).
+    """
+    horizonte = int(duracao.max()) if duracao.size else 0
+    if meses_max is not None:
+        horizonte = min(horizonte, int(meses_max) - 1)
+    largura = horizonte + 2
+    
+    # Última coluna acumula quem passou do horizonte (só entra no em risco)
+    coluna = np.minimum(duracao, horizonte + 1)
+    posicao = codes * largura + coluna
+    saidas = np.bincount(posicao, minlength=n_grupos * largura).reshape(n_grupos, largura)
+    desligamentos = np.bincount(
+        posicao[evento & (duracao <= horizonte)], minlength=n_grupos * largura
+    ).reshape(n_grupos, largura)
+    
+    # Em risco no mês t: quem saiu em t ou depois (soma acumulada reversa)
+    em_risco = saidas[:, ::-1].cumsum(axis=1)[:, ::-1]
+    
+    saidas = saidas[:, :-1]
+    desligamentos = desligamentos[:, :-1]
+    em_risco = em_risco[:, :-1]
+    
+    risco = np.zeros(em_risco.shape, dtype=float)
+    np.divide(desligamentos, em_risco, out=risco, where=em_risco > 0)
+    
+    return {
+        "em_risco": em_risco,
+        "desligamentos": desligamentos,
+        "censurados": saidas - desligamentos,
+        "sobrevivencia": np.cumprod(1.0 - risco, axis=1)
+    }
+
+
+def _fit(
+    df: WorkforceData,
+    group_by: Optional[str],
+    data_referencia: Optional[datetime],
+    meses_max: Optional[int] = None
+) -> Optional[Tuple[Optional[str], np.ndarray, Dict[str, np.ndarray]]]:
+    """Ajusta as curvas; None se não houver admissões válidas no agrupamento."""
+    if meses_max is not None and meses_max < 1:
+        raise ValueError("meses_max deve ser >= 1")
+    
+    wf = as_workforce(df)
+    if not wf.cols["admissao"]:
+        return None
+    
+    duracao, evento, validos = _durations(wf, data_referencia)
+    coluna, codes, categorias = _survival_groups(wf, group_by, validos)
+    
+    com_grupo = codes >= 0
+    if not com_grupo.any():
+        return None
+    
+    grade = _kaplan_meier_grid(
+        duracao[com_grupo], evento[com_grupo], codes[com_grupo], len(categorias), meses_max
+    )
+    return coluna, categorias, grade
+
+
+def calculate_retention_curves(
+    df: WorkforceData,
+    group_by: Optional[str] = None,
+    data_referencia: Optional[datetime] = None,
+    meses_max: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Calcula curvas de retenção (Kaplan-Meier) por mês de casa.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        group_by: Coluna de agrupamento, `HIRE_YEAR_GROUP` para o ano de
+            admissão ou None para a base inteira
+        data_referencia: Data de corte (None = hoje); quem não saiu até ela
+            é censurado
+        meses_max: Último mês de casa da curva (None = maior tempo observado)
+    
+    Returns:
+        DataFrame com [grupo], Mês de Casa, Em Risco, Desligamentos,
+        Censurados e Retenção (%) — probabilidade de seguir na empresa ao
+        fim do mês. Só meses com alguém em risco no grupo.
+    """
+    colunas = ["Mês de Casa", "Em Risco", "Desligamentos", "Censurados", "Retenção (%)"]
+    ajuste = _fit(df, group_by, data_referencia, meses_max)
+    if ajuste is None:
+        return pd.DataFrame(columns=colunas)
+    
+    coluna, categorias, grade = ajuste
+    grupos, meses = np.nonzero(grade["em_risco"] > 0)
+    
+    curvas = pd.DataFrame({
+        "Mês de Casa": meses + 1,
+        "Em Risco": grade["em_risco"][grupos, meses],
+        "Desligamentos": grade["desligamentos"][grupos, meses],
+        "Censurados": grade["censurados"][grupos, meses],
+        "Retenção (%)": np.round(grade["sobrevivencia"][grupos, meses] * 100, 1)
+    })
+    if coluna is not None:
+        curvas.insert(0, coluna, categorias[grupos])
+    return curvas
+
+
+def calculate_retention_summary(
+    df: WorkforceData,
+    group_by: Optional[str] = None,
+    marcos: Sequence[int] = RETENTION_MILESTONES,
+    data_referencia: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Resume as curvas de retenção em marcos de tempo de casa.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        group_by: Como em `calculate_retention_curves`
+        marcos: Meses de casa com a retenção reportada
+        data_referencia: Data de corte (None = hoje)
+    
+    Returns:
+        DataFrame com [grupo], Colaboradores, Desligamentos, Retenção Nm (%)
+        por marco (NaN se o grupo não tem ninguém observado até lá) e
+        Mediana (meses) — primeiro mês com retenção ≤ 50% (NaN se não
+        chegou lá).
+    """
+    ajuste = _fit(df, group_by, data_referencia)
+    if ajuste is None:
+        return pd.DataFrame()
+    
+    coluna, categorias, grade = ajuste
+    em_risco = grade["em_risco"]
+    sobrevivencia = grade["sobrevivencia"]
+    observado = em_risco > 0
+    
+    resumo = pd.DataFrame({
+        "Colaboradores": em_risco[:, 0],
+        "Desligamentos": grade["desligamentos"].sum(axis=1)
+    })
+    for marco in marcos:
+        t = int(marco) - 1
+        if 0 <= t < em_risco.shape[1]:
+            valores = np.where(observado[:, t], np.round(sobrevivencia[:, t] * 100, 1), np.nan)
+        else:
+            valores = np.full(len(categorias), np.nan)
+        resumo[f"Retenção {marco}m (%)"] = valores
+    
+    abaixo = (sobrevivencia <= 0.5) & observado
+    resumo["Mediana (meses)"] = np.where(abaixo.any(axis=1), abaixo.argmax(axis=1) + 1, np.nan)
+    
+    if coluna is not None:
+        resumo.insert(0, coluna, categorias)
+        resumo = resumo[resumo["Colaboradores"] > 0].reset_index(drop=True)
+    return resumo
+
+
+def _month_index(datas: np.ndarray) -> np.ndarray:
+    """Índice inteiro do mês (meses desde 1970-01)."""
+    return datas.astype("datetime64[M]").astype(np.int64)
+
+
+def calculate_cohort_retention(
+    df: WorkforceData,
+    group_by: Optional[str] = None,
+    data_referencia: Optional[datetime] = None,
+    meses_max: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Calcula a matriz de retenção por coorte de admissão.
+    
+    Linhas são os meses de admissão (e o grupo, se informado); a coluna k
+    é o % da coorte ainda ativo no fim do k-ésimo mês após o mês de
+    admissão (k = 0 é o próprio mês). Todos os desligamentos caem em uma
+    única contagem 2-D (coorte x meses até a saída) com bincount; a soma
+    acumulada ao longo das colunas dá quem já saiu até cada mês, sem laço
+    por coorte.
+    
+    Args:
+        df: DataFrame com dados de colaboradores (ou PreparedWorkforce)
+        group_by: Coluna para separar as coortes (None = base inteira)
+        data_referencia: Data de corte (None = hoje); meses posteriores
+            ficam vazios (NaN) e saídas posteriores não contam
+        meses_max: Última coluna da matriz (None = até a coorte mais antiga)
+    
+    Returns:
+        DataFrame com [grupo], Coorte ('YYYY-MM'), Admitidos e uma coluna
+        inteira por mês desde a admissão (0, 1, 2, ...)
+    """
+    if meses_max is not None and meses_max < 0:
+        raise ValueError("meses_max deve ser >= 0")
+    
+    wf = as_workforce(df)
+    if not wf.cols["admissao"]:
+        return pd.DataFrame()
+    
+    ref = _reference_date(data_referencia)
+    adm = wf.admissao
+    desl = wf.desligamento
+    saiu = ~np.isnat(desl) & (desl <= ref)
+    validos = ~np.isnat(adm) & (adm <= ref) & ~(saiu & (desl < adm))
+    
+    coluna, codes, categorias = _survival_groups(wf, group_by, validos)
+    com_grupo = codes >= 0
+    if not com_grupo.any():
+        return pd.DataFrame()
+    
+    codes = codes[com_grupo]
+    coorte = _month_index(adm[validos][com_grupo])
+    saiu = saiu[validos][com_grupo]
+    mes_saida = _month_index(desl[validos][com_grupo][saiu])
+    
+    primeira = int(coorte.min())
+    n_coortes = _month_index(np.array([ref])).item() - primeira + 1
+    largura = n_coortes if meses_max is None else min(n_coortes, int(meses_max) + 1)
+    
+    # Só os pares (grupo, coorte) que existem viram linhas: o produto
+    # grupos x coortes explode com dimensões de alta cardinalidade
+    chave = codes.astype(np.int64) * n_coortes + (coorte - primeira)
+    ocupadas, linha = np.unique(chave, return_inverse=True)
+    n_linhas = len(ocupadas)
+    admitidos = np.bincount(linha, minlength=n_linhas)
+    
+    # Saídas além da última coluna não aparecem na matriz
+    atraso = mes_saida - coorte[saiu]
+    na_matriz = atraso < largura
+    saidas = np.bincount(
+        linha[saiu][na_matriz] * largura + atraso[na_matriz],
+        minlength=n_linhas * largura
+    ).reshape(n_linhas, largura)
+    
+    ativos = admitidos[:, np.newaxis] - saidas.cumsum(axis=1)
+    retencao = ativos * 100.0 / admitidos[:, np.newaxis]
+    
+    # Meses após a data de corte ainda não aconteceram
+    offset_coorte = ocupadas % n_coortes
+    observado = offset_coorte[:, np.newaxis] + np.arange(largura) < n_coortes
+    retencao[~observado] = np.nan
+    
+    matriz = pd.DataFrame(np.round(retencao, 1), columns=range(largura))
+    rotulos = np.datetime_as_string((primeira + offset_coorte).astype("datetime64[M]"), unit="M")
+    matriz.insert(0, "Admitidos", admitidos)
+    matriz.insert(0, "Coorte", rotulos)
+    if coluna is not None:
+        matriz.insert(0, coluna, categorias[ocupadas // n_coortes])
+    return matriz
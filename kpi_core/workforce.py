@@ -0,0 +1,215 @@
+"""
+Base de colaboradores preparada uma única vez por dataset.
+Resolve colunas, converte datas e deriva flags/códigos para que os
+cálculos de KPI não precisem copiar e reconverter o DataFrame a cada chamada.
+"""
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple, Union
+from kpi_core.columns import col_like
+from kpi_core.exit_types import TIPO_SAIDA_VOLUNTARIA, TIPO_SAIDA_INVOLUNTARIA, classify_exits
+
+
+# Chave interna -> nome da coluna na planilha
+WORKFORCE_COLUMNS = {
+    "matricula": "matricula",
+    "nome": "nome",
+    "departamento": "departamento",
+    "cargo": "cargo",
+    "gestor": "matricula do gestor",
+    "tipo_contrato": "tipo_contrato",
+    "genero": "genero",
+    "admissao": "data de admissão",
+    "desligamento": "data de desligamento",
+    "tipo_desligamento": "tipo desligamento",
+    "motivo": "motivo de desligamento",
+    "avaliacao": "avaliação",
+    "ultima_promocao": "ultima promoção",
+    "ultimo_merito": "ultimo mérito",
+}
+
+# Colunas categóricas codificadas no preparo
+CATEGORICAL_COLUMNS = ("departamento", "cargo", "tipo_contrato", "genero", "avaliacao")
+
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    arr.setflags(write=False)
+    return arr
+
+
+def _date_array(df: pd.DataFrame, col: Optional[str]) -> np.ndarray:
+    """Converte coluna para datetime64[ns]; coluna ausente vira array de NaT."""
+    if not col:
+        return _read_only(np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]"))
+    return _read_only(pd.to_datetime(df[col], errors="coerce").to_numpy(dtype="datetime64[ns]"))
+
+
+def _exit_codes(
+    df: pd.DataFrame,
+    cols: Dict[str, Optional[str]],
+    palavras_voluntario: Optional[Iterable[str]],
+    palavras_involuntario: Optional[Iterable[str]]
+) -> np.ndarray:
+    """
+    Código de tipo de saída por colaborador.
+    Reaproveita a coluna `tipo_saida` gerada no carregamento, a menos que
+    palavras-chave customizadas tenham sido informadas.
+    """
+    customizado = palavras_voluntario is not None or palavras_involuntario is not None
+    if "tipo_saida" in df.columns and not customizado:
+        return _read_only(df["tipo_saida"].fillna(0).to_numpy(dtype=np.int8))
+    
+    if not cols["desligamento"]:
+        return _read_only(np.zeros(len(df), dtype=np.int8))
+    return _read_only(classify_exits(
+        df[cols["desligamento"]],
+        tipo=df[cols["tipo_desligamento"]] if cols["tipo_desligamento"] else None,
+        motivo=df[cols["motivo"]] if cols["motivo"] else None,
+        palavras_voluntario=palavras_voluntario,
+        palavras_involuntario=palavras_involuntario
+    ))
+
+
+def _factorize(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Códigos inteiros (-1 = vazio) e categorias ordenadas de uma coluna."""
+    try:
+        codes, categorias = pd.factorize(series, sort=True)
+    except TypeError:
+        # Tipos misturados (ex.: números e textos) não são ordenáveis
+        codes, categorias = pd.factorize(series)
+    return _read_only(codes.astype(np.int32)), _read_only(np.asarray(categorias, dtype=object))
+
+
+@dataclass(frozen=True)
+class PreparedWorkforce:
+    """
+    Base de colaboradores preparada (imutável).
+    
+    Construída uma vez a partir da aba `colaboradores` já carregada e
+    compartilhada por todos os cálculos de uma requisição. Os arrays são
+    somente leitura e alinhados às linhas de `df`.
+    
+    Attributes:
+        df: DataFrame original (não é copiado nem modificado)
+        cols: Nome real de cada coluna conhecida (None se ausente)
+        admissao: Datas de admissão (datetime64[ns], NaT se vazia)
+        desligamento: Datas de desligamento (datetime64[ns], NaT = ativo)
+        ativo: Flag de ativo (coluna `ativo` se existir, senão todos True)
+        tem_flag_ativo: Se a coluna `ativo` existe no DataFrame
+        tipo_saida: Código int8 do tipo de saída (ver exit_types)
+        codes: Códigos inteiros das colunas categóricas (-1 = vazio)
+        categorias: Valores correspondentes a cada código
+    """
+    df: pd.DataFrame
+    cols: Dict[str, Optional[str]]
+    admissao: np.ndarray
+    desligamento: np.ndarray
+    ativo: np.ndarray
+    tem_flag_ativo: bool
+    tipo_saida: np.ndarray
+    codes: Dict[str, np.ndarray]
+    categorias: Dict[str, np.ndarray]
+    
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        palavras_voluntario: Optional[Iterable[str]] = None,
+        palavras_involuntario: Optional[Iterable[str]] = None
+    ) -> "PreparedWorkforce":
+        """
+        Prepara a base a partir do DataFrame de colaboradores.
+        
+        Args:
+            df: DataFrame de colaboradores
+            palavras_voluntario: Palavras-chave de saída voluntária (opcional)
+            palavras_involuntario: Palavras-chave de saída involuntária (opcional)
+        """
+        if df is None:
+            df = pd.DataFrame()
+        
+        cols = {key: col_like(df, name) for key, name in WORKFORCE_COLUMNS.items()}
+        
+        tem_flag_ativo = "ativo" in df.columns
+        if tem_flag_ativo:
+            ativo = (df["ativo"] == True).to_numpy(dtype=bool)
+        else:
+            ativo = np.ones(len(df), dtype=bool)
+        
+        codes = {}
+        categorias = {}
+        for key in CATEGORICAL_COLUMNS:
+            if cols[key]:
+                codes[key], categorias[key] = _factorize(df[cols[key]])
+        
+        return cls(
+            df=df,
+            cols=cols,
+            admissao=_date_array(df, cols["admissao"]),
+            desligamento=_date_array(df, cols["desligamento"]),
+            ativo=_read_only(ativo),
+            tem_flag_ativo=tem_flag_ativo,
+            tipo_saida=_exit_codes(df, cols, palavras_voluntario, palavras_involuntario),
+            codes=codes,
+            categorias=categorias
+        )
+    
+    def __len__(self) -> int:
+        return len(self.df)
+    
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+    
+    @property
+    def voluntario(self) -> np.ndarray:
+        """Máscara de desligamentos voluntários."""
+        return self.tipo_saida == TIPO_SAIDA_VOLUNTARIA
+    
+    @property
+    def involuntario(self) -> np.ndarray:
+        """Máscara de desligamentos involuntários."""
+        return self.tipo_saida == TIPO_SAIDA_INVOLUNTARIA
+    
+    def col(self, name: str) -> Optional[str]:
+        """Resolve coluna pela chave interna ou pelo nome da planilha."""
+        if name in self.cols:
+            return self.cols[name]
+        return col_like(self.df, name)
+    
+    def group_codes(self, group_by: str) -> Tuple[Optional[str], np.ndarray, np.ndarray]:
+        """
+        Retorna (coluna, códigos, categorias) para agrupar por `group_by`.
+        Usa os códigos do preparo quando disponíveis; outras colunas são
+        codificadas sob demanda.
+        """
+        for key in CATEGORICAL_COLUMNS:
+            if key in self.codes and self.cols[key] == self.col(group_by):
+                return self.cols[key], self.codes[key], self.categorias[key]
+        
+        group_col = self.col(group_by)
+        if not group_col:
+            return None, np.full(len(self.df), -1, dtype=np.int32), np.array([], dtype=object)
+        codes, categorias = _factorize(self.df[group_col])
+        return group_col, codes, categorias
+
+
+# Entrada aceita pelos cálculos de KPI
+WorkforceData = Union[pd.DataFrame, PreparedWorkforce]
+
+
+def prepare_workforce(
+    df: pd.DataFrame,
+    palavras_voluntario: Optional[Iterable[str]] = None,
+    palavras_involuntario: Optional[Iterable[str]] = None
+) -> PreparedWorkforce:
+    """Prepara a base de colaboradores para os cálculos de KPI."""
+    return PreparedWorkforce.from_dataframe(df, palavras_voluntario, palavras_involuntario)
+
+
+def as_workforce(data: WorkforceData) -> PreparedWorkforce:
+    """Aceita DataFrame ou base já preparada e devolve a base preparada."""
+    if isinstance(data, PreparedWorkforce):
+        return data
+    return PreparedWorkforce.from_dataframe(data)
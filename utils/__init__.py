@@ -1,5 +1,7 @@
 """
 Módulo de utilitários para o Dashboard de Turnover.
+
+Os cálculos de KPIs ficam no pacote `kpi_core`, compartilhado com a API.
 """
 from utils.data_loader import (
     load_and_prepare,
@@ -7,38 +9,10 @@ from utils.data_loader import (
     col_like,
     DATE_COLS
 )
-from utils.kpi_helpers import (
-    calculate_turnover,
-    calculate_turnover_by_period,
-    calculate_turnover_history,
-    calculate_tenure,
-    calculate_headcount,
-    calculate_headcount_temporal,
-    calculate_headcount_growth,
-    calculate_headcount_by_dimension_temporal,
-    calculate_basic_kpis,
-    calculate_contract_types,
-    calculate_monthly_dismissals,
-    safe_mean,
-    norm_0_1
-)
 
 __all__ = [
     "load_and_prepare",
     "validate_calculations",
     "col_like",
-    "DATE_COLS",
-    "calculate_turnover",
-    "calculate_turnover_by_period",
-    "calculate_turnover_history",
-    "calculate_tenure",
-    "calculate_headcount",
-    "calculate_headcount_temporal",
-    "calculate_headcount_growth",
-    "calculate_headcount_by_dimension_temporal",
-    "calculate_basic_kpis",
-    "calculate_contract_types",
-    "calculate_monthly_dismissals",
-    "safe_mean",
-    "norm_0_1"
+    "DATE_COLS"
 ]
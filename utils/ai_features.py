@@ -6,8 +6,14 @@ import pandas as pd
 import streamlit as st
 from typing import Dict, List, Optional
 from utils.subscription import require_premium, SubscriptionLevel
-from utils.data_loader import col_like
-from utils.kpi_helpers import calculate_turnover_history, calculate_turnover
+from kpi_core import (
+    col_like,
+    calculate_turnover_history,
+    calculate_turnover_by_group,
+    calculate_turnover_forecast,
+    detect_turnover_anomalies,
+    MIN_FORECAST_MONTHS
+)
 
 
 @require_premium
@@ -45,14 +51,13 @@ def generate_ai_insights(df: pd.DataFrame) -> Dict[str, any]:
                 f"⚠️ Turnover médio ({turnover_medio:.1f}%) está acima do benchmark de mercado (3-5%)."
             )
     
-    # Análise de departamentos críticos
+    # Análise de departamentos críticos (todos os departamentos em uma passada)
     dept_col = col_like(df, "departamento")
     if dept_col:
-        dept_turnover = {}
-        for dept in df[dept_col].dropna().unique():
-            df_dept = df[df[dept_col] == dept]
-            turnover_dept = calculate_turnover(df_dept)
-            dept_turnover[dept] = turnover_dept.get("turnover_total", 0)
+        dept_turnover = {
+            dept: turnover_dept.get("turnover_total", 0)
+            for dept, turnover_dept in calculate_turnover_by_group(df, dept_col).items()
+        }
         
         if dept_turnover:
             max_dept = max(dept_turnover.items(), key=lambda x: x[1])
@@ -64,6 +69,25 @@ def generate_ai_insights(df: pd.DataFrame) -> Dict[str, any]:
                     f"Priorizar ações de retenção no departamento {max_dept[0]}."
                 )
     
+    # Anomalias por departamento × cargo nos últimos 6 meses
+    anomalias = detect_turnover_anomalies(df, top_n=5, meses_recentes=6)
+    if not anomalias.empty:
+        dimensoes = list(anomalias.columns[:anomalias.columns.get_loc("Mês")])
+        for _, anomalia in anomalias.iterrows():
+            grupo = " / ".join(str(anomalia[c]) for c in dimensoes)
+            texto = (
+                f"{grupo} em {anomalia['Mês']}: {anomalia['Turnover (%)']:.1f}% "
+                f"({anomalia['Desligados']} desligamentos; mediana histórica {anomalia['Mediana (%)']:.1f}%)"
+            )
+            if anomalia["Direção"] == "alta":
+                insights["alertas"].append(f"🔎 Turnover atípico em {texto}.")
+            else:
+                insights["tendencias"].append(f"📉 Queda atípica de turnover em {texto}.")
+        if (anomalias["Direção"] == "alta").any():
+            insights["recomendacoes"].append(
+                "Investigar as áreas com turnover atípico (entrevistas de desligamento, mudanças de gestão ou de escala)."
+            )
+    
     # Análise de tenure
     adm_col = col_like(df, "data de admissão")
     desl_col = col_like(df, "data de desligamento")
@@ -138,47 +162,38 @@ def generate_ai_presentation(df: pd.DataFrame) -> str:
 
 
 @require_premium
-def generate_predictive_analysis(df: pd.DataFrame) -> Dict[str, any]:
+def generate_predictive_analysis(
+    df: pd.DataFrame,
+    horizonte: int = 3,
+    sazonal: bool = False
+) -> Dict[str, any]:
     """
     Gera análise preditiva de turnover baseada em padrões históricos.
     Funcionalidade Premium.
+    
+    Args:
+        df: DataFrame com dados de colaboradores
+        horizonte: Meses previstos (1 a 12)
+        sazonal: Considerar sazonalidade mensal no modelo
     """
-    turnover_data = calculate_turnover_history(df)
+    previsao = calculate_turnover_forecast(df, horizonte=horizonte, sazonal=sazonal)
     
-    if turnover_data.empty or len(turnover_data) < 3:
+    if previsao.empty:
         return {
             "mensagem": "Dados insuficientes para análise preditiva. "
-                       "Necessário histórico de pelo menos 3 meses."
+                       f"Necessário histórico de pelo menos {MIN_FORECAST_MONTHS} meses completos"
+                       + (" (14 com sazonalidade)." if sazonal else ".")
         }
     
-    # Análise de tendência simples (regressão linear básica)
-    turnover_values = turnover_data["Turnover Total (%)"].values
-    meses = list(range(len(turnover_values)))
-    
-    # Calcular tendência
-    n = len(meses)
-    x_mean = sum(meses) / n
-    y_mean = sum(turnover_values) / n
-    
-    numerator = sum((meses[i] - x_mean) * (turnover_values[i] - y_mean) for i in range(n))
-    denominator = sum((meses[i] - x_mean) ** 2 for i in range(n))
-    
-    if denominator == 0:
-        slope = 0
-    else:
-        slope = numerator / denominator
-    
-    intercept = y_mean - slope * x_mean
-    
-    # Previsão para próximos 3 meses
-    proximos_meses = [n, n+1, n+2]
-    previsoes = [slope * mes + intercept for mes in proximos_meses]
+    slope = float(previsao["Tendência (p.p./mês)"].iloc[0])
+    tendencia = "crescente" if slope > 0.1 else "decrescente" if slope < -0.1 else "estável"
+    valores = previsao["Previsão (%)"].round(1).tolist()
     
     return {
-        "tendencia": "crescente" if slope > 0.1 else "decrescente" if slope < -0.1 else "estável",
-        "previsao_3_meses": [max(0, round(p, 1)) for p in previsoes],
+        "tendencia": tendencia,
+        "previsao_3_meses": valores[:3],
+        "previsao": previsao.round(2).to_dict("records"),
         "coeficiente_tendencia": round(slope, 3),
-        "mensagem": f"Tendência {('crescente' if slope > 0.1 else 'decrescente' if slope < -0.1 else 'estável')} "
-                   f"identificada. Previsão de turnover para os próximos 3 meses: "
-                   f"{', '.join([f'{p:.1f}%' for p in previsoes])}"
+        "mensagem": f"Tendência {tendencia} identificada. Previsão de turnover para os próximos "
+                   f"{len(valores)} meses: {', '.join([f'{p:.1f}%' for p in valores])}"
     }
@@ -7,19 +7,8 @@ import numpy as np
 from datetime import datetime
 from typing import Dict, Tuple, Optional, List
 import streamlit as st
-
-
-DATE_COLS = ["data de admissão", "data de desligamento", "ultima promoção", "ultimo mérito"]
-
-
-def col_like(df: pd.DataFrame, name: str) -> Optional[str]:
-    """Encontra coluna por nome (case-insensitive)."""
-    if df is None or df.empty:
-        return None
-    for c in df.columns:
-        if c.lower().strip() == name.lower().strip():
-            return c
-    return None
+from kpi_core.columns import col_like, column_resolver, DATE_COLS
+from kpi_core.exit_types import classify_exits
 
 
 def load_excel(file) -> Dict[str, pd.DataFrame]:
@@ -60,6 +49,18 @@ def ensure_core_fields(colab: pd.DataFrame) -> pd.DataFrame:
     else:
         colab["tempo_casa"] = np.nan
     
+    # Tipo de saída (0 = sem desligamento, 1 = voluntário, 2 = involuntário)
+    if desl_col:
+        tipo_col = col_like(colab, "tipo desligamento")
+        mot_col = col_like(colab, "motivo de desligamento")
+        colab["tipo_saida"] = classify_exits(
+            colab[desl_col],
+            tipo=colab[tipo_col] if tipo_col else None,
+            motivo=colab[mot_col] if mot_col else None
+        )
+    else:
+        colab["tipo_saida"] = 0
+    
     return colab
 
 
@@ -69,20 +70,24 @@ def merge_last_performance(colab: pd.DataFrame, perf: Optional[pd.DataFrame]) ->
         return colab
     
     p = perf.copy()
+    perf_mat = col_like(p, "matricula")
+    if not perf_mat:
+        return colab
     ciclo_col = col_like(p, "data de encerramento do ciclo")
     
     if ciclo_col:
         p[ciclo_col] = pd.to_datetime(p[ciclo_col], errors="coerce")
-        last = p.sort_values(["matricula", ciclo_col]).groupby("matricula", as_index=False).tail(1)
+        last = p.sort_values([perf_mat, ciclo_col]).groupby(perf_mat, as_index=False).tail(1)
     else:
-        last = p.drop_duplicates(subset=["matricula"], keep="last")
+        last = p.drop_duplicates(subset=[perf_mat], keep="last")
     
     aval_col = col_like(last, "avaliação")
     mat_col = col_like(colab, "matricula")
     
     if aval_col and mat_col:
+        # As abas podem escrever a matrícula de formas diferentes
         colab = colab.merge(
-            last[[mat_col, aval_col]], 
+            last[[perf_mat, aval_col]].rename(columns={perf_mat: mat_col}), 
             on=mat_col, 
             how="left"
         )
@@ -91,10 +96,23 @@ def merge_last_performance(colab: pd.DataFrame, perf: Optional[pd.DataFrame]) ->
 
 
 def clean_and_warn(df: pd.DataFrame, expected: List[str], name: str) -> pd.DataFrame:
-    """Valida colunas esperadas e alerta sobre extras/faltantes."""
+    """
+    Valida colunas esperadas e alerta sobre extras/faltantes.
+    Cabeçalhos reconhecidos pelo resolvedor de colunas (acentos, separadores,
+    sinônimos) são renomeados para o nome esperado.
+    """
     if df.empty:
         return df
     
+    resolver = column_resolver(df)
+    renomear = {}
+    for nome in expected:
+        col = resolver.resolve(nome)
+        if col is not None and col != nome and col not in renomear:
+            renomear[col] = nome
+    if renomear:
+        df = df.rename(columns=renomear)
+    
     current = set(df.columns)
     expected_set = set(expected)
     extras = current - expected_set